@@ -1,6 +1,7 @@
 from pathlib import Path
 from typing import Optional
 
+from pydantic import Field
 from pydantic_settings import BaseSettings
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -20,11 +21,60 @@ class Settings(BaseSettings):
     durable_functions_human_event: str = "HumanApproval"
     database_url: Optional[str] = None
     storage_dir: Optional[str] = None
+    # Background cleanup of deleted projects: attempts per step, doubling delay between attempts
+    project_delete_max_attempts: int = 5
+    project_delete_retry_seconds: float = 2.0
+    # Browser cache lifetime of GET /files/{id}/content; clients revalidate with ETag afterwards
+    file_cache_max_age: int = 3600
+    payload_store_dir: Optional[str] = None
+    payload_store_connection_string: Optional[str] = None
+    payload_store_container: str = "research-payloads"
+    # Blob store of the Functions app, used for payloads when no PAYLOAD_STORE_* store is set (as it does)
+    azure_webjobs_storage: Optional[str] = Field(default=None, validation_alias="AzureWebJobsStorage")
+    report_stream_poll_seconds: float = 0.5
+    report_stream_timeout_seconds: float = 1800
+    # How often a followed report stream checks whether its run completed or failed
+    report_stream_status_seconds: float = 5.0
+    # Finished runs whose (resolved) status response is kept in memory for later polls
+    run_status_cache_size: int = 128
+    # "azure" (Azure AI Search) or "local" (memory-mapped indexes under local_search_dir)
+    search_backend: str = "azure"
+    local_search_dir: Optional[str] = None
+    local_search_ivf_min_documents: int = 50000
+    local_search_ivf_probes: int = 8
+    # With the azure backend, also keep a local copy of every index for the research fallback
+    local_search_fallback: bool = False
+    query_embedding_cache_size: int = 1024
+    # Shared Azure OpenAI limiter (per process; 0 disables a budget). Split the deployment quota across processes.
+    openai_rpm_limit: float = 0
+    openai_tpm_limit: float = 0
+    openai_max_concurrency: int = 16
+    openai_max_retries: int = 6
+    # Vector storage of new project indexes: "full" (float32), "scalar" (int8) or "binary" quantization.
+    # Quantized vectors are not retrievable; the originals are kept only to rescore candidates.
+    vector_profile: str = "full"
+    vector_hnsw_m: int = 4
+    vector_hnsw_ef_construction: int = 400
+    vector_hnsw_ef_search: int = 500
+    vector_rescore_oversampling: float = 4.0
+    # Offline stand-ins (app.fakes): "all" or a comma list of openai, search, document_intelligence, durable
+    fake_services: str = ""
+    fake_latency_ms: float = 0.0
+    fake_latency_jitter_ms: float = 0.0
+    fake_error_rate: float = 0.0
+    fake_seed: Optional[int] = None
+    fake_document_pages: int = 3
+    fake_document_paragraphs: int = 0
+    fake_durable_stage_seconds: float = 1.0
 
     class Config:
         env_file = BASE_DIR.parent / ".env"
         env_file_encoding = "utf-8"
 
+    def uses_fake(self, service: str) -> bool:
+        names = {name.strip().lower() for name in self.fake_services.split(",") if name.strip()}
+        return "all" in names or service in names
+
 
 settings = Settings()
 
@@ -53,3 +103,19 @@ else:
     settings.storage_dir = BASE_DIR / "storage"
 
 settings.storage_dir.mkdir(parents=True, exist_ok=True)
+
+# Payload store directory shared with the Durable Functions app (local Azurite stand-in)
+if settings.payload_store_dir:
+    payload_path = Path(settings.payload_store_dir)
+    if not payload_path.is_absolute():
+        payload_path = BASE_DIR.parent / payload_path
+    settings.payload_store_dir = payload_path
+
+# Local search indexes, shared with the Durable Functions app when SEARCH_BACKEND=local
+if settings.local_search_dir:
+    local_search_path = Path(settings.local_search_dir)
+    if not local_search_path.is_absolute():
+        local_search_path = BASE_DIR.parent / local_search_path
+    settings.local_search_dir = local_search_path
+else:
+    settings.local_search_dir = BASE_DIR / "search_indexes"
@@ -1,32 +1,63 @@
-"""Azure AI Search helpers for project-specific indexes."""
+"""Search index helpers for project-specific indexes (Azure AI Search or the local engine)."""
 from __future__ import annotations
 
+import functools
 import logging
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 
 from azure.core.credentials import AzureKeyCredential
 from azure.core.exceptions import AzureError, ResourceNotFoundError
 from azure.search.documents import SearchClient
 from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents.indexes.models import (
+    BinaryQuantizationCompression,
     HnswAlgorithmConfiguration,
+    HnswParameters,
+    RescoringOptions,
+    ScalarQuantizationCompression,
+    ScalarQuantizationParameters,
     SearchField,
     SearchFieldDataType,
     SearchIndex,
     SearchableField,
+    SemanticConfiguration,
+    SemanticField,
+    SemanticPrioritizedFields,
+    SemanticSearch,
     SimpleField,
     VectorSearch,
+    VectorSearchCompressionRescoreStorageMethod,
+    VectorSearchCompressionTarget,
     VectorSearchProfile,
 )
+from azure.search.documents.models import QueryType, VectorizedQuery
 from openai import AzureOpenAI, OpenAIError
 
 from .config import settings
 from .document_intelligence import Chunk
+from .rate_limiter import estimate_tokens, get_rate_limiter
 
 logger = logging.getLogger(__name__)
 VECTOR_PROFILE_NAME = "content-vector-profile"
 VECTOR_ALGORITHM_NAME = "content-hnsw"
+VECTOR_COMPRESSION_NAME = "content-compression"
+VECTOR_PROFILES = ("full", "scalar", "binary")
+SEMANTIC_CONFIG_NAME = "semantic-config"
+SEARCH_MODES = ("text", "vector", "hybrid", "semantic")
+# Azure AI Search returns and accepts at most 1000 documents per search page / indexing batch
+DOCUMENT_BATCH_SIZE = 1000
+# File ids per `search.in` filter when deleting the chunks of many files
+DELETE_FILTER_BATCH_SIZE = 200
+# Deletes become visible to queries within about a second; re-query this often, this many times
+DELETE_REFRESH_SECONDS = 1.0
+DELETE_MAX_STALE_READS = 10
+# Original file name, returned with hits so research answers can cite it
+FILE_NAME_FIELD = SimpleField(name="file_name", type=SearchFieldDataType.String)
 
 
 class SearchServiceNotConfigured(RuntimeError):
@@ -37,85 +68,542 @@ class SearchIndexError(RuntimeError):
     """General wrapper for indexing failures."""
 
 
-class AzureSearchService:
-    """High-level helper for ensuring indexes and uploading chunk documents."""
+class SemanticSearchUnavailable(SearchIndexError):
+    """The index has no semantic configuration and could not be given one."""
+
+
+@dataclass(frozen=True)
+class VectorProfile:
+    """
+    How a project index stores `content_vector`.
+
+    `quantization` is "full" (float32), "scalar" (int8) or "binary" (1 bit per dimension);
+    `dimensions` below the model's native size are requested from the embeddings API.
+    The HNSW parameters and the rescoring oversampling only apply to Azure AI Search.
+    """
+
+    quantization: str = "full"
+    dimensions: int = 1536
+    hnsw_m: int = 4
+    hnsw_ef_construction: int = 400
+    hnsw_ef_search: int = 500
+    rescore_oversampling: float = 4.0
+
+    @classmethod
+    def for_project(cls, project: Any) -> "VectorProfile":
+        """Profile of a stored project; projects created before profiles use full precision."""
+        return cls(
+            quantization=project.vector_profile or "full",
+            dimensions=project.embedding_dimensions or settings.azure_openai_embedding_dimensions,
+            hnsw_m=project.hnsw_m or settings.vector_hnsw_m,
+            hnsw_ef_construction=project.hnsw_ef_construction or settings.vector_hnsw_ef_construction,
+            hnsw_ef_search=project.hnsw_ef_search or settings.vector_hnsw_ef_search,
+            rescore_oversampling=project.rescore_oversampling or settings.vector_rescore_oversampling,
+        )
+
+    @classmethod
+    def default(cls) -> "VectorProfile":
+        return cls(
+            quantization=settings.vector_profile,
+            dimensions=settings.azure_openai_embedding_dimensions,
+            hnsw_m=settings.vector_hnsw_m,
+            hnsw_ef_construction=settings.vector_hnsw_ef_construction,
+            hnsw_ef_search=settings.vector_hnsw_ef_search,
+            rescore_oversampling=settings.vector_rescore_oversampling,
+        )
+
+    @property
+    def embedding_dimensions(self) -> Optional[int]:
+        """`dimensions` argument for the embeddings call; None keeps the model's native size."""
+        if self.dimensions == settings.azure_openai_embedding_dimensions:
+            return None
+        return self.dimensions
+
+
+class SearchBackend(ABC):
+    """Index storage behind `AzureSearchService`: Azure AI Search or the local engine."""
+
+    @abstractmethod
+    def ensure_index(self, index_name: str, profile: VectorProfile) -> None:
+        ...
+
+    @abstractmethod
+    def index_exists(self, index_name: str) -> bool:
+        ...
+
+    @abstractmethod
+    def upload_documents(self, index_name: str, documents: List[Dict[str, object]]) -> None:
+        ...
+
+    @abstractmethod
+    def delete_documents(self, index_name: str, filter_expression: str) -> int:
+        """Delete the documents matching an OData filter; returns how many were deleted."""
+
+    @abstractmethod
+    def delete_index(self, index_name: str) -> None:
+        ...
+
+    @abstractmethod
+    def search(
+        self,
+        index_name: str,
+        query: str,
+        query_vector: Optional[List[float]],
+        mode: str,
+        *,
+        filter_expression: Optional[str] = None,
+        top: int = 10,
+        skip: int = 0,
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Ranked hits (documents plus `@search.score`/`@search.reranker_score`); empty if the index does not exist."""
+
+
+class AzureSearchBackend(SearchBackend):
+    """Azure AI Search indexes (or the in-memory fake with FAKE_SERVICES=search)."""
 
     def __init__(self) -> None:
-        if not settings.azure_ai_search_endpoint or not settings.azure_ai_search_api_key:
+        if settings.uses_fake("search"):
+            from .fakes import FakeSearchIndexClient
+
+            self._index_client = FakeSearchIndexClient()
+        elif not settings.azure_ai_search_endpoint or not settings.azure_ai_search_api_key:
             raise SearchServiceNotConfigured("AZURE_AI_SEARCH_ENDPOINT/API_KEY must be configured.")
-        if (
-            not settings.azure_openai_endpoint
-            or not settings.azure_openai_api_key
-            or not settings.azure_openai_embedding_deployment
-        ):
-            raise SearchServiceNotConfigured(
-                "Azure OpenAI endpoint, API key, and embedding deployment must be configured."
+        else:
+            self._index_client = SearchIndexClient(
+                endpoint=settings.azure_ai_search_endpoint,
+                credential=AzureKeyCredential(settings.azure_ai_search_api_key),
             )
-
-        self._index_client = SearchIndexClient(
-            endpoint=settings.azure_ai_search_endpoint,
-            credential=AzureKeyCredential(settings.azure_ai_search_api_key),
-        )
         self._search_clients: Dict[str, SearchClient] = {}
-        self._openai = AzureOpenAI(
-            api_key=settings.azure_openai_api_key,
-            azure_endpoint=settings.azure_openai_endpoint,
-            api_version=settings.azure_openai_api_version,
-        )
-        self._embedding_model = settings.azure_openai_embedding_deployment
-        self._vector_dimensions = settings.azure_openai_embedding_dimensions
+        # Whether each index has the semantic configuration, once checked (and upgraded) in this process
+        self._semantic_indexes: Dict[str, bool] = {}
 
-    def ensure_index(self, index_name: str) -> None:
+    def ensure_index(self, index_name: str, profile: VectorProfile) -> None:
         try:
-            self._index_client.get_index(index_name)
-            return
+            existing = self._index_client.get_index(index_name)
         except ResourceNotFoundError:
-            pass
+            existing = None
+        if existing is not None:
+            # Checked (and upgraded if possible) once per process: a service without semantic
+            # ranking rejects the update every time, so do not retry it on every ingestion
+            if index_name not in self._semantic_indexes:
+                self._semantic_indexes[index_name] = self._upgrade_index(existing)
+            return
 
+        compact = profile.quantization != "full"
         fields = [
             SimpleField(name="id", type=SearchFieldDataType.String, key=True),
             SearchableField(name="content", type=SearchFieldDataType.String, analyzer_name="en.lucene"),
             SimpleField(name="project_id", type=SearchFieldDataType.String, filterable=True, sortable=True),
             SimpleField(name="source_file_id", type=SearchFieldDataType.String, filterable=True, sortable=True),
+            FILE_NAME_FIELD,
             SimpleField(name="page_number", type=SearchFieldDataType.Int32, filterable=True, sortable=True),
             SimpleField(name="created_at", type=SearchFieldDataType.DateTimeOffset, filterable=True, sortable=True),
             SearchField(
                 name="content_vector",
                 type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
                 searchable=True,
-                vector_search_dimensions=self._vector_dimensions,
+                vector_search_dimensions=profile.dimensions,
                 vector_search_profile_name=VECTOR_PROFILE_NAME,
+                # Quantized indexes never return vectors: skip the retrievable copy
+                hidden=True if compact else None,
+                stored=False if compact else None,
             ),
         ]
 
+        compression = self._vector_compression(profile)
         vector_search = VectorSearch(
             profiles=[
                 VectorSearchProfile(
                     name=VECTOR_PROFILE_NAME,
                     algorithm_configuration_name=VECTOR_ALGORITHM_NAME,
+                    compression_name=compression.compression_name if compression else None,
                 )
             ],
             algorithms=[
                 HnswAlgorithmConfiguration(
                     name=VECTOR_ALGORITHM_NAME,
-                    metric="cosine",
+                    parameters=HnswParameters(
+                        m=profile.hnsw_m,
+                        ef_construction=profile.hnsw_ef_construction,
+                        ef_search=profile.hnsw_ef_search,
+                        metric="cosine",
+                    ),
                 )
             ],
+            compressions=[compression] if compression else None,
         )
 
-        index = SearchIndex(name=index_name, fields=fields, vector_search=vector_search)
+        index = SearchIndex(
+            name=index_name, fields=fields, vector_search=vector_search, semantic_search=self._semantic_search()
+        )
         try:
             self._index_client.create_or_update_index(index)
-            logger.info("Created Azure AI Search index '%s'", index_name)
+            self._semantic_indexes[index_name] = True
+            logger.info(
+                "Created Azure AI Search index '%s' (%s vectors, %s dimensions)",
+                index_name,
+                profile.quantization,
+                profile.dimensions,
+            )
+        except AzureError as exc:
+            raise SearchIndexError(f"Failed to create index '{index_name}'") from exc
+
+    @staticmethod
+    def _vector_compression(profile: VectorProfile) -> Optional[Any]:
+        """Quantization for `content_vector`; candidates are rescored with the preserved originals."""
+        if profile.quantization == "full":
+            return None
+        rescoring = RescoringOptions(
+            enable_rescoring=True,
+            default_oversampling=profile.rescore_oversampling,
+            rescore_storage_method=VectorSearchCompressionRescoreStorageMethod.PRESERVE_ORIGINALS,
+        )
+        if profile.quantization == "scalar":
+            return ScalarQuantizationCompression(
+                compression_name=VECTOR_COMPRESSION_NAME,
+                rescoring_options=rescoring,
+                parameters=ScalarQuantizationParameters(quantized_data_type=VectorSearchCompressionTarget.INT8),
+            )
+        if profile.quantization == "binary":
+            return BinaryQuantizationCompression(compression_name=VECTOR_COMPRESSION_NAME, rescoring_options=rescoring)
+        raise SearchIndexError(f"Unknown vector profile: {profile.quantization}")
+
+    @staticmethod
+    def _semantic_search() -> SemanticSearch:
+        return SemanticSearch(
+            configurations=[
+                SemanticConfiguration(
+                    name=SEMANTIC_CONFIG_NAME,
+                    prioritized_fields=SemanticPrioritizedFields(content_fields=[SemanticField(field_name="content")]),
+                )
+            ]
+        )
+
+    def _upgrade_index(self, index: SearchIndex) -> bool:
+        """
+        Add what was introduced after the index was created (the `file_name` field and the
+        semantic configuration); both are allowed in-place updates. Returns whether the
+        index has the semantic configuration afterwards.
+        """
+        has_file_name = any(field.name == FILE_NAME_FIELD.name for field in index.fields or [])
+        configurations = index.semantic_search.configurations if index.semantic_search else None
+        has_semantic = any(config.name == SEMANTIC_CONFIG_NAME for config in configurations or [])
+        if has_file_name and has_semantic:
+            return True
+
+        if not has_file_name:
+            index.fields = [*(index.fields or []), FILE_NAME_FIELD]
+        if not has_semantic:
+            index.semantic_search = SemanticSearch(
+                configurations=[*(configurations or []), *self._semantic_search().configurations]
+            )
+            try:
+                self._index_client.create_or_update_index(index)
+                logger.info("Upgraded Azure AI Search index '%s' with the semantic configuration", index.name)
+                return True
+            except AzureError as exc:
+                # Semantic ranking may not be enabled on this service: still add the missing field
+                logger.warning("Could not add a semantic configuration to index '%s': %s", index.name, exc)
+                index.semantic_search = SemanticSearch(configurations=configurations) if configurations else None
+                if has_file_name:
+                    return False
+        try:
+            self._index_client.create_or_update_index(index)
+            logger.info("Added field '%s' to Azure AI Search index '%s'", FILE_NAME_FIELD.name, index.name)
+        except AzureError as exc:
+            raise SearchIndexError(f"Failed to update index '{index.name}'") from exc
+        return has_semantic
+
+    def _has_semantic_config(self, index_name: str) -> bool:
+        if index_name not in self._semantic_indexes:
+            try:
+                index = self._index_client.get_index(index_name)
+            except ResourceNotFoundError:
+                return True
+            except AzureError as exc:
+                raise SearchIndexError(f"Failed to read index '{index_name}'") from exc
+            self._semantic_indexes[index_name] = self._upgrade_index(index)
+        return self._semantic_indexes[index_name]
+
+    def index_exists(self, index_name: str) -> bool:
+        if index_name in self._search_clients:
+            return True
+        try:
+            self._index_client.get_index(index_name)
+        except ResourceNotFoundError:
+            return False
+        return True
+
+    def upload_documents(self, index_name: str, documents: List[Dict[str, object]]) -> None:
+        client = self._get_search_client(index_name)
+        try:
+            client.upload_documents(documents)
+        except AzureError as exc:
+            raise SearchIndexError(f"Failed to upload documents to index '{index_name}'") from exc
+
+    def delete_documents(self, index_name: str, filter_expression: str) -> int:
+        client = self._get_search_client(index_name)
+        try:
+            # Unordered "*" results are not stable across skip pages, so always read the first
+            # page, delete it and query again until the filter matches nothing
+            deleted: Set[str] = set()
+            stale_reads = 0
+            while True:
+                ids = [
+                    doc["id"]
+                    for doc in client.search(
+                        search_text="*",
+                        filter=filter_expression,
+                        select=["id"],
+                        top=DOCUMENT_BATCH_SIZE,
+                        include_total_count=False,
+                    )
+                ]
+                if not ids:
+                    return len(deleted)
+                if deleted.issuperset(ids):
+                    # Deletes are applied asynchronously: give the index time to catch up
+                    time.sleep(DELETE_REFRESH_SECONDS)
+                    stale_reads += 1
+                    if stale_reads > DELETE_MAX_STALE_READS:
+                        raise SearchIndexError(
+                            f"Documents matching {filter_expression} are still returned after deletion"
+                        )
+                    continue
+                stale_reads = 0
+                client.delete_documents(documents=[{"id": doc_id} for doc_id in ids])
+                deleted.update(ids)
+        except AzureError as exc:
+            raise SearchIndexError(f"Failed to delete documents matching {filter_expression}") from exc
+
+    def delete_index(self, index_name: str) -> None:
+        self._search_clients.pop(index_name, None)
+        self._semantic_indexes.pop(index_name, None)
+        try:
+            self._index_client.delete_index(index_name)
+            logger.info("Deleted Azure AI Search index '%s'", index_name)
+        except ResourceNotFoundError:
+            logger.info("Index '%s' did not exist; nothing to delete", index_name)
+        except AzureError as exc:
+            raise SearchIndexError(f"Failed to delete index '{index_name}'") from exc
+
+    def search(
+        self,
+        index_name: str,
+        query: str,
+        query_vector: Optional[List[float]],
+        mode: str,
+        *,
+        filter_expression: Optional[str] = None,
+        top: int = 10,
+        skip: int = 0,
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        kwargs: Dict[str, Any] = {"filter": filter_expression, "top": top, "skip": skip, "select": select}
+        if mode != "text":
+            kwargs["vector_queries"] = [
+                VectorizedQuery(vector=query_vector, k_nearest_neighbors=top + skip, fields="content_vector")
+            ]
+        if mode == "semantic":
+            if not self._has_semantic_config(index_name):
+                raise SemanticSearchUnavailable(f"Semantic search is not available for index '{index_name}'")
+            kwargs["query_type"] = QueryType.SEMANTIC
+            kwargs["semantic_configuration_name"] = SEMANTIC_CONFIG_NAME
+
+        client = self._get_search_client(index_name)
+        try:
+            results = client.search(search_text=None if mode == "vector" else query, **kwargs)
+            return [dict(result) for result in results]
+        except ResourceNotFoundError:
+            return []
         except AzureError as exc:
+            raise SearchIndexError(f"Search failed on index '{index_name}'") from exc
+
+    def _get_search_client(self, index_name: str) -> SearchClient:
+        if index_name not in self._search_clients:
+            self._search_clients[index_name] = self._index_client.get_search_client(index_name)
+        return self._search_clients[index_name]
+
+
+class LocalSearchBackend(SearchBackend):
+    """Memory-mapped NumPy indexes under `LOCAL_SEARCH_DIR` (see `app.local_search`)."""
+
+    def __init__(self) -> None:
+        from .local_search import LocalSearchEngine
+
+        self.engine = LocalSearchEngine(
+            settings.local_search_dir,
+            ivf_min_documents=settings.local_search_ivf_min_documents,
+            ivf_probes=settings.local_search_ivf_probes,
+        )
+
+    def ensure_index(self, index_name: str, profile: VectorProfile) -> None:
+        # Vectors are kept as float32; only the reduced dimensions apply locally
+        try:
+            self.engine.index(index_name).create(profile.dimensions)
+        except (OSError, ValueError, sqlite3.Error) as exc:
             raise SearchIndexError(f"Failed to create index '{index_name}'") from exc
 
-    def upload_chunks(self, index_name: str, project_id: str, file_id: str, chunks: Sequence[Chunk]) -> None:
+    def index_exists(self, index_name: str) -> bool:
+        return self.engine.index(index_name).exists()
+
+    def upload_documents(self, index_name: str, documents: List[Dict[str, object]]) -> None:
+        try:
+            self.engine.index(index_name).upsert(documents)
+        except (OSError, ValueError, sqlite3.Error) as exc:
+            raise SearchIndexError(f"Failed to upload documents to index '{index_name}'") from exc
+
+    def delete_documents(self, index_name: str, filter_expression: str) -> int:
+        from .local_search import compile_filter
+
+        try:
+            return self.engine.index(index_name).delete_where(compile_filter(filter_expression))
+        except (OSError, ValueError, sqlite3.Error) as exc:
+            raise SearchIndexError(f"Failed to delete documents matching {filter_expression}") from exc
+
+    def search(
+        self,
+        index_name: str,
+        query: str,
+        query_vector: Optional[List[float]],
+        mode: str,
+        *,
+        filter_expression: Optional[str] = None,
+        top: int = 10,
+        skip: int = 0,
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        index = self.engine.index(index_name)
+        if not index.exists():
+            return []
+        depth = top + skip
+        try:
+            if mode == "text":
+                hits = index.text_search(query, depth, filter_expression, select)
+            elif mode == "vector":
+                hits = index.search(query_vector, depth, filter_expression, select)
+            else:
+                # No semantic ranker locally: semantic queries use the hybrid BM25 + vector fusion
+                hits = index.hybrid_search(query, query_vector, depth, filter_expression, select)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError, sqlite3.Error) as exc:
+            raise SearchIndexError(f"Search failed on index '{index_name}'") from exc
+        return hits[skip:]
+
+    def delete_index(self, index_name: str) -> None:
+        try:
+            if self.engine.drop(index_name):
+                logger.info("Deleted local search index '%s'", index_name)
+            else:
+                logger.info("Index '%s' did not exist; nothing to delete", index_name)
+        except OSError as exc:
+            raise SearchIndexError(f"Failed to delete index '{index_name}'") from exc
+
+
+class MirroredSearchBackend(SearchBackend):
+    """
+    Writes go to the primary backend and then to a local mirror, so the research
+    activities can fall back to the local index when the primary is throttled.
+    Mirror failures are logged and never fail ingestion.
+    """
+
+    def __init__(self, primary: SearchBackend, mirror: SearchBackend) -> None:
+        self.primary = primary
+        self.mirror = mirror
+
+    def _mirror(self, operation: str, index_name: str, *args) -> None:
+        try:
+            getattr(self.mirror, operation)(index_name, *args)
+        except SearchIndexError as exc:
+            logger.warning("Local mirror %s failed for index %s: %s", operation, index_name, exc)
+
+    def ensure_index(self, index_name: str, profile: VectorProfile) -> None:
+        self.primary.ensure_index(index_name, profile)
+        self._mirror("ensure_index", index_name, profile)
+
+    def index_exists(self, index_name: str) -> bool:
+        return self.primary.index_exists(index_name)
+
+    def upload_documents(self, index_name: str, documents: List[Dict[str, object]]) -> None:
+        self.primary.upload_documents(index_name, documents)
+        self._mirror("upload_documents", index_name, documents)
+
+    def delete_documents(self, index_name: str, filter_expression: str) -> int:
+        deleted = self.primary.delete_documents(index_name, filter_expression)
+        if self.mirror.index_exists(index_name):
+            self._mirror("delete_documents", index_name, filter_expression)
+        return deleted
+
+    def delete_index(self, index_name: str) -> None:
+        self.primary.delete_index(index_name)
+        self._mirror("delete_index", index_name)
+
+    def search(self, index_name: str, query: str, query_vector: Optional[List[float]], mode: str, **kwargs: Any):
+        return self.primary.search(index_name, query, query_vector, mode, **kwargs)
+
+
+class AzureSearchService:
+    """High-level helper for ensuring indexes and uploading chunk documents."""
+
+    def __init__(self, backend: Optional[SearchBackend] = None) -> None:
+        if backend is not None:
+            self._backend = backend
+        elif settings.search_backend.lower() == "local":
+            self._backend = LocalSearchBackend()
+        elif settings.local_search_fallback:
+            self._backend = MirroredSearchBackend(AzureSearchBackend(), LocalSearchBackend())
+        else:
+            self._backend = AzureSearchBackend()
+
+        if settings.uses_fake("openai"):
+            from .fakes import FakeAzureOpenAI
+
+            self._openai = FakeAzureOpenAI(dimensions=settings.azure_openai_embedding_dimensions)
+        elif (
+            not settings.azure_openai_endpoint
+            or not settings.azure_openai_api_key
+            or not settings.azure_openai_embedding_deployment
+        ):
+            raise SearchServiceNotConfigured(
+                "Azure OpenAI endpoint, API key, and embedding deployment must be configured."
+            )
+        else:
+            # Retries are left to the shared rate limiter, which paces them against the quota
+            self._openai = AzureOpenAI(
+                api_key=settings.azure_openai_api_key,
+                azure_endpoint=settings.azure_openai_endpoint,
+                api_version=settings.azure_openai_api_version,
+                max_retries=0,
+            )
+
+        self._embedding_model = settings.azure_openai_embedding_deployment or "fake-embedding"
+        # Interactive searches repeat queries (paging, mode switches); embed each text once
+        self._embed_query = functools.lru_cache(maxsize=settings.query_embedding_cache_size)(self._embed_query_uncached)
+
+    @property
+    def backend(self) -> SearchBackend:
+        return self._backend
+
+    def ensure_index(self, index_name: str, profile: Optional[VectorProfile] = None) -> None:
+        self._backend.ensure_index(index_name, profile or VectorProfile.default())
+
+    def upload_chunks(
+        self,
+        index_name: str,
+        project_id: str,
+        file_id: str,
+        chunks: Sequence[Chunk],
+        file_name: Optional[str] = None,
+        profile: Optional[VectorProfile] = None,
+    ) -> None:
         if not chunks:
             raise SearchIndexError("No chunks supplied for indexing.")
 
-        self.ensure_index(index_name)
-        vectors = self._embed_texts([chunk.content for chunk in chunks])
+        profile = profile or VectorProfile.default()
+        self.ensure_index(index_name, profile)
+        vectors = self._embed_texts([chunk.content for chunk in chunks], profile.embedding_dimensions)
         documents: List[Dict[str, object]] = []
         timestamp = datetime.now(timezone.utc).isoformat()
 
@@ -126,6 +614,7 @@ class AzureSearchService:
                     "id": doc_id,
                     "project_id": project_id,
                     "source_file_id": file_id,
+                    "file_name": file_name or "",
                     "content": chunk.content,
                     "content_vector": embedding,
                     "page_number": chunk.page_number or 0,
@@ -133,51 +622,72 @@ class AzureSearchService:
                 }
             )
 
-        client = self._get_search_client(index_name)
-        try:
-            client.upload_documents(documents)
-        except AzureError as exc:
-            raise SearchIndexError(f"Failed to upload documents to index '{index_name}'") from exc
+        self._backend.upload_documents(index_name, documents)
 
     def delete_file_chunks(self, index_name: str, file_id: str) -> None:
-        client = self._get_search_client(index_name, ensure_exists=False)
-        if client is None:
+        if not self._backend.index_exists(index_name):
             return
 
         filter_value = self._escape_filter_value(file_id)
-        
-        try:
-            results = client.search(
-                search_text="*",
-                filter=f"source_file_id eq '{filter_value}'",
-                select=["id"],
-                top=1000,
-                include_total_count=False,
-            )
-            
-            # Convert results to list to avoid pagination issues
-            batch = [{"id": doc["id"]} for doc in list(results)]
-            
-            if batch:
-                client.delete_documents(documents=batch)
-                logger.info("Deleted %s chunk(s) for file %s in index %s", len(batch), file_id, index_name)
-        except AzureError as exc:
-            raise SearchIndexError(f"Failed to delete chunks for file {file_id}") from exc
+        deleted = self._backend.delete_documents(index_name, f"source_file_id eq '{filter_value}'")
+        if deleted:
+            logger.info("Deleted %s chunk(s) for file %s in index %s", deleted, file_id, index_name)
+
+    def delete_files_chunks(self, index_name: str, file_ids: Sequence[str]) -> int:
+        """Delete the chunks of many files with one `search.in` filter per batch of ids."""
+        if not file_ids or not self._backend.index_exists(index_name):
+            return 0
+
+        deleted = 0
+        for start in range(0, len(file_ids), DELETE_FILTER_BATCH_SIZE):
+            batch = file_ids[start : start + DELETE_FILTER_BATCH_SIZE]
+            values = ",".join(self._escape_filter_value(file_id) for file_id in batch)
+            deleted += self._backend.delete_documents(index_name, f"search.in(source_file_id, '{values}', ',')")
+        logger.info("Deleted %s chunk(s) for %s file(s) in index %s", deleted, len(file_ids), index_name)
+        return deleted
 
     def delete_index(self, index_name: str) -> None:
-        try:
-            self._index_client.delete_index(index_name)
-            logger.info("Deleted Azure AI Search index '%s'", index_name)
-        except ResourceNotFoundError:
-            logger.info("Index '%s' did not exist; nothing to delete", index_name)
-        except AzureError as exc:
-            raise SearchIndexError(f"Failed to delete index '{index_name}'") from exc
+        self._backend.delete_index(index_name)
+
+    def search(
+        self,
+        index_name: str,
+        query: str,
+        mode: str = "hybrid",
+        *,
+        filter_expression: Optional[str] = None,
+        top: int = 10,
+        skip: int = 0,
+        select: Optional[Sequence[str]] = None,
+        profile: Optional[VectorProfile] = None,
+    ) -> List[Dict[str, Any]]:
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        dimensions = (profile or VectorProfile.default()).embedding_dimensions
+        query_vector = None if mode == "text" else list(self._embed_query(query, dimensions))
+        return self._backend.search(
+            index_name,
+            query,
+            query_vector,
+            mode,
+            filter_expression=filter_expression,
+            top=top,
+            skip=skip,
+            select=select,
+        )
+
+    def _embed_query_uncached(self, text: str, dimensions: Optional[int] = None) -> Tuple[float, ...]:
+        return tuple(self._embed_texts([text], dimensions)[0])
 
-    def _embed_texts(self, texts: Sequence[str]) -> List[List[float]]:
+    def _embed_texts(self, texts: Sequence[str], dimensions: Optional[int] = None) -> List[List[float]]:
+        # Reduced dimensions are only sent when requested; older models reject the argument
+        extra = {"dimensions": dimensions} if dimensions else {}
+        inputs = list(texts)
         try:
-            response = self._openai.embeddings.create(
-                model=self._embedding_model,
-                input=list(texts),
+            response = get_rate_limiter().call(
+                lambda: self._openai.embeddings.create(model=self._embedding_model, input=inputs, **extra),
+                tokens=sum(estimate_tokens(text) for text in inputs),
+                usage=lambda result: result.usage.total_tokens,
             )
         except OpenAIError as exc:
             raise SearchIndexError("Failed to generate embeddings for content chunks") from exc
@@ -185,23 +695,6 @@ class AzureSearchService:
         ordered = sorted(response.data, key=lambda item: item.index)
         return [item.embedding for item in ordered]
 
-    def _get_search_client(self, index_name: str, *, ensure_exists: bool = True) -> Optional[SearchClient]:
-        if ensure_exists:
-            self.ensure_index(index_name)
-        elif index_name not in self._search_clients:
-            try:
-                self._index_client.get_index(index_name)
-            except ResourceNotFoundError:
-                return None
-
-        if index_name not in self._search_clients:
-            self._search_clients[index_name] = SearchClient(
-                endpoint=settings.azure_ai_search_endpoint,
-                index_name=index_name,
-                credential=AzureKeyCredential(settings.azure_ai_search_api_key),
-            )
-        return self._search_clients[index_name]
-
     @staticmethod
     def _escape_filter_value(value: str) -> str:
         return value.replace("'", "''")
@@ -225,7 +718,12 @@ _SEARCH_SERVICE: Optional[AzureSearchService] = None
 _SEARCH_SERVICE_INITIALIZED = False
 
 __all__ = [
+    "SEARCH_MODES",
+    "AzureSearchBackend",
     "AzureSearchService",
+    "LocalSearchBackend",
+    "MirroredSearchBackend",
+    "SearchBackend",
     "SearchIndexError",
     "SearchServiceNotConfigured",
     "get_search_service",
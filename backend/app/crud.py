@@ -6,10 +6,16 @@ from typing import List, Optional
 from sqlalchemy.orm import Session, selectinload
 
 from . import models
+from .config import settings
+
+PROJECT_DELETING = "DELETING"
 
 
 def _project_name_exists(db: Session, name: str, exclude_project_id: Optional[str] = None) -> bool:
-    query = db.query(models.Project.project_id).filter(models.Project.project_name == name)
+    # Names of projects being deleted are free again
+    query = db.query(models.Project.project_id).filter(
+        models.Project.project_name == name, models.Project.status.is_(None)
+    )
     if exclude_project_id:
         query = query.filter(models.Project.project_id != exclude_project_id)
     return query.first() is not None
@@ -27,12 +33,27 @@ def generate_unique_project_name(
     return candidate
 
 
-def create_project(db: Session, name: str) -> models.Project:
+def create_project(
+    db: Session,
+    name: str,
+    vector_profile: Optional[str] = None,
+    embedding_dimensions: Optional[int] = None,
+    hnsw_m: Optional[int] = None,
+    hnsw_ef_construction: Optional[int] = None,
+    hnsw_ef_search: Optional[int] = None,
+    rescore_oversampling: Optional[float] = None,
+) -> models.Project:
     unique_name = generate_unique_project_name(db, name)
     project = models.Project(
         project_id=str(uuid4()),
         project_name=unique_name,
         index_name=f"idx-{uuid4().hex[:8]}",
+        vector_profile=vector_profile or settings.vector_profile,
+        embedding_dimensions=embedding_dimensions or settings.azure_openai_embedding_dimensions,
+        hnsw_m=hnsw_m or settings.vector_hnsw_m,
+        hnsw_ef_construction=hnsw_ef_construction or settings.vector_hnsw_ef_construction,
+        hnsw_ef_search=hnsw_ef_search or settings.vector_hnsw_ef_search,
+        rescore_oversampling=rescore_oversampling or settings.vector_rescore_oversampling,
         last_modified=datetime.utcnow(),
     )
     db.add(project)
@@ -42,18 +63,25 @@ def create_project(db: Session, name: str) -> models.Project:
 
 
 def list_projects(db: Session) -> List[models.Project]:
-    return db.query(models.Project).order_by(models.Project.created_at.desc()).all()
-
-
-def get_project(db: Session, project_id: str) -> Optional[models.Project]:
     return (
         db.query(models.Project)
-        .filter(models.Project.project_id == project_id)
-        .options(selectinload(models.Project.files))
-        .first()
+        .filter(models.Project.status.is_(None))
+        .order_by(models.Project.created_at.desc())
+        .all()
     )
 
 
+def get_project(db: Session, project_id: str, include_deleting: bool = False) -> Optional[models.Project]:
+    query = db.query(models.Project).filter(models.Project.project_id == project_id)
+    if not include_deleting:
+        query = query.filter(models.Project.status.is_(None))
+    return query.options(selectinload(models.Project.files)).first()
+
+
+def list_deleting_projects(db: Session) -> List[models.Project]:
+    return db.query(models.Project).filter(models.Project.status == PROJECT_DELETING).all()
+
+
 def update_project_name(db: Session, project: models.Project, name: str) -> models.Project:
     unique_name = generate_unique_project_name(db, name, exclude_project_id=project.project_id)
     project.project_name = unique_name
@@ -63,8 +91,21 @@ def update_project_name(db: Session, project: models.Project, name: str) -> mode
     return project
 
 
-def delete_project(db: Session, project: models.Project) -> None:
-    db.delete(project)
+def mark_project_deleting(db: Session, project: models.Project) -> models.Project:
+    project.status = PROJECT_DELETING
+    project.last_modified = datetime.utcnow()
+    db.commit()
+    db.refresh(project)
+    return project
+
+
+def delete_project(db: Session, project_id: str) -> None:
+    """Remove the project and its file rows in one transaction; agent runs are kept without a project."""
+    db.query(models.SourceFile).filter(models.SourceFile.project_id == project_id).delete(synchronize_session=False)
+    db.query(models.AgentRun).filter(models.AgentRun.project_id == project_id).update(
+        {models.AgentRun.project_id: None}, synchronize_session=False
+    )
+    db.query(models.Project).filter(models.Project.project_id == project_id).delete(synchronize_session=False)
     db.commit()
 
 
@@ -94,8 +135,22 @@ def get_source_file(db: Session, file_id: str) -> Optional[models.SourceFile]:
     )
 
 
-def delete_source_file(db: Session, source_file: models.SourceFile) -> None:
-    db.delete(source_file)
+def get_source_files(db: Session, file_ids: List[str]) -> List[models.SourceFile]:
+    return (
+        db.query(models.SourceFile)
+        .filter(models.SourceFile.file_id.in_(file_ids))
+        .options(selectinload(models.SourceFile.project))
+        .all()
+    )
+
+
+def delete_source_files(db: Session, source_files: List[models.SourceFile]) -> None:
+    """Delete many files in one transaction and touch their projects' last_modified."""
+    now = datetime.utcnow()
+    for project in {source_file.project for source_file in source_files if source_file.project}:
+        project.last_modified = now
+    file_ids = [source_file.file_id for source_file in source_files]
+    db.query(models.SourceFile).filter(models.SourceFile.file_id.in_(file_ids)).delete(synchronize_session=False)
     db.commit()
 
 
@@ -39,6 +39,11 @@ class DocumentIntelligenceService:
     """Wrapper around Azure Document Intelligence with markdown chunking helpers."""
 
     def __init__(self) -> None:
+        if settings.uses_fake("document_intelligence"):
+            from .fakes import FakeDocumentIntelligenceClient
+
+            self._client = FakeDocumentIntelligenceClient()
+            return
         if not settings.azure_document_intelligence_endpoint or not settings.azure_document_intelligence_api_key:
             raise DocumentIntelligenceNotConfigured(
                 "AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT/API_KEY must be configured."
@@ -0,0 +1,31 @@
+"""
+Offline stand-ins for the Azure services used by the API.
+
+The fakes mirror the SDK surface the services call (embeddings, search index
+and document clients, analyze pollers) or, for Durable Functions, its HTTP
+protocol, so `AzureSearchService`, `DocumentIntelligenceService` and
+`DurableFunctionClient` run unchanged on an isolated box or in CI. They are
+selected per service with the `FAKE_SERVICES` setting ("all" or a comma list of
+openai, search, document_intelligence, durable) and share the
+`FAKE_LATENCY_MS`/`FAKE_LATENCY_JITTER_MS`/`FAKE_ERROR_RATE` fault settings.
+"""
+from .document_intelligence import FakeDocumentIntelligenceClient, fake_layout_markdown
+from .durable import FakeDurableFunctionClient, FakeDurableRuntime, create_app, get_fake_durable_runtime
+from .embeddings import FakeAzureOpenAI, fake_embedding
+from .faults import FakeServiceError, FaultInjector
+from .search import FakeSearchClient, FakeSearchIndexClient
+
+__all__ = [
+    "FakeAzureOpenAI",
+    "FakeDocumentIntelligenceClient",
+    "FakeDurableFunctionClient",
+    "FakeDurableRuntime",
+    "FakeSearchClient",
+    "FakeSearchIndexClient",
+    "FakeServiceError",
+    "FaultInjector",
+    "create_app",
+    "fake_embedding",
+    "fake_layout_markdown",
+    "get_fake_durable_runtime",
+]
@@ -0,0 +1,75 @@
+"""Canned layout analysis standing in for Azure Document Intelligence."""
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+from types import SimpleNamespace
+from typing import Any, Optional
+
+from azure.core.exceptions import HttpResponseError
+
+from ..config import settings
+from .faults import FaultInjector
+
+PDF_PAGE_PATTERN = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_VOCABULARY = (
+    "emissions scope energy renewable supply chain governance board climate risk target reduction "
+    "water waste biodiversity employees safety diversity revenue investment disclosure framework "
+    "assessment strategy performance baseline intensity operations facilities suppliers customers "
+    "report year company policy management metrics progress commitment transition portfolio"
+).split()
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(_VOCABULARY) for _ in range(rng.randint(8, 18))]
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words)), f"{rng.randint(1, 99)}.{rng.randint(0, 9)}%")
+    return " ".join(words).capitalize() + "."
+
+
+def fake_layout_markdown(data: bytes, pages: Optional[int] = None) -> str:
+    """
+    Deterministic layout markdown for a document: per page a `<pageNum>` marker,
+    a heading, FAKE_DOCUMENT_PARAGRAPHS paragraphs (3-6 when unset) and a small
+    table. The page count follows the PDF page objects when present, else
+    `pages` (or the FAKE_DOCUMENT_PAGES setting).
+    """
+    page_count = len(PDF_PAGE_PATTERN.findall(data)) or pages or settings.fake_document_pages
+    rng = random.Random(hashlib.sha256(data).digest())
+    blocks = []
+    for page in range(1, page_count + 1):
+        blocks.append(f"<pageNum>{page}</pageNum>")
+        blocks.append(f"## {' '.join(rng.choice(_VOCABULARY) for _ in range(3)).title()}")
+        for _ in range(settings.fake_document_paragraphs or rng.randint(3, 6)):
+            blocks.append(" ".join(_sentence(rng) for _ in range(rng.randint(3, 7))))
+        rows = [f"| {rng.choice(_VOCABULARY)} | {rng.randint(100, 9999)} | {rng.randint(100, 9999)} |" for _ in range(3)]
+        blocks.append("\n".join(["| Metric | 2023 | 2024 |", "| --- | --- | --- |", *rows]))
+    return "\n\n".join(blocks)
+
+
+def _analysis_error(message: str) -> HttpResponseError:
+    return HttpResponseError(message=message)
+
+
+class _FakeAnalyzePoller:
+    def __init__(self, content: str) -> None:
+        self._result = SimpleNamespace(content=content, content_format="markdown")
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        return self._result
+
+    def done(self) -> bool:
+        return True
+
+
+class FakeDocumentIntelligenceClient:
+    """Subset of `DocumentIntelligenceClient`: `begin_analyze_document` returning canned markdown."""
+
+    def __init__(self, faults: Optional[FaultInjector] = None) -> None:
+        self._faults = faults or FaultInjector.from_settings("document_intelligence", error_factory=_analysis_error)
+
+    def begin_analyze_document(self, model_id: str, body: Any = None, **_: Any) -> _FakeAnalyzePoller:
+        self._faults.before_call("begin_analyze_document")
+        data = body if isinstance(body, (bytes, bytearray)) else (body.read() if hasattr(body, "read") else b"")
+        return _FakeAnalyzePoller(fake_layout_markdown(bytes(data)))
@@ -0,0 +1,358 @@
+"""
+Durable Functions stand-in: a timed replica of the research orchestration.
+
+`FakeDurableRuntime` walks each instance through the stages of
+`report_seq_orchestrator` (task extraction, human approval, planning,
+research, report) with `FAKE_DURABLE_STAGE_SECONDS` per stage and a canned
+output. It is reachable in-process through `FakeDurableFunctionClient` or over
+the Durable HTTP API via `create_app()`:
+
+    uvicorn app.fakes.durable:create_app --factory --port 7071
+"""
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import FastAPI, Request, Response
+
+from ..config import settings
+from .faults import FakeServiceError, FaultInjector
+
+STATUS_PATH = "/runtime/webhooks/durabletask/instances"
+INSTANCE_ID_PATTERN = re.compile(r"/instances/(?P<instance_id>[^/?]+)")
+
+# (custom status message, progress) of each orchestration stage
+STAGES = [
+    ("'task extraction' in progress", 0.0),
+    ("'Human Approval' is needed", 0.1),
+    ("'planning' in progress", 0.25),
+    ("'research & summary' in progress", 0.5),
+    ("'report generation' in progress", 0.75),
+]
+APPROVAL_STAGE = 1
+REPORT_STAGE = 4
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _canned_topics(query: str) -> list:
+    subject = " ".join(query.split()[:8]) or "the research question"
+    return [
+        {
+            "topic": f"{aspect} of {subject}",
+            "search_type": "semantic",
+            "steps": [f"Find {aspect.lower()} data for {subject}", f"Summarize {aspect.lower()} trends for {subject}"],
+        }
+        for aspect in ("Background", "Key metrics", "Outlook")
+    ]
+
+
+def _canned_report(query: str, topics: list) -> str:
+    sections = "\n\n".join(
+        f"## {topic['topic']}\n\n"
+        + " ".join(f"{step}: offline placeholder finding (fake.pdf, page {index + 1})." for index, step in enumerate(topic["steps"]))
+        for topic in topics
+    )
+    return f"# Research report\n\n_Query:_ {query}\n\n{sections}\n\n## Conclusion\n\nGenerated by the offline Durable Functions stand-in.\n"
+
+
+class _FakeInstance:
+    def __init__(self, instance_id: str, name: str, client_input: Dict[str, Any]) -> None:
+        self.instance_id = instance_id
+        self.name = name
+        self.input = client_input
+        self.created_time = _now_iso()
+        self.last_updated_time = self.created_time
+        self.runtime_status = "Running"
+        self.stage = 0
+        self.stage_started = time.monotonic()
+        self.custom_status: Dict[str, Any] = {"message": STAGES[0][0], "progress": STAGES[0][1]}
+        self.output: Any = None
+        self.topics = _canned_topics(client_input.get("query", ""))
+        self.report = _canned_report(client_input.get("query", ""), self.topics)
+
+
+class FakeDurableRuntime:
+    """
+    Thread-safe registry of fake orchestration instances.
+
+    Instances advance on every read and on a background ticker, so the streamed
+    report artifact grows even when nobody polls the status endpoint.
+    """
+
+    def __init__(self, stage_seconds: float = 1.0, human_event: str = "HumanApproval") -> None:
+        self.stage_seconds = stage_seconds
+        self.human_event = human_event
+        self._instances: Dict[str, _FakeInstance] = {}
+        self._lock = threading.Lock()
+        self._ticker: Optional[threading.Thread] = None
+
+    def start(self, name: str, client_input: Dict[str, Any]) -> str:
+        instance_id = uuid.uuid4().hex
+        with self._lock:
+            self._instances[instance_id] = _FakeInstance(instance_id, name, client_input)
+            if self._ticker is None:
+                self._ticker = threading.Thread(target=self._tick, name="fake-durable-ticker", daemon=True)
+                self._ticker.start()
+        return instance_id
+
+    def _tick(self) -> None:
+        interval = min(max(self.stage_seconds / 10, 0.05), 0.5)
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                for instance in self._instances.values():
+                    self._advance(instance)
+
+    def status(self, instance_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            instance = self._instances.get(instance_id)
+            if instance is None:
+                return None
+            self._advance(instance)
+            return {
+                "name": instance.name,
+                "instanceId": instance.instance_id,
+                "runtimeStatus": instance.runtime_status,
+                "input": instance.input,
+                "customStatus": instance.custom_status,
+                "output": instance.output,
+                "createdTime": instance.created_time,
+                "lastUpdatedTime": instance.last_updated_time,
+            }
+
+    def raise_event(self, instance_id: str, event_name: str, payload: Any) -> Optional[bool]:
+        """Deliver an external event; None for unknown instances, False if the instance already finished."""
+        with self._lock:
+            instance = self._instances.get(instance_id)
+            if instance is None:
+                return None
+            self._advance(instance)
+            if instance.runtime_status != "Running":
+                return False
+            if event_name == self.human_event and instance.stage == APPROVAL_STAGE:
+                action = (payload or {}).get("action", "continue") if isinstance(payload, dict) else "continue"
+                if action == "continue":
+                    self._enter_stage(instance, APPROVAL_STAGE + 1)
+                else:
+                    instance.custom_status = {"message": "Orchestration terminated by user", "progress": 0.0}
+                    self._complete(instance, {"status": "terminated by user"})
+            return True
+
+    def terminate(self, instance_id: str, reason: str = "") -> Optional[bool]:
+        with self._lock:
+            instance = self._instances.get(instance_id)
+            if instance is None:
+                return None
+            if instance.runtime_status != "Running":
+                return False
+            instance.runtime_status = "Terminated"
+            instance.output = reason
+            instance.last_updated_time = _now_iso()
+            return True
+
+    def _enter_stage(self, instance: _FakeInstance, stage: int) -> None:
+        instance.stage = stage
+        instance.stage_started = time.monotonic()
+        instance.last_updated_time = _now_iso()
+        message, progress = STAGES[stage]
+        instance.custom_status = {"message": message, "progress": progress}
+        if stage == APPROVAL_STAGE:
+            tasks = "\n".join(f"- {topic['topic']}" for topic in instance.topics)
+            instance.custom_status["human_feedback"] = tasks
+
+    def _complete(self, instance: _FakeInstance, output: Any) -> None:
+        instance.runtime_status = "Completed"
+        instance.output = output
+        instance.last_updated_time = _now_iso()
+
+    def _advance(self, instance: _FakeInstance) -> None:
+        while instance.runtime_status == "Running" and instance.stage != APPROVAL_STAGE:
+            elapsed = time.monotonic() - instance.stage_started
+            if instance.stage == REPORT_STAGE:
+                self._write_report_stream(instance, min(elapsed / self.stage_seconds, 1.0) if self.stage_seconds else 1.0)
+            if elapsed < self.stage_seconds:
+                return
+            if instance.stage == REPORT_STAGE:
+                instance.custom_status = {"message": "'report generation' completed", "progress": 1.0}
+                self._complete(instance, self._output(instance))
+                return
+            self._enter_stage(instance, instance.stage + 1)
+
+    def _output(self, instance: _FakeInstance) -> Dict[str, Any]:
+        step_count = sum(len(topic["steps"]) for topic in instance.topics)
+        return {
+            "final_report": instance.report,
+            "report_input": {
+                "query": instance.input.get("query", ""),
+                "research_results": [
+                    {"topic": topic["topic"], "search_type": topic["search_type"], "summary": f"Summary of {topic['topic']}."}
+                    for topic in instance.topics
+                ],
+                "report_length": instance.input.get("report_length", "medium"),
+            },
+            "search_results": [
+                [{"query": step, "result": f"Offline result for '{step}'."} for step in topic["steps"]]
+                for topic in instance.topics
+            ],
+            "search_tasks": instance.topics,
+            "plan_stats": {"total_steps": step_count, "unique_searches": step_count, "searches_saved": 0},
+        }
+
+    def _write_report_stream(self, instance: _FakeInstance, fraction: float) -> None:
+        """Mimic the report writer's streamed artifact when a local payload store is configured."""
+        if not settings.payload_store_dir:
+            return
+        path = Path(settings.payload_store_dir) / "runs" / instance.instance_id / "report.md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(instance.report[: int(len(instance.report) * fraction)], encoding="utf-8")
+        if fraction >= 1.0:
+            path.with_name("report.md.done").touch()
+
+
+def _check_status_payload(base_url: str, instance_id: str) -> Dict[str, str]:
+    instance_url = f"{base_url.rstrip('/')}{STATUS_PATH}/{instance_id}"
+    return {
+        "id": instance_id,
+        "statusQueryGetUri": instance_url,
+        "sendEventPostUri": f"{instance_url}/raiseEvent/{{eventName}}",
+        "terminatePostUri": f"{instance_url}/terminate?reason={{text}}",
+        "purgeHistoryDeleteUri": instance_url,
+    }
+
+
+def _instance_id_from_url(url: str) -> str:
+    match = INSTANCE_ID_PATTERN.search(url)
+    if match is None:
+        raise ValueError(f"Not a Durable Functions instance URL: {url}")
+    return match["instance_id"]
+
+
+def _json_response(status_code: int, body: Any) -> httpx.Response:
+    return httpx.Response(status_code, json=body) if body is not None else httpx.Response(status_code)
+
+
+class FakeDurableFunctionClient:
+    """In-process replacement for `DurableFunctionClient` backed by the shared fake runtime."""
+
+    def __init__(self, runtime: Optional[FakeDurableRuntime] = None) -> None:
+        self.runtime = runtime or get_fake_durable_runtime()
+        self.base_url = settings.durable_functions_base_url.rstrip("/")
+        self.human_event_name = settings.durable_functions_human_event
+        self._faults = FaultInjector.from_settings("durable")
+
+    async def start_run(
+        self,
+        query: str,
+        report_length: str,
+        *,
+        orchestrator: Optional[str] = None,
+        topic_concurrency: Optional[int] = None,
+        research_mode: str = "standard",
+        bypass_cache: bool = False,
+        index_name: Optional[str] = None,
+        embedding_dimensions: Optional[int] = None,
+    ) -> dict:
+        await self._faults.before_call_async("start_run")
+        client_input = {
+            "query": query,
+            "report_length": report_length,
+            "topic_concurrency": topic_concurrency,
+            "research_mode": research_mode,
+            "bypass_cache": bypass_cache,
+            "index_name": index_name,
+            "embedding_dimensions": embedding_dimensions,
+        }
+        instance_id = self.runtime.start(orchestrator or "report_seq_orchestrator", client_input)
+        return _check_status_payload(self.base_url, instance_id)
+
+    async def get_status(self, status_url: str) -> httpx.Response:
+        await self._faults.before_call_async("get_status")
+        body = self.runtime.status(_instance_id_from_url(status_url))
+        if body is None:
+            return _json_response(404, None)
+        return _json_response(202 if body["runtimeStatus"] in ("Pending", "Running") else 200, body)
+
+    async def send_feedback(self, send_event_url: str, action: str) -> httpx.Response:
+        await self._faults.before_call_async("send_feedback")
+        delivered = self.runtime.raise_event(_instance_id_from_url(send_event_url), self.human_event_name, {"action": action})
+        return _json_response({None: 404, False: 410, True: 202}[delivered], None)
+
+
+_FAKE_DURABLE_RUNTIME: Optional[FakeDurableRuntime] = None
+_FAKE_DURABLE_RUNTIME_LOCK = threading.Lock()
+
+
+def get_fake_durable_runtime() -> FakeDurableRuntime:
+    global _FAKE_DURABLE_RUNTIME
+    if _FAKE_DURABLE_RUNTIME is None:
+        with _FAKE_DURABLE_RUNTIME_LOCK:
+            if _FAKE_DURABLE_RUNTIME is None:
+                _FAKE_DURABLE_RUNTIME = FakeDurableRuntime(
+                    stage_seconds=settings.fake_durable_stage_seconds,
+                    human_event=settings.durable_functions_human_event,
+                )
+    return _FAKE_DURABLE_RUNTIME
+
+
+def create_app() -> FastAPI:
+    """FastAPI app serving the Durable Functions HTTP API of the fake runtime."""
+    runtime = get_fake_durable_runtime()
+    faults = FaultInjector.from_settings("durable")
+    app = FastAPI(title="Fake Durable Functions host")
+
+    def respond(status_code: int, body: Any = None) -> Response:
+        content = json.dumps(body) if body is not None else None
+        return Response(content=content, status_code=status_code, media_type="application/json")
+
+    async def inject_faults(operation: str) -> Optional[Response]:
+        try:
+            await faults.before_call_async(operation)
+        except FakeServiceError as exc:
+            return respond(503, {"error": str(exc)})
+        return None
+
+    @app.api_route("/api/httptrigger", methods=["GET", "POST"])
+    async def http_start(request: Request):
+        failure = await inject_faults("start")
+        if failure is not None:
+            return failure
+        body = await request.json() if await request.body() else {}
+        instance_id = runtime.start(body.get("orchestrator", "report_seq_orchestrator"), body)
+        return respond(202, _check_status_payload(str(request.base_url), instance_id))
+
+    @app.get(STATUS_PATH + "/{instance_id}")
+    async def get_status(instance_id: str):
+        failure = await inject_faults("status")
+        if failure is not None:
+            return failure
+        body = runtime.status(instance_id)
+        if body is None:
+            return respond(404)
+        return respond(202 if body["runtimeStatus"] in ("Pending", "Running") else 200, body)
+
+    @app.post(STATUS_PATH + "/{instance_id}/raiseEvent/{event_name}")
+    async def raise_event(instance_id: str, event_name: str, request: Request):
+        failure = await inject_faults("raise_event")
+        if failure is not None:
+            return failure
+        payload = await request.json() if await request.body() else None
+        delivered = runtime.raise_event(instance_id, event_name, payload)
+        return respond({None: 404, False: 410, True: 202}[delivered])
+
+    @app.post(STATUS_PATH + "/{instance_id}/terminate")
+    async def terminate(instance_id: str, reason: str = ""):
+        terminated = runtime.terminate(instance_id, reason)
+        return respond({None: 404, False: 410, True: 202}[terminated])
+
+    return app
@@ -0,0 +1,76 @@
+"""Deterministic embeddings client standing in for Azure OpenAI."""
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import List, Sequence, Union
+
+import httpx
+from openai import APIConnectionError
+
+from .faults import FaultInjector
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=65536)
+def _feature_slot(feature: str, dimensions: int) -> tuple[int, float]:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % dimensions, 1.0 if value >> 63 else -1.0
+
+
+def fake_embedding(text: str, dimensions: int = 1536) -> List[float]:
+    """
+    Signed feature hashing of word unigrams and bigrams, L2-normalized.
+
+    Equal texts get equal vectors and texts sharing words get a positive cosine
+    similarity, which is enough for retrieval to behave plausibly.
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    features = tokens + [f"{left} {right}" for left, right in zip(tokens, tokens[1:])]
+    vector = [0.0] * dimensions
+    for feature in features:
+        slot, sign = _feature_slot(feature, dimensions)
+        vector[slot] += sign
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm == 0:
+        return vector
+    return [value / norm for value in vector]
+
+
+def _connection_error(message: str) -> APIConnectionError:
+    return APIConnectionError(message=message, request=httpx.Request("POST", "http://fake-openai/embeddings"))
+
+
+class _FakeEmbeddings:
+    def __init__(self, dimensions: int, faults: FaultInjector) -> None:
+        self._dimensions = dimensions
+        self._faults = faults
+
+    def create(self, *, model: str, input: Union[str, Sequence[str]], dimensions: int | None = None, **_: object):
+        self._faults.before_call("embeddings.create")
+        texts = [input] if isinstance(input, str) else list(input)
+        size = dimensions or self._dimensions
+        data = [
+            SimpleNamespace(object="embedding", index=index, embedding=fake_embedding(text, size))
+            for index, text in enumerate(texts)
+        ]
+        prompt_tokens = sum(len(TOKEN_PATTERN.findall(text)) for text in texts)
+        return SimpleNamespace(
+            object="list",
+            model=model,
+            data=data,
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, total_tokens=prompt_tokens),
+        )
+
+
+class FakeAzureOpenAI:
+    """Subset of `openai.AzureOpenAI` used by the API: `embeddings.create`."""
+
+    def __init__(self, dimensions: int = 1536, faults: FaultInjector | None = None) -> None:
+        faults = faults or FaultInjector.from_settings("openai", error_factory=_connection_error)
+        self.embeddings = _FakeEmbeddings(dimensions, faults)
@@ -0,0 +1,76 @@
+"""Latency and error injection shared by the fake services."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FakeServiceError(RuntimeError):
+    """Default error raised by an injected fault."""
+
+
+class FaultInjector:
+    """Adds configurable latency and random failures in front of a fake call."""
+
+    def __init__(
+        self,
+        service: str,
+        *,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+        error_factory: Optional[Callable[[str], Exception]] = None,
+    ) -> None:
+        self.service = service
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_factory = error_factory or FakeServiceError
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(
+        cls, service: str, error_factory: Optional[Callable[[str], Exception]] = None
+    ) -> "FaultInjector":
+        return cls(
+            service,
+            latency_ms=settings.fake_latency_ms,
+            jitter_ms=settings.fake_latency_jitter_ms,
+            error_rate=settings.fake_error_rate,
+            seed=settings.fake_seed,
+            error_factory=error_factory,
+        )
+
+    def _draw(self, operation: str) -> tuple[float, Optional[Exception]]:
+        with self._lock:
+            delay = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+        error = None
+        if failed:
+            logger.info("Injecting %s failure into %s", self.service, operation)
+            error = self.error_factory(f"Injected {self.service} failure in {operation}")
+        return delay / 1000.0, error
+
+    def before_call(self, operation: str) -> None:
+        delay, error = self._draw(operation)
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            raise error
+
+    async def before_call_async(self, operation: str) -> None:
+        delay, error = self._draw(operation)
+        if delay:
+            await asyncio.sleep(delay)
+        if error is not None:
+            raise error
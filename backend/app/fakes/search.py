@@ -0,0 +1,239 @@
+"""In-memory brute-force stand-in for the Azure AI Search index and document clients."""
+from __future__ import annotations
+
+import math
+import re
+import threading
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+
+from ..local_search import compile_filter
+from .faults import FaultInjector
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Constant of the reciprocal rank fusion Azure AI Search uses for hybrid queries
+RRF_K = 60
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class _FakeIndex:
+    def __init__(self, definition: Any) -> None:
+        self.definition = definition
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        fields = getattr(definition, "fields", None) or []
+        self.key_field = next((field.name for field in fields if getattr(field, "key", False)), "id")
+        self.text_fields = [
+            field.name
+            for field in fields
+            if getattr(field, "searchable", False) and str(getattr(field, "type", "")) == "Edm.String"
+        ] or ["content"]
+
+
+_INDEXES: Dict[str, _FakeIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def _search_error(message: str) -> HttpResponseError:
+    return HttpResponseError(message=message)
+
+
+def _compile_filter(expression: Optional[str]) -> Callable[[Dict[str, Any]], bool]:
+    try:
+        return compile_filter(expression)
+    except ValueError as exc:
+        raise _search_error(f"Invalid expression: {exc}") from exc
+
+
+def _cosine(left: Sequence[float], right: Sequence[float]) -> float:
+    dot = sum(a * b for a, b in zip(left, right))
+    norm = math.sqrt(sum(a * a for a in left)) * math.sqrt(sum(b * b for b in right))
+    return dot / norm if norm else 0.0
+
+
+def _bm25_scores(query: str, documents: List[Dict[str, Any]], text_fields: List[str]) -> Dict[int, float]:
+    terms = set(TOKEN_PATTERN.findall(query.lower()))
+    if not terms:
+        return {}
+    tokenized = [
+        TOKEN_PATTERN.findall(" ".join(str(document.get(field) or "") for field in text_fields).lower())
+        for document in documents
+    ]
+    average_length = (sum(len(tokens) for tokens in tokenized) / len(tokenized)) if tokenized else 0.0
+    document_frequency = {term: sum(1 for tokens in tokenized if term in tokens) for term in terms}
+    scores: Dict[int, float] = {}
+    for position, tokens in enumerate(tokenized):
+        score = 0.0
+        for term in terms:
+            frequency = tokens.count(term)
+            if not frequency:
+                continue
+            idf = math.log(1 + (len(tokenized) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            length_norm = 1 - BM25_B + BM25_B * len(tokens) / (average_length or 1)
+            score += idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+        if score > 0:
+            scores[position] = score
+    return scores
+
+
+class _FakeSearchResults:
+    def __init__(self, results: List[Dict[str, Any]], total: int) -> None:
+        self._results = results
+        self._total = total
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._results)
+
+    def get_count(self) -> int:
+        return self._total
+
+
+class FakeSearchClient:
+    """Subset of `azure.search.documents.SearchClient` backed by a brute-force in-memory index."""
+
+    def __init__(self, index_name: str, faults: Optional[FaultInjector] = None) -> None:
+        self.index_name = index_name
+        self._faults = faults or FaultInjector.from_settings("search", error_factory=_search_error)
+
+    def _index(self) -> _FakeIndex:
+        index = _INDEXES.get(self.index_name)
+        if index is None:
+            raise ResourceNotFoundError(f"The index '{self.index_name}' was not found.")
+        return index
+
+    def _write(self, documents: Iterable[Dict[str, Any]], merge: bool) -> List[SimpleNamespace]:
+        index = self._index()
+        results = []
+        with index.lock:
+            for document in documents:
+                key = str(document[index.key_field])
+                stored = index.documents.get(key)
+                if merge and stored is not None:
+                    stored.update(document)
+                    status_code = 200
+                else:
+                    index.documents[key] = dict(document)
+                    status_code = 201
+                results.append(SimpleNamespace(key=key, succeeded=True, status_code=status_code, error_message=None))
+        return results
+
+    def upload_documents(self, documents: Iterable[Dict[str, Any]], **_: Any) -> List[SimpleNamespace]:
+        self._faults.before_call("upload_documents")
+        return self._write(documents, merge=False)
+
+    def merge_or_upload_documents(self, documents: Iterable[Dict[str, Any]], **_: Any) -> List[SimpleNamespace]:
+        self._faults.before_call("merge_or_upload_documents")
+        return self._write(documents, merge=True)
+
+    def delete_documents(self, documents: Iterable[Dict[str, Any]], **_: Any) -> List[SimpleNamespace]:
+        self._faults.before_call("delete_documents")
+        index = self._index()
+        results = []
+        with index.lock:
+            for document in documents:
+                key = str(document[index.key_field])
+                index.documents.pop(key, None)
+                results.append(SimpleNamespace(key=key, succeeded=True, status_code=200, error_message=None))
+        return results
+
+    def get_document_count(self, **_: Any) -> int:
+        self._faults.before_call("get_document_count")
+        return len(self._index().documents)
+
+    def search(
+        self,
+        search_text: Optional[str] = None,
+        *,
+        filter: Optional[str] = None,
+        select: Optional[Sequence[str]] = None,
+        top: Optional[int] = None,
+        skip: Optional[int] = None,
+        vector_queries: Optional[Sequence[Any]] = None,
+        include_total_count: Optional[bool] = None,
+        **_: Any,
+    ) -> _FakeSearchResults:
+        """Brute-force BM25 text and cosine vector retrieval, fused with RRF for hybrid queries."""
+        self._faults.before_call("search")
+        index = self._index()
+        matches = _compile_filter(filter)
+        with index.lock:
+            candidates = [document for document in index.documents.values() if matches(document)]
+
+        rankings: List[Dict[int, float]] = []
+        if search_text and search_text.strip() != "*":
+            rankings.append(_bm25_scores(search_text, candidates, index.text_fields))
+        for vector_query in vector_queries or []:
+            field = getattr(vector_query, "fields", None) or "content_vector"
+            vector = getattr(vector_query, "vector", None) or []
+            scored = {
+                position: _cosine(vector, document[field])
+                for position, document in enumerate(candidates)
+                if document.get(field)
+            }
+            k = getattr(vector_query, "k_nearest_neighbors", None) or len(scored)
+            rankings.append(dict(sorted(scored.items(), key=lambda item: item[1], reverse=True)[:k]))
+
+        if not rankings:
+            scores = {position: 1.0 for position in range(len(candidates))}
+        elif len(rankings) == 1:
+            scores = rankings[0]
+        else:
+            scores = {}
+            for ranking in rankings:
+                ordered = sorted(ranking.items(), key=lambda item: item[1], reverse=True)
+                for rank, (position, _score) in enumerate(ordered, start=1):
+                    scores[position] = scores.get(position, 0.0) + 1.0 / (RRF_K + rank)
+
+        ordered = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        start = skip or 0
+        page = ordered[start : start + (top or 50)]
+        results = []
+        for position, score in page:
+            document = candidates[position]
+            fields = select or list(document.keys())
+            result = {field: document.get(field) for field in fields}
+            result["@search.score"] = score
+            result["@search.reranker_score"] = None
+            results.append(result)
+        return _FakeSearchResults(results, len(ordered) if include_total_count else None)
+
+
+class FakeSearchIndexClient:
+    """Subset of `azure.search.documents.indexes.SearchIndexClient`; indexes live in process memory."""
+
+    def __init__(self, faults: Optional[FaultInjector] = None) -> None:
+        self._faults = faults or FaultInjector.from_settings("search", error_factory=_search_error)
+
+    def get_index(self, name: str, **_: Any) -> Any:
+        self._faults.before_call("get_index")
+        index = _INDEXES.get(name)
+        if index is None:
+            raise ResourceNotFoundError(f"The index '{name}' was not found.")
+        return index.definition
+
+    def create_or_update_index(self, index: Any, **_: Any) -> Any:
+        self._faults.before_call("create_or_update_index")
+        with _INDEXES_LOCK:
+            existing = _INDEXES.get(index.name)
+            if existing is None:
+                _INDEXES[index.name] = _FakeIndex(index)
+            else:
+                existing.definition = index
+        return index
+
+    def delete_index(self, index: Any, **_: Any) -> None:
+        self._faults.before_call("delete_index")
+        name = getattr(index, "name", index)
+        with _INDEXES_LOCK:
+            if _INDEXES.pop(name, None) is None:
+                raise ResourceNotFoundError(f"The index '{name}' was not found.")
+
+    def list_index_names(self, **_: Any) -> List[str]:
+        self._faults.before_call("list_index_names")
+        return list(_INDEXES)
+
+    def get_search_client(self, index_name: str, **_: Any) -> FakeSearchClient:
+        return FakeSearchClient(index_name, faults=self._faults)
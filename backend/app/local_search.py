@@ -0,0 +1,454 @@
+"""
+Local vector search engine: project indexes as memory-mapped NumPy arrays.
+
+Each index is a directory under `LOCAL_SEARCH_DIR`:
+
+    manifest.json                 current version and generation, vector field, dimensions and counts
+    vectors-<generation>.f32      float32 rows, L2-normalised so cosine is a dot product
+    documents-<generation>.jsonl  the remaining fields of every row, one line per row
+    deleted-<version>.npy         rows deleted or replaced since the generation began
+    ivf-<version>.npz             optional coarse partitions (centroids, row assignments)
+    keywords.sqlite               FTS5 table of chunk text for BM25 keyword retrieval
+
+Writers append new rows to the vector and document files, mark replaced or
+deleted rows in `deleted-<version>.npy`, and then swap the manifest atomically,
+so an upload costs its own size rather than the size of the index and readers
+(the API and the Durable Functions app) never observe a partial index. Once a
+quarter of the rows are dead, the live rows are rewritten into a new generation.
+The keyword table is updated before the manifest swap and records the version it
+matches; a writer that finds it out of step rebuilds it from the documents.
+Indexes with at least `ivf_min_documents` rows are partitioned with spherical
+k-means so that queries only scan the `ivf_probes` closest partitions.
+
+The read side (layout, OData filters, cosine/BM25/hybrid ranking) is
+`durable_func/local_index.py`, shared with the Durable Functions app, which is
+deployed on its own; this module adds the write path on top of it.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from durable_func.local_index import (
+    DEFAULT_IVF_PROBES,
+    KEYWORD_DB_FILE,
+    MANIFEST_FILE,
+    SCORE_BLOCK_ROWS,
+    LocalIndexReader,
+    compile_filter,
+    match_expression,
+    normalize_rows,
+    reciprocal_rank_fusion,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: writers are only serialised within one process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LOCK_FILE = ".lock"
+GENERATION_PREFIXES = ("vectors-", "documents-")
+VERSIONED_PREFIXES = ("deleted-", "ivf-")
+# Rewrite the live rows into a new generation once this fraction of the rows is dead
+COMPACT_DEAD_FRACTION = 0.25
+DEFAULT_VECTOR_FIELD = "content_vector"
+DEFAULT_IVF_MIN_DOCUMENTS = 50000
+IVF_TRAIN_ITERATIONS = 10
+IVF_TRAIN_SAMPLES_PER_LIST = 64
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), SCORE_BLOCK_ROWS):
+        block = np.asarray(vectors[start : start + SCORE_BLOCK_ROWS])
+        assignments[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def _train_centroids(vectors: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Spherical k-means on a sample of the rows with ~sqrt(n) partitions."""
+    lists = max(int(np.sqrt(len(vectors))), 1)
+    sample_size = min(len(vectors), lists * IVF_TRAIN_SAMPLES_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+    for _ in range(IVF_TRAIN_ITERATIONS):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        empty = ~np.bincount(assignments, minlength=lists).astype(bool)
+        # Re-seed empty partitions with random rows instead of leaving zero vectors
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+class LocalVectorIndex(LocalIndexReader):
+    """One on-disk index; safe to share between threads and between processes on one host."""
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        ivf_min_documents: int = DEFAULT_IVF_MIN_DOCUMENTS,
+        ivf_probes: int = DEFAULT_IVF_PROBES,
+    ) -> None:
+        super().__init__(directory, ivf_probes=ivf_probes)
+        self.ivf_min_documents = ivf_min_documents
+
+    # -- state -----------------------------------------------------------------
+
+    def _keyword_db(self) -> sqlite3.Connection:
+        """Per-thread connection to the FTS5 keyword table, reopened if the index was dropped and recreated."""
+        path = self.directory / KEYWORD_DB_FILE
+        cached = getattr(self._connections, "cached", None)
+        try:
+            inode = path.stat().st_ino
+        except FileNotFoundError:
+            inode = None
+        if cached is not None and cached[0] == inode:
+            return cached[1]
+        if cached is not None:
+            cached[1].close()
+
+        connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5("
+            "content, id UNINDEXED, tokenize='porter unicode61')"
+        )
+        connection.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER)")
+        self._connections.cached = (path.stat().st_ino, connection)
+        return connection
+
+    def _close_keyword_db(self) -> None:
+        cached = getattr(self._connections, "cached", None)
+        if cached is not None:
+            cached[1].close()
+            self._connections.cached = None
+
+    def _index_keywords(
+        self, removed_ids: Sequence[str], documents: Sequence[Dict[str, Any]], version: int
+    ) -> None:
+        """Apply one write to the keyword table and record the manifest version it matches."""
+        connection = self._keyword_db()
+        with connection:
+            if removed_ids:
+                # `id` is not indexed by FTS5: match all removed ids in one table scan, not one scan per id
+                connection.execute("CREATE TEMP TABLE IF NOT EXISTS removed_ids (id TEXT PRIMARY KEY)")
+                connection.execute("DELETE FROM removed_ids")
+                connection.executemany(
+                    "INSERT OR IGNORE INTO removed_ids (id) VALUES (?)", [(key,) for key in removed_ids]
+                )
+                connection.execute("DELETE FROM chunks WHERE id IN (SELECT id FROM removed_ids)")
+            connection.executemany(
+                "INSERT INTO chunks (content, id) VALUES (?, ?)",
+                [(str(document.get("content") or ""), str(document["id"])) for document in documents],
+            )
+            connection.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('version', ?)", (version,))
+
+    def _reconcile_keywords(self, manifest: Dict[str, Any]) -> None:
+        """Rebuild the keyword table if an earlier write failed between it and the manifest swap."""
+        row = self._keyword_db().execute("SELECT value FROM state WHERE key = 'version'").fetchone()
+        if row is not None and row[0] == manifest["version"]:
+            return
+        logger.warning("Rebuilding the keyword table of local index '%s' (out of step with the manifest)", self.name)
+        connection = self._keyword_db()
+        with connection:
+            connection.execute("DELETE FROM chunks")
+        self._index_keywords([], self.documents(), manifest["version"])
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / LOCK_FILE, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _encode(documents: Sequence[Dict[str, Any]]) -> bytes:
+        return b"".join(json.dumps(document, ensure_ascii=False).encode("utf-8") + b"\n" for document in documents)
+
+    def _append(self, manifest: Dict[str, Any], vectors: np.ndarray, documents: Sequence[Dict[str, Any]]) -> int:
+        """
+        Append rows to the current generation; returns the new documents length.
+
+        The files are first cut back to the manifest, dropping what a failed write
+        left behind; readers never look past it.
+        """
+        generation = manifest["generation"]
+        with open(self.directory / f"vectors-{generation}.f32", "r+b") as stream:
+            stream.truncate(manifest["rows"] * manifest["dimensions"] * 4)
+            stream.seek(0, os.SEEK_END)
+            stream.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self.directory / f"documents-{generation}.jsonl", "r+b") as stream:
+            stream.truncate(manifest["documents_bytes"])
+            stream.seek(0, os.SEEK_END)
+            stream.write(self._encode(documents))
+            return stream.tell()
+
+    def _write_generation(self, generation: int, vectors: np.ndarray, documents: Sequence[Dict[str, Any]]) -> int:
+        """Write the rows of a new generation; returns its documents length."""
+        with open(self.directory / f"vectors-{generation}.f32", "wb") as stream:
+            for start in range(0, len(vectors), SCORE_BLOCK_ROWS):
+                stream.write(np.ascontiguousarray(vectors[start : start + SCORE_BLOCK_ROWS], dtype=np.float32).tobytes())
+        encoded = self._encode(documents)
+        (self.directory / f"documents-{generation}.jsonl").write_bytes(encoded)
+        return len(encoded)
+
+    def _commit(
+        self,
+        manifest: Dict[str, Any],
+        removed_ids: Sequence[str],
+        added: Sequence[Dict[str, Any]],
+        deleted: np.ndarray,
+        ivf: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Write the deleted rows, partitions and keyword changes of `manifest`, then publish it."""
+        version = manifest["version"]
+        if len(deleted):
+            with open(self.directory / f"deleted-{version}.npy", "wb") as stream:
+                np.save(stream, deleted)
+        if ivf is not None:
+            with open(self.directory / f"ivf-{version}.npz", "wb") as stream:
+                np.savez(stream, centroids=ivf["centroids"], assignments=ivf["assignments"])
+        manifest = {
+            **manifest,
+            "count": manifest["rows"] - len(deleted),
+            "deleted": len(deleted),
+            "ivf": ivf is not None,
+            "ivf_trained_count": ivf["trained_count"] if ivf else 0,
+        }
+        # Keywords first: if the swap below fails, the version recorded with them tells the next writer
+        self._index_keywords(removed_ids, added, version)
+
+        tmp_path = self.directory / f".{MANIFEST_FILE}.tmp"
+        tmp_path.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp_path, self.directory / MANIFEST_FILE)
+
+        # Readers that already mapped an older version keep their open handles
+        for stale in self.directory.iterdir():
+            suffix = stale.stem.rsplit("-", 1)[-1]
+            if (stale.name.startswith(GENERATION_PREFIXES) and suffix != str(manifest["generation"])) or (
+                stale.name.startswith(VERSIONED_PREFIXES) and suffix != str(version)
+            ):
+                stale.unlink(missing_ok=True)
+        self._load(manifest)
+
+    def _partition(
+        self,
+        vectors: np.ndarray,
+        count: int,
+        kept_assignments: Optional[np.ndarray],
+        new_vectors: np.ndarray,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        IVF state for the next version: reuse the centroids until the index doubles in size.
+
+        `vectors` are all rows of the next version (dead ones included, they are at most
+        a quarter of them) and `count` the live ones.
+        """
+        if count < self.ivf_min_documents:
+            return None
+        trained_count = (self._manifest or {}).get("ivf_trained_count", 0)
+        if self._centroids is None or kept_assignments is None or count > 2 * trained_count:
+            centroids = _train_centroids(vectors, np.random.default_rng(len(vectors)))
+            logger.info("Trained %s IVF partitions for local index '%s'", len(centroids), self.name)
+            return {"centroids": centroids, "assignments": _assign(vectors, centroids), "trained_count": count}
+        assignments = np.concatenate([kept_assignments, _assign(new_vectors, self._centroids)])
+        return {"centroids": self._centroids, "assignments": assignments, "trained_count": trained_count}
+
+    def _next_version(
+        self,
+        manifest: Dict[str, Any],
+        dead_rows: Sequence[int],
+        removed_ids: Sequence[str],
+        added: Sequence[Dict[str, Any]],
+        new_vectors: np.ndarray,
+    ) -> None:
+        """Publish the current rows minus `dead_rows` plus the `added` documents with `new_vectors`."""
+        deleted = np.union1d(self._deleted, np.asarray(dead_rows, dtype=np.int64)).astype(np.int64)
+        rows = manifest["rows"] + len(added)
+        count = rows - len(deleted)
+        next_manifest = {**manifest, "version": manifest["version"] + 1}
+
+        if len(deleted) > COMPACT_DEAD_FRACTION * rows:
+            # Too many dead rows: rewrite the live ones into a new generation
+            live = np.ones(manifest["rows"], dtype=bool)
+            live[deleted[deleted < manifest["rows"]]] = False
+            keep = np.flatnonzero(live)
+            vectors = np.concatenate([np.asarray(self._vectors[keep]), new_vectors])
+            stored = [self._documents[row] for row in keep] + list(added)
+            generation = manifest["generation"] + 1
+            next_manifest.update(
+                generation=generation,
+                rows=len(stored),
+                documents_bytes=self._write_generation(generation, vectors, stored),
+            )
+            kept_assignments = self._assignments[keep] if self._assignments is not None else None
+            ivf = self._partition(vectors, len(stored), kept_assignments, new_vectors)
+            logger.info("Compacted local index '%s' to %s documents", self.name, len(stored))
+            self._commit(next_manifest, removed_ids, added, np.zeros(0, dtype=np.int64), ivf)
+            return
+
+        next_manifest.update(rows=rows, documents_bytes=self._append(manifest, new_vectors, added))
+        ivf = None
+        if count >= self.ivf_min_documents:
+            vectors = np.memmap(
+                self.directory / f"vectors-{manifest['generation']}.f32",
+                dtype=np.float32,
+                mode="r",
+                shape=(rows, manifest["dimensions"]),
+            )
+            ivf = self._partition(vectors, count, self._assignments, new_vectors)
+        self._commit(next_manifest, removed_ids, added, deleted, ivf)
+
+    # -- writes ----------------------------------------------------------------
+
+    def create(self, dimensions: int, vector_field: str = DEFAULT_VECTOR_FIELD) -> None:
+        with self._write_lock():
+            if self._refresh() is None:
+                manifest = {
+                    "version": 1,
+                    "generation": 1,
+                    "vector_field": vector_field,
+                    "dimensions": dimensions,
+                    "rows": 0,
+                    "documents_bytes": self._write_generation(1, np.zeros((0, dimensions), dtype=np.float32), []),
+                }
+                self._commit(manifest, [], [], np.zeros(0, dtype=np.int64))
+                logger.info("Created local search index '%s'", self.name)
+
+    def upsert(self, documents: Sequence[Dict[str, Any]]) -> None:
+        """Add documents, replacing stored documents with the same `id`."""
+        with self._write_lock():
+            manifest = self._refresh()
+            if manifest is None:
+                raise FileNotFoundError(f"Local index '{self.name}' does not exist")
+            self._reconcile_keywords(manifest)
+            vector_field, dimensions = manifest["vector_field"], manifest["dimensions"]
+            # The last document wins when a batch repeats an id
+            latest = list({str(document["id"]): document for document in documents}.values())
+            new_vectors = normalize_rows(
+                np.asarray([document[vector_field] for document in latest], dtype=np.float32)
+            )
+            if new_vectors.ndim != 2 or new_vectors.shape[1] != dimensions:
+                raise ValueError(f"Expected {dimensions}-dimensional vectors for local index '{self.name}'")
+
+            added = [
+                {**{key: value for key, value in document.items() if key != vector_field}, "id": str(document["id"])}
+                for document in latest
+            ]
+            replaced = sorted(document["id"] for document in added)
+            dead_rows = [self._rows[key] for key in replaced if key in self._rows]
+            self._next_version(manifest, dead_rows, replaced, added, new_vectors)
+
+    def delete_where(self, predicate: Callable[[Dict[str, Any]], bool]) -> int:
+        """Remove every document matching `predicate`; returns how many were removed."""
+        with self._write_lock():
+            manifest = self._refresh()
+            if manifest is None:
+                return 0
+            self._reconcile_keywords(manifest)
+            removed = {key: row for key, row in self._rows.items() if predicate(self._documents[row])}
+            if removed:
+                self._next_version(
+                    manifest,
+                    list(removed.values()),
+                    list(removed),
+                    [],
+                    np.zeros((0, manifest["dimensions"]), dtype=np.float32),
+                )
+            return len(removed)
+
+    def drop(self) -> bool:
+        with self._write_lock():
+            existed = self.exists()
+            self._close_keyword_db()
+            for path in self.directory.iterdir():
+                if path.name != LOCK_FILE:
+                    path.unlink(missing_ok=True)
+            self._refresh()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return existed
+
+    # -- reads -----------------------------------------------------------------
+
+    def count(self) -> int:
+        with self._lock:
+            manifest = self._refresh()
+            return manifest["count"] if manifest else 0
+
+    def documents(self, predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return [
+                self._documents[row]
+                for row in sorted(self._rows.values())
+                if predicate is None or predicate(self._documents[row])
+            ]
+
+class LocalSearchEngine:
+    """Registry of the local indexes under one root directory."""
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        ivf_min_documents: int = DEFAULT_IVF_MIN_DOCUMENTS,
+        ivf_probes: int = DEFAULT_IVF_PROBES,
+    ) -> None:
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ivf_min_documents = ivf_min_documents
+        self.ivf_probes = ivf_probes
+        self._indexes: Dict[str, LocalVectorIndex] = {}
+        self._lock = threading.Lock()
+
+    def index(self, name: str) -> LocalVectorIndex:
+        directory = (self.root / name).resolve()
+        if directory.parent != self.root:
+            raise ValueError(f"Invalid index name: {name}")
+        with self._lock:
+            index = self._indexes.get(name)
+            if index is None:
+                index = LocalVectorIndex(
+                    directory, ivf_min_documents=self.ivf_min_documents, ivf_probes=self.ivf_probes
+                )
+                self._indexes[name] = index
+            return index
+
+    def drop(self, name: str) -> bool:
+        """Delete an index and forget its reader state; returns whether it existed."""
+        existed = self.index(name).drop()
+        with self._lock:
+            self._indexes.pop(name, None)
+        return existed
+
+    def index_names(self) -> List[str]:
+        return sorted(path.parent.name for path in self.root.glob(f"*/{MANIFEST_FILE}"))
+
+
+__all__ = [
+    "LocalSearchEngine",
+    "LocalVectorIndex",
+    "compile_filter",
+    "match_expression",
+    "reciprocal_rank_fusion",
+]
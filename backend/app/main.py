@@ -1,10 +1,14 @@
+import threading
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import Base, engine
+from .database import Base, add_missing_columns, engine
 from .routers import files, projects, agent_runs
+from .workers import run_startup_maintenance
 
 Base.metadata.create_all(bind=engine)
+add_missing_columns()
 
 app = FastAPI(title="Document Workspace API", version="0.1.0")
 app.add_middleware(
@@ -20,6 +24,12 @@ app.include_router(files.router)
 app.include_router(agent_runs.router)
 
 
+@app.on_event("startup")
+def start_maintenance():
+    # Resume interrupted project deletions and upgrade older project indexes off the request path
+    threading.Thread(target=run_startup_maintenance, name="startup-maintenance", daemon=True).start()
+
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
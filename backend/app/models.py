@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Text
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from .database import Base
@@ -13,6 +13,16 @@ class Project(Base):
     project_id = Column(String, primary_key=True, default=lambda: str(uuid4()))
     project_name = Column(String, nullable=False)
     index_name = Column(String, nullable=False, unique=True)
+    # Vector storage of the project index; NULL for projects created before profiles (full precision)
+    vector_profile = Column(String, nullable=True)
+    embedding_dimensions = Column(Integer, nullable=True)
+    # HNSW graph and rescoring of the project index; NULL for projects created before they were stored
+    hnsw_m = Column(Integer, nullable=True)
+    hnsw_ef_construction = Column(Integer, nullable=True)
+    hnsw_ef_search = Column(Integer, nullable=True)
+    rescore_oversampling = Column(Float, nullable=True)
+    # NULL while active; "DELETING" from DELETE /projects/{id} until the cleanup job removes the row
+    status = Column(String, nullable=True)
     last_modified = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
 
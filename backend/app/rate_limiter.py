@@ -0,0 +1,96 @@
+"""
+Adaptive client-side rate limiting for Azure OpenAI calls (API side).
+
+Ingestion workers and search requests embed text from many threads against the
+same deployment quota; they all go through one `AdaptiveRateLimiter`
+(`OPENAI_RPM_LIMIT`, `OPENAI_TPM_LIMIT`, `OPENAI_MAX_CONCURRENCY`,
+`OPENAI_MAX_RETRIES`). The budget and AIMD logic is
+`durable_func/rate_limit_core.py`, shared with the Durable Functions app; this
+module only adds the blocking wait and `call`.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+from durable_func.rate_limit_core import RateLimiterCore
+
+from .config import settings
+
+T = TypeVar("T")
+
+
+class AdaptiveRateLimiter(RateLimiterCore):
+    """Process-wide request/token budget and adaptive concurrency for Azure OpenAI calls (threads)."""
+
+    def call(
+        self,
+        make_call: Callable[[], T],
+        tokens: int = 0,
+        usage: Optional[Callable[[T], Optional[int]]] = None,
+    ) -> T:
+        """
+        Run `make_call()` within the budget, retrying throttled attempts.
+
+        `tokens` is the estimated request size charged up front; `usage` extracts the
+        actual total from the result so the token bucket is corrected.
+        """
+        attempt = 0
+        while True:
+            sent_at = self._acquire(tokens)
+            released = False
+            try:
+                result = make_call()
+            except Exception as exc:
+                released = True
+                if not self._retry_after_failure(exc, attempt, sent_at):
+                    raise
+                failure = exc
+            else:
+                released = True
+                self._release(tokens, self._used_tokens(usage, result))
+                return result
+            finally:
+                if not released:
+                    # Interrupted by a BaseException: free the slot or it is lost for good
+                    self._abandon()
+            time.sleep(self._backoff_seconds(failure, attempt))
+            attempt += 1
+
+    def _acquire(self, tokens: int) -> float:
+        """Block until a slot and quota are free; returns the time the call was let through."""
+        started = time.monotonic()
+        with self._condition:
+            while True:
+                delay = self._try_acquire(tokens)
+                if delay == 0:
+                    break
+                # With every slot taken (None), _release and friends notify the condition
+                self._condition.wait(None if delay is None else delay * random.uniform(1.0, 1.2))
+        return self._record_wait(started)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used to charge the token bucket up front."""
+    return (len(text) + 3) // 4
+
+
+_RATE_LIMITER: Optional[AdaptiveRateLimiter] = None
+_RATE_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Return the process-wide limiter for the Azure OpenAI deployments."""
+    global _RATE_LIMITER
+    if _RATE_LIMITER is None:
+        with _RATE_LIMITER_LOCK:
+            if _RATE_LIMITER is None:
+                _RATE_LIMITER = AdaptiveRateLimiter(
+                    requests_per_minute=settings.openai_rpm_limit,
+                    tokens_per_minute=settings.openai_tpm_limit,
+                    max_concurrency=settings.openai_max_concurrency,
+                    max_retries=settings.openai_max_retries,
+                )
+    return _RATE_LIMITER
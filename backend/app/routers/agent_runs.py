@@ -1,26 +1,66 @@
+import asyncio
+import codecs
+import json
 import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from durable_func.payload_store import PayloadStore
+
 from .. import crud, schemas
+from ..config import settings
+from ..create_index import VectorProfile
 from ..database import get_session
+from ..services.artifacts import contains_payload_refs, get_artifact_store, report_stream_key
 from ..services.durable import get_durable_client
 
 router = APIRouter(prefix="/agent-runs", tags=["agent-runs"])
 logger = logging.getLogger(__name__)
 
+TERMINAL_RUNTIME_STATUSES = ("Completed", "Failed", "Terminated")
+FAILED_RUNTIME_STATUSES = ("Failed", "Terminated")
+
+# run_id -> (status code, media type, body) of runs that finished; their status never changes again
+_terminal_statuses: "OrderedDict[str, Tuple[int, str, bytes]]" = OrderedDict()
+_terminal_statuses_lock = threading.Lock()
+
+
+class ReportStreamFailed(RuntimeError):
+    """The report writer (or its run) failed after the report stream was opened."""
+
 
 @router.post("", response_model=schemas.AgentRunStartResponse, status_code=status.HTTP_201_CREATED)
 async def start_agent_run(payload: schemas.AgentRunCreate, db: Session = Depends(get_session)):
+    index_name = None
+    embedding_dimensions = None
     if payload.project_id:
         project = crud.get_project(db, payload.project_id)
         if project is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+        # The research activities search the project's own index
+        index_name = project.index_name
+        # Query embeddings must match the dimensions of the project's vectors
+        embedding_dimensions = VectorProfile.for_project(project).embedding_dimensions
 
     durable_client = get_durable_client()
     try:
-        result = await durable_client.start_run(payload.query, payload.report_length)
+        result = await durable_client.start_run(
+            payload.query,
+            payload.report_length,
+            orchestrator=payload.orchestrator,
+            topic_concurrency=payload.topic_concurrency,
+            research_mode=payload.research_mode,
+            bypass_cache=payload.bypass_cache,
+            index_name=index_name,
+            embedding_dimensions=embedding_dimensions,
+        )
     except Exception as exc:  # pragma: no cover - httpx raises different subclasses
         logger.exception("Failed to start durable function run")
         raise HTTPException(
@@ -65,6 +105,11 @@ async def get_agent_run_status(run_id: str, db: Session = Depends(get_session)):
     if agent_run is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agent run not found")
 
+    cached = _cached_terminal_status(run_id)
+    if cached is not None:
+        status_code, media_type, content = cached
+        return Response(content=content, status_code=status_code, media_type=media_type)
+
     durable_client = get_durable_client()
     try:
         status_response = await durable_client.get_status(agent_run.status_url)
@@ -75,13 +120,153 @@ async def get_agent_run_status(run_id: str, db: Session = Depends(get_session)):
             detail="Failed to query research agent status",
         ) from exc
 
-    return Response(
-        content=status_response.content,
-        status_code=status_response.status_code,
-        media_type=status_response.headers.get("content-type", "application/json"),
+    content, terminal = await run_in_threadpool(_resolve_output_artifacts, run_id, status_response.content)
+    media_type = status_response.headers.get("content-type", "application/json")
+    if terminal:
+        # Offloaded outputs are downloaded once; later polls are answered from memory
+        _remember_terminal_status(run_id, (status_response.status_code, media_type, content))
+    return Response(content=content, status_code=status_response.status_code, media_type=media_type)
+
+
+def _cached_terminal_status(run_id: str) -> Optional[Tuple[int, str, bytes]]:
+    with _terminal_statuses_lock:
+        cached = _terminal_statuses.get(run_id)
+        if cached is not None:
+            _terminal_statuses.move_to_end(run_id)
+        return cached
+
+
+def _remember_terminal_status(run_id: str, entry: Tuple[int, str, bytes]) -> None:
+    if settings.run_status_cache_size <= 0:
+        return
+    with _terminal_statuses_lock:
+        _terminal_statuses[run_id] = entry
+        _terminal_statuses.move_to_end(run_id)
+        while len(_terminal_statuses) > settings.run_status_cache_size:
+            _terminal_statuses.popitem(last=False)
+
+
+def _resolve_output_artifacts(run_id: str, content: bytes) -> Tuple[bytes, bool]:
+    """
+    Inline payloads that the orchestrator offloaded to the artifact store.
+
+    Also returns whether the run is finished and its output fully resolved, i.e. the
+    response can be reused for every later poll. Raises HTTPException (503/502) when the
+    references cannot be resolved.
+    """
+    try:
+        body = json.loads(content)
+    except ValueError:
+        return content, False
+    if not isinstance(body, dict):
+        return content, False
+    terminal = body.get("runtimeStatus") in TERMINAL_RUNTIME_STATUSES
+    if not contains_payload_refs(body.get("output")):
+        return content, terminal
+
+    # Never hand out the raw {"$payload_ref": ...} placeholders in place of the output
+    artifact_store = get_artifact_store()
+    if artifact_store is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Run artifact store is not configured",
+        )
+    try:
+        body["output"] = artifact_store.resolve(body["output"])
+    except Exception as exc:
+        logger.exception("Failed to resolve offloaded artifacts for run %s", run_id)
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to read the research agent output",
+        ) from exc
+    return json.dumps(body, ensure_ascii=False).encode("utf-8"), terminal
+
+
+@router.get("/{run_id}/report/stream")
+async def stream_agent_run_report(
+    run_id: str,
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_session),
+):
+    """Stream the report as the report writer generates it, starting at byte `offset`."""
+    agent_run = crud.get_agent_run(db, run_id)
+    if agent_run is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agent run not found")
+
+    artifact_store = get_artifact_store()
+    if artifact_store is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Run artifact store is not configured",
+        )
+
+    key = report_stream_key(run_id)
+    if await run_in_threadpool(artifact_store.is_stream_failed, key):
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Report generation failed")
+
+    return StreamingResponse(
+        _follow_report(artifact_store, key, offset, agent_run.status_url),
+        media_type="text/plain; charset=utf-8",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
+async def _follow_report(artifact_store: PayloadStore, key: str, offset: int, status_url: str):
+    """
+    Yield new report text until the writer marks it complete or it stops growing.
+
+    The run's Durable status is checked every `report_stream_status_seconds`: the stream
+    ends once the run completed, and fails (the response is cut off, so clients see an
+    error rather than a short report) once the writer or the run failed.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    last_progress = time.monotonic()
+    last_status_check = None
+    while True:
+        # Check completion before reading so the final read covers everything written
+        complete = await run_in_threadpool(artifact_store.is_stream_complete, key)
+        failed = not complete and await run_in_threadpool(artifact_store.is_stream_failed, key)
+        runtime_status = None
+        now = time.monotonic()
+        if not (complete or failed) and (
+            last_status_check is None or now - last_status_check >= settings.report_stream_status_seconds
+        ):
+            last_status_check = now
+            runtime_status = await _runtime_status(status_url)
+        try:
+            data = await run_in_threadpool(artifact_store.read_from, key, offset)
+        except FileNotFoundError:
+            data = b""
+        if data:
+            offset += len(data)
+            last_progress = time.monotonic()
+            text = decoder.decode(data)
+            if text:
+                yield text
+        if complete or runtime_status == "Completed":
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+            return
+        if failed or runtime_status in FAILED_RUNTIME_STATUSES:
+            logger.warning("Report stream %s ended early: the report writer or its run failed", key)
+            raise ReportStreamFailed(f"Report generation failed for {key}")
+        if time.monotonic() - last_progress > settings.report_stream_timeout_seconds:
+            logger.warning("Report stream %s stopped after %.0fs without output", key, settings.report_stream_timeout_seconds)
+            return
+        await asyncio.sleep(settings.report_stream_poll_seconds)
+
+
+async def _runtime_status(status_url: str) -> Optional[str]:
+    """The run's Durable runtimeStatus, or None if it cannot be read right now."""
+    try:
+        response = await get_durable_client().get_status(status_url)
+        return response.json().get("runtimeStatus")
+    except Exception as exc:
+        logger.debug("Could not read the status of %s: %s", status_url, exc)
+        return None
+
+
 @router.post("/{run_id}/human-feedback", status_code=status.HTTP_202_ACCEPTED)
 async def send_human_feedback(
     run_id: str,
@@ -1,42 +1,86 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
-from .. import crud
+from .. import crud, models, schemas
 from ..config import settings
 from ..database import get_session
 from ..create_index import SearchIndexError, get_search_service
+from ..services.file_content import file_content_response
 
 router = APIRouter(prefix="/files", tags=["files"])
 logger = logging.getLogger(__name__)
 
+# Concurrent unlinks for bulk deletes; removing files is I/O bound, even more so on network storage
+UNLINK_CONCURRENCY = 16
+
+
+@router.api_route("/{file_id}/content", methods=["GET", "HEAD"])
+def get_file_content(file_id: str, request: Request, db: Session = Depends(get_session)):
+    """Serve an uploaded file with Range, ETag/Last-Modified and cache headers (PDF viewers fetch pages lazily)."""
+    source_file = crud.get_source_file(db, file_id)
+    if source_file is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+
+    path = Path(source_file.storage_path).resolve()
+    storage_dir = Path(settings.storage_dir).resolve()
+    if storage_dir not in path.parents or not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File content not found")
+    return file_content_response(request.headers, path, source_file.file_id, source_file.original_filename)
+
+
+@router.post("/bulk-delete", response_model=schemas.FileBulkDeleteResponse)
+def delete_files(payload: schemas.FileBulkDeleteRequest, db: Session = Depends(get_session)):
+    """Delete many files at once: one batched index delete per project, concurrent unlinks and a single commit."""
+    file_ids = list(dict.fromkeys(payload.file_ids))
+    source_files = crud.get_source_files(db, file_ids)
+    deleted = {source_file.file_id for source_file in source_files}
+    _delete_source_files(db, source_files)
+    return schemas.FileBulkDeleteResponse(
+        deleted=[file_id for file_id in file_ids if file_id in deleted],
+        not_found=[file_id for file_id in file_ids if file_id not in deleted],
+    )
+
 
 @router.delete("/{file_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_file(file_id: str, db: Session = Depends(get_session)):
     source_file = crud.get_source_file(db, file_id)
     if source_file is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    _delete_source_files(db, [source_file])
 
+
+def _unlink_stored_file(source_file: models.SourceFile) -> None:
     path = Path(source_file.storage_path)
-    if path.exists() and path.is_file():
-        try:
-            path.relative_to(settings.storage_dir)
-        except ValueError:
-            pass
+    try:
         path.unlink(missing_ok=True)
+    except OSError as exc:
+        logger.warning("Failed to remove stored file %s for file %s: %s", path, source_file.file_id, exc)
+
+
+def _delete_source_files(db: Session, source_files: List[models.SourceFile]) -> None:
+    if not source_files:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(UNLINK_CONCURRENCY, len(source_files))) as executor:
+        list(executor.map(_unlink_stored_file, source_files))
 
     search_service = get_search_service()
-    if search_service and source_file.project:
-        try:
-            search_service.delete_file_chunks(source_file.project.index_name, source_file.file_id)
-        except SearchIndexError as exc:
-            logger.warning(
-                "Failed to remove search documents for file %s in index %s: %s",
-                file_id,
-                source_file.project.index_name,
-                exc,
-            )
-
-    crud.delete_source_file(db, source_file)
+    if search_service:
+        file_ids_by_index: Dict[str, List[str]] = {}
+        for source_file in source_files:
+            if source_file.project:
+                file_ids_by_index.setdefault(source_file.project.index_name, []).append(source_file.file_id)
+        for index_name, file_ids in file_ids_by_index.items():
+            try:
+                search_service.delete_files_chunks(index_name, file_ids)
+            except SearchIndexError as exc:
+                logger.warning(
+                    "Failed to remove search documents for %s file(s) in index %s: %s", len(file_ids), index_name, exc
+                )
+
+    crud.delete_source_files(db, source_files)
@@ -1,15 +1,15 @@
 import logging
 from pathlib import Path
-from typing import List
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, UploadFile, status
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas
 from ..config import settings
 from ..database import get_session
-from ..create_index import SearchIndexError, get_search_service
-from ..workers import process_file
+from ..create_index import SearchIndexError, SemanticSearchUnavailable, VectorProfile, get_search_service
+from ..workers import delete_project_resources, process_file
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 logger = logging.getLogger(__name__)
@@ -23,11 +23,20 @@ def list_projects(db: Session = Depends(get_session)):
 @router.post("", response_model=schemas.ProjectBase, status_code=status.HTTP_201_CREATED)
 def create_project(payload: schemas.ProjectCreate, db: Session = Depends(get_session)):
     name = (payload.project_name or "Untitled Project").strip() or "Untitled Project"
-    project = crud.create_project(db, name)
+    project = crud.create_project(
+        db,
+        name,
+        vector_profile=payload.vector_profile,
+        embedding_dimensions=payload.embedding_dimensions,
+        hnsw_m=payload.hnsw_m,
+        hnsw_ef_construction=payload.hnsw_ef_construction,
+        hnsw_ef_search=payload.hnsw_ef_search,
+        rescore_oversampling=payload.rescore_oversampling,
+    )
     search_service = get_search_service()
     if search_service:
         try:
-            search_service.ensure_index(project.index_name)
+            search_service.ensure_index(project.index_name, VectorProfile.for_project(project))
         except SearchIndexError as exc:
             logger.warning("Failed to ensure index %s: %s", project.index_name, exc)
     return project
@@ -35,7 +44,8 @@ def create_project(payload: schemas.ProjectCreate, db: Session = Depends(get_ses
 
 @router.get("/{project_id}", response_model=schemas.ProjectDetail)
 def get_project(project_id: str, db: Session = Depends(get_session)):
-    project = crud.get_project(db, project_id)
+    # Projects being deleted stay visible here (status "DELETING") until the cleanup job finishes
+    project = crud.get_project(db, project_id, include_deleting=True)
     if project is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     return project
@@ -50,19 +60,106 @@ def update_project(project_id: str, payload: schemas.ProjectUpdate, db: Session
     return crud.update_project_name(db, project, name)
 
 
-@router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_project(project_id: str, db: Session = Depends(get_session)):
+@router.delete("/{project_id}", response_model=schemas.ProjectBase, status_code=status.HTTP_202_ACCEPTED)
+def delete_project(project_id: str, background_tasks: BackgroundTasks, db: Session = Depends(get_session)):
+    """
+    Mark the project as deleting and return; files on disk, the search index and the rows
+    are removed by a background job. Repeating the request retries an unfinished cleanup.
+    """
+    project = crud.get_project(db, project_id, include_deleting=True)
+    if project is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    if project.status != crud.PROJECT_DELETING:
+        project = crud.mark_project_deleting(db, project)
+    background_tasks.add_task(delete_project_resources, project_id)
+    return project
+
+
+@router.get("/{project_id}/search", response_model=schemas.ProjectSearchResponse)
+def search_project_get(
+    project_id: str,
+    q: str = Query(..., min_length=1),
+    mode: Literal["text", "vector", "hybrid", "semantic"] = "hybrid",
+    top: int = Query(10, ge=1, le=50),
+    skip: int = Query(0, ge=0, le=1000),
+    file_id: Optional[List[str]] = Query(None),
+    page_from: Optional[int] = Query(None, ge=0),
+    page_to: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_session),
+):
+    payload = schemas.ProjectSearchRequest(
+        query=q, mode=mode, top=top, skip=skip, file_ids=file_id, page_from=page_from, page_to=page_to
+    )
+    return _search_project(db, project_id, payload)
+
+
+@router.post("/{project_id}/search", response_model=schemas.ProjectSearchResponse)
+def search_project(project_id: str, payload: schemas.ProjectSearchRequest, db: Session = Depends(get_session)):
+    return _search_project(db, project_id, payload)
+
+
+def _search_filter(payload: schemas.ProjectSearchRequest) -> Optional[str]:
+    clauses = []
+    if payload.file_ids:
+        values = ",".join(file_id.replace("'", "''") for file_id in payload.file_ids)
+        clauses.append(f"search.in(source_file_id, '{values}', ',')")
+    if payload.page_from is not None:
+        clauses.append(f"page_number ge {payload.page_from}")
+    if payload.page_to is not None:
+        clauses.append(f"page_number le {payload.page_to}")
+    return " and ".join(clauses) or None
+
+
+def _search_project(db: Session, project_id: str, payload: schemas.ProjectSearchRequest) -> schemas.ProjectSearchResponse:
     project = crud.get_project(db, project_id)
     if project is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    index_name = project.index_name
-    crud.delete_project(db, project)
     search_service = get_search_service()
-    if search_service:
-        try:
-            search_service.delete_index(index_name)
-        except SearchIndexError as exc:
-            logger.warning("Failed to delete index %s: %s", index_name, exc)
+    if search_service is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Search is not configured")
+
+    try:
+        hits = search_service.search(
+            project.index_name,
+            payload.query,
+            payload.mode,
+            filter_expression=_search_filter(payload),
+            top=payload.top,
+            skip=payload.skip,
+            select=["id", "content", "source_file_id", "page_number"],
+            profile=VectorProfile.for_project(project),
+        )
+    except SemanticSearchUnavailable as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Semantic search is not available for this index"
+        ) from exc
+    except SearchIndexError as exc:
+        logger.warning("Search failed for project %s: %s", project_id, exc)
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Search failed") from exc
+
+    file_names = {source_file.file_id: source_file.original_filename for source_file in project.files}
+    results = []
+    for hit in hits:
+        file_name = file_names.get(hit.get("source_file_id"))
+        page_number = hit.get("page_number") or None
+        citation = file_name or hit.get("source_file_id") or "unknown file"
+        if page_number:
+            citation = f"{citation}, page {page_number}"
+        results.append(
+            schemas.SearchHit(
+                id=hit["id"],
+                content=hit.get("content") or "",
+                score=hit.get("@search.score") or 0.0,
+                reranker_score=hit.get("@search.reranker_score"),
+                file_id=hit.get("source_file_id") or "",
+                file_name=file_name,
+                page_number=page_number,
+                citation=citation,
+            )
+        )
+    return schemas.ProjectSearchResponse(
+        query=payload.query, mode=payload.mode, top=payload.top, skip=payload.skip, results=results
+    )
 
 
 @router.post("/{project_id}/files", response_model=schemas.FileUploadResponse, status_code=status.HTTP_202_ACCEPTED)
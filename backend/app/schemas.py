@@ -1,7 +1,9 @@
 from datetime import datetime
 from typing import List, Optional, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from .config import settings
 
 
 class SourceFileBase(BaseModel):
@@ -20,6 +22,13 @@ class ProjectBase(BaseModel):
     project_id: str
     project_name: str
     index_name: str
+    vector_profile: Optional[str] = None
+    embedding_dimensions: Optional[int] = None
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construction: Optional[int] = None
+    hnsw_ef_search: Optional[int] = None
+    rescore_oversampling: Optional[float] = None
+    status: Optional[str] = None
     last_modified: Optional[datetime]
     created_at: datetime
 
@@ -33,6 +42,25 @@ class ProjectDetail(ProjectBase):
 
 class ProjectCreate(BaseModel):
     project_name: Optional[str] = None
+    # Defaults to VECTOR_PROFILE / AZURE_OPENAI_EMBEDDING_DIMENSIONS
+    vector_profile: Optional[Literal["full", "scalar", "binary"]] = None
+    embedding_dimensions: Optional[int] = Field(default=None, ge=64, le=3072)
+    # Defaults to VECTOR_HNSW_M / _EF_CONSTRUCTION / _EF_SEARCH / VECTOR_RESCORE_OVERSAMPLING (Azure AI Search ranges)
+    hnsw_m: Optional[int] = Field(default=None, ge=4, le=10)
+    hnsw_ef_construction: Optional[int] = Field(default=None, ge=100, le=1000)
+    hnsw_ef_search: Optional[int] = Field(default=None, ge=100, le=1000)
+    rescore_oversampling: Optional[float] = Field(default=None, ge=1.0, le=100.0)
+
+    @field_validator("embedding_dimensions")
+    @classmethod
+    def _within_model_dimensions(cls, value: Optional[int]) -> Optional[int]:
+        # Dimensions can only be reduced from the deployment's native size
+        if value is not None and value > settings.azure_openai_embedding_dimensions:
+            raise ValueError(
+                f"must not exceed the {settings.azure_openai_embedding_dimensions} dimensions of the embedding model "
+                "(AZURE_OPENAI_EMBEDDING_DIMENSIONS)"
+            )
+        return value
 
 
 class ProjectUpdate(BaseModel):
@@ -44,10 +72,52 @@ class FileUploadResponse(BaseModel):
     status: str
 
 
+class FileBulkDeleteRequest(BaseModel):
+    file_ids: List[str] = Field(min_length=1, max_length=1000)
+
+
+class FileBulkDeleteResponse(BaseModel):
+    deleted: List[str]
+    not_found: List[str]
+
+
+class ProjectSearchRequest(BaseModel):
+    query: str = Field(min_length=1)
+    mode: Literal["text", "vector", "hybrid", "semantic"] = "hybrid"
+    top: int = Field(default=10, ge=1, le=50)
+    skip: int = Field(default=0, ge=0, le=1000)
+    file_ids: Optional[List[str]] = None
+    page_from: Optional[int] = Field(default=None, ge=0)
+    page_to: Optional[int] = Field(default=None, ge=0)
+
+
+class SearchHit(BaseModel):
+    id: str
+    content: str
+    score: float
+    reranker_score: Optional[float] = None
+    file_id: str
+    file_name: Optional[str] = None
+    page_number: Optional[int] = None
+    citation: str
+
+
+class ProjectSearchResponse(BaseModel):
+    query: str
+    mode: str
+    top: int
+    skip: int
+    results: List[SearchHit]
+
+
 class AgentRunCreate(BaseModel):
     query: str
     report_length: str = "medium"
     project_id: Optional[str] = None
+    orchestrator: Literal["report_seq_orchestrator", "report_parallel_orchestrator"] = "report_seq_orchestrator"
+    topic_concurrency: Optional[int] = Field(default=None, ge=1, le=32)
+    research_mode: Literal["standard", "fast"] = "standard"
+    bypass_cache: bool = False
 
 
 class AgentRunStartResponse(BaseModel):
@@ -0,0 +1,55 @@
+"""
+Read access to run artifacts offloaded by the Durable Functions activities.
+
+The store itself is `durable_func/payload_store.py`, configured from the same
+PAYLOAD_STORE_* settings (falling back to AzureWebJobsStorage like the Functions
+app) so both sides resolve `{"$payload_ref": key}` references against one store.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Optional
+
+from durable_func.payload_store import (
+    PAYLOAD_REF_KEY,
+    PayloadStore,
+    PayloadStoreNotConfigured,
+    create_payload_store,
+    report_stream_key,
+)
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def contains_payload_refs(value: Any) -> bool:
+    if isinstance(value, dict):
+        return PAYLOAD_REF_KEY in value or any(contains_payload_refs(item) for item in value.values())
+    if isinstance(value, list):
+        return any(contains_payload_refs(item) for item in value)
+    return False
+
+
+def get_artifact_store() -> Optional[PayloadStore]:
+    global _ARTIFACT_STORE, _ARTIFACT_STORE_INITIALIZED
+    if _ARTIFACT_STORE is None and not _ARTIFACT_STORE_INITIALIZED:
+        try:
+            _ARTIFACT_STORE = create_payload_store(
+                settings.payload_store_dir,
+                settings.payload_store_connection_string or settings.azure_webjobs_storage,
+                container=settings.payload_store_container,
+            )
+        except PayloadStoreNotConfigured as exc:
+            logger.warning("Run artifact resolution disabled: %s", exc)
+            _ARTIFACT_STORE_INITIALIZED = True
+        except Exception:
+            logger.exception("Failed to initialize run artifact store")
+            _ARTIFACT_STORE_INITIALIZED = True
+    return _ARTIFACT_STORE
+
+
+_ARTIFACT_STORE: Optional[PayloadStore] = None
+_ARTIFACT_STORE_INITIALIZED = False
+
+__all__ = ["contains_payload_refs", "get_artifact_store", "report_stream_key"]
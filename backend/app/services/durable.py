@@ -18,9 +18,30 @@ class DurableFunctionClient:
         self.base_url = settings.durable_functions_base_url.rstrip("/")
         self.human_event_name = settings.durable_functions_human_event
 
-    async def start_run(self, query: str, report_length: str) -> dict:
+    async def start_run(
+        self,
+        query: str,
+        report_length: str,
+        *,
+        orchestrator: Optional[str] = None,
+        topic_concurrency: Optional[int] = None,
+        research_mode: str = "standard",
+        bypass_cache: bool = False,
+        index_name: Optional[str] = None,
+        embedding_dimensions: Optional[int] = None,
+    ) -> dict:
         endpoint = f"{self.base_url}/api/httptrigger"
-        payload = {"query": query, "report_length": report_length}
+        payload = {"query": query, "report_length": report_length, "research_mode": research_mode}
+        if orchestrator:
+            payload["orchestrator"] = orchestrator
+        if topic_concurrency:
+            payload["topic_concurrency"] = topic_concurrency
+        if bypass_cache:
+            payload["bypass_cache"] = True
+        if index_name:
+            payload["index_name"] = index_name
+        if embedding_dimensions:
+            payload["embedding_dimensions"] = embedding_dimensions
         async with httpx.AsyncClient(timeout=60) as client:
             response = await client.post(endpoint, json=payload)
             response.raise_for_status()
@@ -47,5 +68,10 @@ _DURABLE_CLIENT: Optional[DurableFunctionClient] = None
 def get_durable_client() -> DurableFunctionClient:
     global _DURABLE_CLIENT
     if _DURABLE_CLIENT is None:
-        _DURABLE_CLIENT = DurableFunctionClient()
+        if settings.uses_fake("durable"):
+            from ..fakes import FakeDurableFunctionClient
+
+            _DURABLE_CLIENT = FakeDurableFunctionClient()
+        else:
+            _DURABLE_CLIENT = DurableFunctionClient()
     return _DURABLE_CLIENT
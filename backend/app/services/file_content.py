@@ -0,0 +1,197 @@
+"""HTTP delivery of stored source files: byte ranges, conditional requests and zero-copy sends."""
+from __future__ import annotations
+
+import mimetypes
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import List, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from ..config import settings
+
+ByteRange = Tuple[int, int]
+
+
+class FileRangeResponse(Response):
+    """
+    Sends `count` bytes of `path` starting at `offset`.
+
+    Uses the server's zero-copy ASGI extensions when offered (`http.response.zerocopysend`
+    for any range, `http.response.pathsend` for whole files) and otherwise reads the
+    file in chunks off the event loop.
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        path: Path,
+        offset: int,
+        count: int,
+        status_code: int,
+        headers: Mapping[str, str],
+        media_type: Optional[str],
+        whole_file: bool,
+    ) -> None:
+        super().__init__(status_code=status_code, headers={**headers, "content-length": str(count)}, media_type=media_type)
+        self.path = path
+        self.offset = offset
+        self.count = count
+        self.whole_file = whole_file
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        extensions = scope.get("extensions") or {}
+        if scope.get("method", "GET").upper() == "HEAD" or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as file:
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": file,
+                        "offset": self.offset,
+                        "count": self.count,
+                        "more_body": False,
+                    }
+                )
+        elif self.whole_file and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        else:
+            await self._send_chunks(send)
+        if self.background is not None:
+            await self.background()
+
+    async def _send_chunks(self, send: Send) -> None:
+        async with await anyio.open_file(self.path, "rb") as file:
+            await file.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    # Truncated underneath us; end the body rather than hang the client
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def file_etag(file_id: str, stat_result: os.stat_result) -> str:
+    """Strong validator: changes whenever the stored bytes are replaced."""
+    return f'"{file_id}-{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def parse_range(header: str, size: int) -> Optional[List[ByteRange]]:
+    """
+    Parse a `Range: bytes=...` header into inclusive (start, end) ranges clipped to `size`.
+
+    Returns None when the header is not a byte range set (it is then ignored) and an
+    empty list when no range is satisfiable.
+    """
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs.strip():
+        return None
+    ranges: List[ByteRange] = []
+    for spec in specs.split(","):
+        first, dash, last = spec.strip().partition("-")
+        if not dash:
+            return None
+        try:
+            if not first:
+                # Suffix range: the last N bytes
+                length = int(last)
+                if length <= 0 or size == 0:
+                    continue
+                ranges.append((max(size - length, 0), size - 1))
+                continue
+            start = int(first)
+            end = int(last) if last else None
+        except ValueError:
+            return None
+        if start < 0 or (end is not None and end < start):
+            return None
+        if start < size:
+            ranges.append((start, size - 1 if end is None else min(end, size - 1)))
+    return ranges
+
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    if "*" in candidates:
+        return True
+    if weak:
+        candidates = [candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates]
+    return etag in candidates
+
+
+def _not_modified_since(header: str, mtime: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return since is not None and int(mtime) <= since.timestamp()
+
+
+def file_content_response(
+    request_headers: Mapping[str, str],
+    path: Path,
+    file_id: str,
+    filename: str,
+) -> Response:
+    """
+    Build the response for a stored file: 304 for fresh conditional requests, 206 for a
+    satisfiable single byte range, 416 for unsatisfiable ones and 200 otherwise.
+    Multi-range requests are answered with the whole file, which RFC 9110 allows.
+    """
+    stat_result = path.stat()
+    size = stat_result.st_size
+    etag = file_etag(file_id, stat_result)
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    headers = {
+        "etag": etag,
+        "last-modified": last_modified,
+        "cache-control": f"private, max-age={settings.file_cache_max_age}",
+        "accept-ranges": "bytes",
+        "content-disposition": f"inline; filename*=utf-8''{quote(filename)}",
+    }
+
+    if_none_match = request_headers.get("if-none-match")
+    if_modified_since = request_headers.get("if-modified-since")
+    if (if_none_match and _etag_matches(if_none_match, etag, weak=True)) or (
+        if_none_match is None and if_modified_since and _not_modified_since(if_modified_since, stat_result.st_mtime)
+    ):
+        return Response(status_code=304, headers=headers)
+
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    range_header = request_headers.get("range")
+    if_range = request_headers.get("if-range")
+    if range_header and if_range:
+        # A stale If-Range validator means the client's partial copy is outdated: send everything
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            fresh = _etag_matches(if_range, etag, weak=False)
+        else:
+            fresh = if_range.strip() == last_modified
+        if not fresh:
+            range_header = None
+
+    ranges = parse_range(range_header, size) if range_header else None
+    if ranges is not None and not ranges:
+        return Response(status_code=416, headers={**headers, "content-range": f"bytes */{size}"})
+    if ranges is not None and len(ranges) == 1:
+        start, end = ranges[0]
+        return FileRangeResponse(
+            path,
+            start,
+            end - start + 1,
+            206,
+            {**headers, "content-range": f"bytes {start}-{end}/{size}"},
+            media_type,
+            whole_file=start == 0 and end == size - 1,
+        )
+    return FileRangeResponse(path, 0, size, 200, headers, media_type, whole_file=True)
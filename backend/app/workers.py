@@ -1,15 +1,23 @@
 """Background workers for handling long-running document processing."""
 import logging
+import shutil
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
+from typing import Callable, Set
 
 from . import crud
-from .create_index import SearchIndexError, get_search_service
+from .config import settings
+from .create_index import SearchIndexError, VectorProfile, get_search_service
 from .database import SessionLocal
 from .document_intelligence import DocumentProcessingError, get_document_service
 
 logger = logging.getLogger(__name__)
 
+_DELETING_PROJECTS: Set[str] = set()
+_DELETING_PROJECTS_LOCK = threading.Lock()
+
 
 def process_file(file_id: str) -> None:
     """Parse an uploaded file and push chunks into the associated Azure AI Search index."""
@@ -20,6 +28,9 @@ def process_file(file_id: str) -> None:
         if source_file is None or source_file.project is None:
             logger.warning("File %s not found or missing project reference; aborting.", file_id)
             return
+        if source_file.project.status == crud.PROJECT_DELETING:
+            logger.info("Project %s is being deleted; skipping file %s", source_file.project_id, file_id)
+            return
 
         document_service = get_document_service()
         search_service = get_search_service()
@@ -33,12 +44,20 @@ def process_file(file_id: str) -> None:
         chunks = document_service.extract_chunks(file_path)
         logger.info("Extracted %s chunk(s) from %s", len(chunks), source_file.original_filename)
 
+        # Uploading would recreate the index of a project deleted while the file was being parsed
+        db.refresh(source_file.project)
+        if source_file.project.status == crud.PROJECT_DELETING:
+            logger.info("Project %s is being deleted; skipping file %s", source_file.project_id, file_id)
+            return
+
         search_service.delete_file_chunks(source_file.project.index_name, source_file.file_id)
         search_service.upload_chunks(
             index_name=source_file.project.index_name,
             project_id=source_file.project.project_id,
             file_id=source_file.file_id,
             chunks=chunks,
+            file_name=source_file.original_filename,
+            profile=VectorProfile.for_project(source_file.project),
         )
 
         source_file.status = "COMPLETED"
@@ -61,3 +80,108 @@ def process_file(file_id: str) -> None:
         raise
     finally:
         db.close()
+
+
+def _with_retries(description: str, action: Callable[[], None]) -> None:
+    attempts = max(1, settings.project_delete_max_attempts)
+    for attempt in range(1, attempts + 1):
+        try:
+            action()
+            return
+        except (SearchIndexError, OSError) as exc:
+            if attempt == attempts:
+                raise
+            delay = settings.project_delete_retry_seconds * 2 ** (attempt - 1)
+            logger.warning(
+                "Failed to %s (attempt %s/%s): %s; retrying in %.1fs", description, attempt, attempts, exc, delay
+            )
+            time.sleep(delay)
+
+
+def delete_project_resources(project_id: str) -> None:
+    """
+    Remove everything a project marked DELETING still holds: its upload directory, its
+    search index (with the local mirror, pooled clients and reader state) and finally
+    its rows. Agent runs outlive their project (project_id is set to NULL), so the
+    payloads their results reference in the artifact store are kept.
+
+    Each step is retried with backoff; if one keeps failing the project stays DELETING
+    and is picked up again by the next DELETE request or on startup.
+    """
+    with _DELETING_PROJECTS_LOCK:
+        if project_id in _DELETING_PROJECTS:
+            return
+        _DELETING_PROJECTS.add(project_id)
+
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        project = crud.get_project(db, project_id, include_deleting=True)
+        if project is None or project.status != crud.PROJECT_DELETING:
+            return
+        index_name = project.index_name
+        file_count = len(project.files)
+
+        project_dir = Path(settings.storage_dir) / project_id
+
+        def remove_files() -> None:
+            if project_dir.exists():
+                shutil.rmtree(project_dir)
+
+        _with_retries(f"remove {project_dir}", remove_files)
+
+        search_service = get_search_service()
+        if search_service is not None:
+            _with_retries(f"delete index {index_name}", lambda: search_service.delete_index(index_name))
+
+        crud.delete_project(db, project_id)
+        logger.info(
+            "Deleted project %s: %s file(s) and index %s removed in %.2fs",
+            project_id,
+            file_count,
+            index_name,
+            time.monotonic() - started,
+        )
+    except (SearchIndexError, OSError) as exc:
+        logger.error("Failed to delete project %s; it stays marked for deletion: %s", project_id, exc)
+    except Exception:
+        logger.exception("Unexpected error while deleting project %s", project_id)
+        raise
+    finally:
+        db.close()
+        with _DELETING_PROJECTS_LOCK:
+            _DELETING_PROJECTS.discard(project_id)
+
+
+def resume_project_deletions() -> None:
+    """Finish deletions interrupted by a restart."""
+    db = SessionLocal()
+    try:
+        project_ids = [project.project_id for project in crud.list_deleting_projects(db)]
+    finally:
+        db.close()
+    for project_id in project_ids:
+        logger.info("Resuming deletion of project %s", project_id)
+        delete_project_resources(project_id)
+
+
+def upgrade_project_indexes() -> None:
+    """Bring the indexes of existing projects up to the current schema (file_name field, semantic configuration)."""
+    search_service = get_search_service()
+    if search_service is None:
+        return
+    db = SessionLocal()
+    try:
+        projects = crud.list_projects(db)
+        for project in projects:
+            try:
+                search_service.ensure_index(project.index_name, VectorProfile.for_project(project))
+            except SearchIndexError as exc:
+                logger.warning("Failed to upgrade index %s: %s", project.index_name, exc)
+    finally:
+        db.close()
+
+
+def run_startup_maintenance() -> None:
+    resume_project_deletions()
+    upgrade_project_indexes()
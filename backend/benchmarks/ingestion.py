@@ -0,0 +1,272 @@
+"""
+End-to-end ingestion throughput benchmark.
+
+Drives upload -> parse -> chunk -> embed -> index (`workers.process_file`) with
+synthetic PDFs and markdown against the offline stand-ins (`app.fakes`,
+FAKE_SERVICES=all) for every combination of format, document size and
+concurrency, and reports throughput, per-stage latency percentiles and peak RSS.
+Markdown files are already in the layout format Document Intelligence returns
+(the API itself only ingests PDFs): their parse stage reads the file, so those
+scenarios measure chunking, embedding and indexing of a known amount of text. The database and file
+storage live in a temporary directory, so the run does not touch project data.
+
+Usage (from backend/):
+
+    python benchmarks/ingestion.py --formats pdf,markdown --pages 5,50 --paragraphs 4 \\
+        --concurrency 1,4,8 --files 16 --latency-ms 40 --error-rate 0.01 --output ingestion.json
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from stats import peak_rss_mb, percentiles, run_metadata
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+STAGES = ("upload", "parse", "chunk", "delete_stale", "embed", "index", "total")
+FORMATS = ("pdf", "markdown")
+FILE_SUFFIXES = {"pdf": ".pdf", "markdown": ".md"}
+
+
+def synthetic_pdf(pages: int, seed: int) -> bytes:
+    """Minimal PDF with `pages` page objects; the seed makes every file's content (and canned layout) distinct."""
+    page_ids = range(3, 3 + pages)
+    objects = [
+        "1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj",
+        f"2 0 obj << /Type /Pages /Kids [{' '.join(f'{page_id} 0 R' for page_id in page_ids)}] /Count {pages} >> endobj",
+        *[f"{page_id} 0 obj << /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >> endobj" for page_id in page_ids],
+    ]
+    return "\n".join(["%PDF-1.4", f"% benchmark file {seed}", *objects, "trailer << /Root 1 0 R >>", "%%EOF"]).encode()
+
+
+def synthetic_markdown(pages: int, seed: int) -> bytes:
+    """Layout markdown with `pages` `<pageNum>` sections, as the fake Document Intelligence would return it."""
+    from app.fakes.document_intelligence import fake_layout_markdown
+
+    return fake_layout_markdown(f"benchmark markdown {seed}".encode(), pages=pages).encode("utf-8")
+
+
+def read_markdown_uploads(service_class) -> None:
+    """Let `parse_to_markdown` return markdown uploads as they are; PDFs still go through the fake service."""
+    analyze = service_class.parse_to_markdown
+
+    @functools.wraps(analyze)
+    def parse_to_markdown(self, file_path):
+        path = Path(file_path)
+        if path.suffix == FILE_SUFFIXES["markdown"]:
+            return path.read_text(encoding="utf-8")
+        return analyze(self, file_path)
+
+    service_class.parse_to_markdown = parse_to_markdown
+
+
+class StageTimer:
+    """Records the duration of every call to the wrapped pipeline methods."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def wrap(self, owner, name: str, stage: str) -> None:
+        original = getattr(owner, name)
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - started)
+
+        setattr(owner, name, timed)
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.samples[stage].append(seconds)
+
+
+def configure_environment(args) -> None:
+    """Point the app at a scratch database/storage and the fakes before it is imported."""
+    work_dir = Path(tempfile.mkdtemp(prefix="ingestion-bench-"))
+    os.environ.update(
+        {
+            "DATABASE_URL": f"sqlite:///{work_dir / 'bench.sqlite'}",
+            "STORAGE_DIR": str(work_dir / "storage"),
+            "FAKE_SERVICES": "all",
+            "SEARCH_BACKEND": args.search_backend,
+            "LOCAL_SEARCH_DIR": str(work_dir / "search_indexes"),
+            "FAKE_LATENCY_MS": str(args.latency_ms),
+            "FAKE_LATENCY_JITTER_MS": str(args.jitter_ms),
+            "FAKE_ERROR_RATE": str(args.error_rate),
+            "FAKE_SEED": str(args.seed),
+            "AZURE_OPENAI_EMBEDDING_DIMENSIONS": str(args.dimensions),
+        }
+    )
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def run_scenario(file_format: str, pages: int, concurrency: int, args, timer: StageTimer) -> dict:
+    from app import crud
+    from app.config import settings
+    from app.create_index import LocalSearchBackend, get_search_service
+    from app.database import SessionLocal
+    from app.fakes import FakeSearchIndexClient, FaultInjector
+    from app.workers import process_file
+
+    timer.samples.clear()
+    db = SessionLocal()
+    project = crud.create_project(db, f"bench-{file_format}-{pages}p-{concurrency}c")
+    project_id, index_name = project.project_id, project.index_name
+    db.close()
+    # Bookkeeping goes through a client without injected faults; fake indexes are shared per process
+    admin_client = FakeSearchIndexClient(faults=FaultInjector("search"))
+
+    project_dir = Path(settings.storage_dir) / project_id
+    project_dir.mkdir(parents=True, exist_ok=True)
+    synthesize = synthetic_pdf if file_format == "pdf" else synthetic_markdown
+    documents = [synthesize(pages, seed=hash((file_format, pages, concurrency, i))) for i in range(args.files)]
+
+    def ingest(position: int) -> None:
+        started = time.perf_counter()
+        # Upload: what POST /projects/{id}/files does before scheduling the worker
+        session = SessionLocal()
+        try:
+            destination = project_dir / f"file-{position:04d}{FILE_SUFFIXES[file_format]}"
+            destination.write_bytes(documents[position])
+            file_id = crud.create_source_file(session, project_id, destination.name, str(destination)).file_id
+        finally:
+            session.close()
+        timer.record("upload", time.perf_counter() - started)
+        try:
+            process_file(file_id)
+        except Exception:
+            # process_file marks the file FAILED before re-raising unexpected errors
+            pass
+        timer.record("total", time.perf_counter() - started)
+
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(ingest, range(args.files)))
+    wall_seconds = time.perf_counter() - wall_started
+
+    session = SessionLocal()
+    try:
+        statuses = [source_file.status for source_file in crud.get_project(session, project_id).files]
+    finally:
+        session.close()
+    completed = statuses.count("COMPLETED")
+    backend = get_search_service().backend
+    if isinstance(backend, LocalSearchBackend):
+        chunks = backend.engine.index(index_name).count()
+        backend.delete_index(index_name)
+    elif index_name in admin_client.list_index_names():
+        chunks = admin_client.get_search_client(index_name).get_document_count()
+        admin_client.delete_index(index_name)
+    else:
+        chunks = 0
+
+    return {
+        "format": file_format,
+        "pages_per_file": pages,
+        "paragraphs_per_page": settings.fake_document_paragraphs or "3-6",
+        "concurrency": concurrency,
+        "files": args.files,
+        "completed": completed,
+        "failed": statuses.count("FAILED"),
+        "chunks_indexed": chunks,
+        "wall_seconds": wall_seconds,
+        "pages_per_minute": completed * pages / wall_seconds * 60,
+        "files_per_second": completed / wall_seconds,
+        "chunks_per_second": chunks / wall_seconds,
+        "stage_seconds": {stage: percentiles(timer.samples[stage]) for stage in STAGES},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main(args) -> dict:
+    configure_environment(args)
+    from app import main as _app_main  # noqa: F401  (creates the database tables)
+    from app.config import settings
+    from app.create_index import AzureSearchService, LocalSearchBackend
+    from app.document_intelligence import DocumentIntelligenceService
+    from app.fakes import FakeSearchClient
+
+    if not args.verbose:
+        # Injected failures are logged with tracebacks by the worker
+        logging.disable(logging.CRITICAL)
+    settings.fake_document_paragraphs = args.paragraphs
+    read_markdown_uploads(DocumentIntelligenceService)
+    timer = StageTimer()
+    timer.wrap(DocumentIntelligenceService, "parse_to_markdown", "parse")
+    timer.wrap(DocumentIntelligenceService, "chunk_markdown", "chunk")
+    timer.wrap(AzureSearchService, "delete_file_chunks", "delete_stale")
+    timer.wrap(AzureSearchService, "_embed_texts", "embed")
+    timer.wrap(FakeSearchClient, "upload_documents", "index")
+    timer.wrap(LocalSearchBackend, "upload_documents", "index")
+
+    scenarios = []
+    for file_format in args.formats:
+        for pages in args.pages:
+            for concurrency in args.concurrency:
+                result = run_scenario(file_format, pages, concurrency, args, timer)
+                scenarios.append(result)
+                print(
+                    f"{file_format:<8} pages={pages:<4} concurrency={concurrency:<3} {result['pages_per_minute']:>10.1f} pages/min  "
+                    f"total p50={result['stage_seconds']['total']['p50']:.3f}s p95={result['stage_seconds']['total']['p95']:.3f}s  "
+                    f"failed={result['failed']}  rss={result['peak_rss_mb']:.0f}MB"
+                )
+
+    return {
+        "benchmark": "ingestion",
+        "metadata": run_metadata(),
+        "config": {
+            "files": args.files,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+            "dimensions": args.dimensions,
+            "search_backend": args.search_backend,
+            "seed": args.seed,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def _int_list(value: str):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def _format_list(value: str):
+    formats = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = sorted(set(formats) - set(FORMATS))
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown format(s): {', '.join(unknown)} (choose from {', '.join(FORMATS)})")
+    return formats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--formats", type=_format_list, default=list(FORMATS), help="comma list of pdf, markdown")
+    parser.add_argument("--pages", type=_int_list, default=[5, 20], help="comma list of pages per synthetic document")
+    parser.add_argument("--paragraphs", type=int, default=0, help="paragraphs per page (0: random 3-6)")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4], help="comma list of concurrent workers")
+    parser.add_argument("--files", type=int, default=8, help="files ingested per scenario")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="injected latency per fake service call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random extra latency per call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability that a fake call fails")
+    parser.add_argument("--dimensions", type=int, default=1536, help="embedding dimensions")
+    parser.add_argument("--search-backend", choices=["azure", "local"], default="azure", help="fake Azure AI Search or the local engine")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep application logging enabled")
+    args = parser.parse_args()
+
+    results = main(args)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
@@ -0,0 +1,297 @@
+"""
+HTTP load test for the FastAPI surface (projects, files and agent-runs routers).
+
+Runs three kinds of concurrent clients for a fixed duration:
+
+* uploaders post synthetic PDFs to POST /projects/{id}/files,
+* listers read GET /projects and GET /projects/{id},
+* pollers start research runs, poll GET /agent-runs/{id}, approve the plan and
+  start the next run once one completes,
+
+plus a probe hitting GET /health at a fixed interval: a slow probe under load
+points at handlers blocking the event loop. Reports throughput, p50/p95/p99
+latency and error rates per endpoint.
+
+By default the harness starts its own servers: the fake Durable Functions host
+(`app.fakes.durable`) and `uvicorn app.main:app --workers N` on the offline
+stand-ins, with a temporary database and storage. Pass --base-url to load an
+API that is already running instead.
+
+Usage (from backend/):
+
+    python benchmarks/load_test.py --workers 1,4 --duration 30 --uploaders 2 --listers 8 \\
+        --pollers 32 --output load_test.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+from ingestion import synthetic_pdf
+from stats import percentiles, run_metadata
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+APPROVAL_MESSAGE = "Human Approval"
+FINISHED_STATUSES = {"Completed", "Failed", "Terminated", "Canceled"}
+
+
+class EndpointStats:
+    """Latency samples and outcomes per endpoint template."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.status_codes: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            self.latencies[endpoint].append(time.perf_counter() - started)
+            self.status_codes[endpoint][type(exc).__name__] += 1
+            self.errors[endpoint] += 1
+            return None
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        self.status_codes[endpoint][str(response.status_code)] += 1
+        if response.status_code >= 400:
+            self.errors[endpoint] += 1
+        return response
+
+    def summary(self, duration: float) -> Dict[str, dict]:
+        return {
+            endpoint: {
+                "requests": len(samples),
+                "requests_per_second": len(samples) / duration,
+                "error_rate": self.errors[endpoint] / len(samples),
+                "status_codes": dict(self.status_codes[endpoint]),
+                "latency_seconds": percentiles(samples),
+            }
+            for endpoint, samples in sorted(self.latencies.items())
+        }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_healthy(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server for {url} exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server for {url} did not become ready within {timeout:.0f}s")
+
+
+@contextmanager
+def local_servers(workers: int, args) -> Iterator[str]:
+    """Start the fake Durable host and the API on free ports; yields the API base URL."""
+    work_dir = Path(tempfile.mkdtemp(prefix="load-test-"))
+    durable_port, api_port = _free_port(), _free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{work_dir / 'load.sqlite'}",
+        "STORAGE_DIR": str(work_dir / "storage"),
+        # The Durable stand-in runs as its own process so every API worker sees the same runs
+        "FAKE_SERVICES": "openai,search,document_intelligence",
+        "DURABLE_FUNCTIONS_BASE_URL": f"http://127.0.0.1:{durable_port}",
+        "FAKE_LATENCY_MS": str(args.latency_ms),
+        "FAKE_ERROR_RATE": str(args.error_rate),
+        "FAKE_DURABLE_STAGE_SECONDS": str(args.stage_seconds),
+    }
+    # Create the schema once instead of racing it from every worker
+    subprocess.run([sys.executable, "-c", "import app.main"], cwd=BACKEND_DIR, env=env, check=True)
+
+    uvicorn = [sys.executable, "-m", "uvicorn", "--host", "127.0.0.1", "--log-level", "warning"]
+    durable_env = {**env, "FAKE_SERVICES": "durable"}
+    processes = [
+        subprocess.Popen(
+            [*uvicorn, "--port", str(durable_port), "--factory", "app.fakes.durable:create_app"],
+            cwd=BACKEND_DIR,
+            env=durable_env,
+        ),
+        subprocess.Popen(
+            [*uvicorn, "--port", str(api_port), "--workers", str(workers), "app.main:app"],
+            cwd=BACKEND_DIR,
+            env=env,
+        ),
+    ]
+    try:
+        _wait_until_healthy(f"http://127.0.0.1:{durable_port}/api/httptrigger/missing", processes[0])
+        _wait_until_healthy(f"http://127.0.0.1:{api_port}/health", processes[1])
+        yield f"http://127.0.0.1:{api_port}"
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+async def uploader(client: httpx.AsyncClient, stats: EndpointStats, project_id: str, stop: float, args, seed: int) -> None:
+    rng = random.Random(seed)
+    position = 0
+    while time.monotonic() < stop:
+        document = synthetic_pdf(args.pages, seed=rng.getrandbits(32))
+        files = {"file": (f"load-{seed}-{position}.pdf", document, "application/pdf")}
+        await stats.request(client, "POST /projects/{id}/files", "POST", f"/projects/{project_id}/files", files=files)
+        position += 1
+
+
+async def lister(client: httpx.AsyncClient, stats: EndpointStats, project_ids: List[str], stop: float, seed: int) -> None:
+    rng = random.Random(seed)
+    while time.monotonic() < stop:
+        await stats.request(client, "GET /projects", "GET", "/projects")
+        await stats.request(client, "GET /projects/{id}", "GET", f"/projects/{rng.choice(project_ids)}")
+
+
+async def poller(client: httpx.AsyncClient, stats: EndpointStats, project_id: str, stop: float, args, seed: int) -> int:
+    """Run research runs back to back; returns how many reached a final status."""
+    finished = 0
+    while time.monotonic() < stop:
+        body = {"query": f"Load test query {seed}", "report_length": "short", "project_id": project_id}
+        response = await stats.request(client, "POST /agent-runs", "POST", "/agent-runs", json=body)
+        if response is None or response.status_code != 201:
+            await asyncio.sleep(args.poll_interval)
+            continue
+        run_id = response.json()["run_id"]
+        approved = False
+        while time.monotonic() < stop:
+            await asyncio.sleep(args.poll_interval)
+            response = await stats.request(client, "GET /agent-runs/{id}", "GET", f"/agent-runs/{run_id}")
+            if response is None or response.status_code >= 400:
+                continue
+            status_body = response.json()
+            if status_body.get("runtimeStatus") in FINISHED_STATUSES:
+                finished += 1
+                break
+            message = (status_body.get("customStatus") or {}).get("message", "")
+            if not approved and APPROVAL_MESSAGE in message:
+                feedback = await stats.request(
+                    client,
+                    "POST /agent-runs/{id}/human-feedback",
+                    "POST",
+                    f"/agent-runs/{run_id}/human-feedback",
+                    json={"action": "continue"},
+                )
+                approved = feedback is not None and feedback.status_code < 400
+    return finished
+
+
+async def probe(client: httpx.AsyncClient, stats: EndpointStats, stop: float, interval: float) -> None:
+    while time.monotonic() < stop:
+        await stats.request(client, "GET /health", "GET", "/health")
+        await asyncio.sleep(interval)
+
+
+async def run_load(base_url: str, args) -> dict:
+    stats = EndpointStats()
+    clients = args.uploaders + args.listers + args.pollers + 1
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        project_ids = []
+        for position in range(args.projects):
+            response = await client.post("/projects", json={"project_name": f"load-test-{position}"})
+            response.raise_for_status()
+            project_ids.append(response.json()["project_id"])
+
+        started = time.monotonic()
+        stop = started + args.duration
+        tasks = [probe(client, stats, stop, args.probe_interval)]
+        tasks += [uploader(client, stats, project_ids[i % len(project_ids)], stop, args, args.seed + i) for i in range(args.uploaders)]
+        tasks += [lister(client, stats, project_ids, stop, args.seed + i) for i in range(args.listers)]
+        pollers = [poller(client, stats, project_ids[i % len(project_ids)], stop, args, args.seed + i) for i in range(args.pollers)]
+        results = await asyncio.gather(*tasks, *pollers)
+        duration = time.monotonic() - started
+
+        for project_id in project_ids:
+            await client.delete(f"/projects/{project_id}")
+
+    endpoints = stats.summary(duration)
+    total = sum(endpoint["requests"] for endpoint in endpoints.values())
+    return {
+        "duration_seconds": duration,
+        "requests": total,
+        "requests_per_second": total / duration,
+        "runs_finished": sum(results[len(tasks):]),
+        "endpoints": endpoints,
+    }
+
+
+def print_summary(label: str, result: dict) -> None:
+    print(f"{label}: {result['requests_per_second']:.1f} req/s, {result['runs_finished']} runs finished")
+    for endpoint, summary in result["endpoints"].items():
+        latency = summary["latency_seconds"]
+        print(
+            f"  {endpoint:<38} {summary['requests_per_second']:>8.1f} req/s  p50={latency['p50'] * 1000:7.1f}ms "
+            f"p95={latency['p95'] * 1000:7.1f}ms p99={latency['p99'] * 1000:7.1f}ms  errors={summary['error_rate']:.1%}"
+        )
+
+
+def main(args) -> dict:
+    scenarios = []
+    if args.base_url:
+        result = asyncio.run(run_load(args.base_url.rstrip("/"), args))
+        print_summary(args.base_url, result)
+        scenarios.append({"base_url": args.base_url, **result})
+    else:
+        for workers in args.workers:
+            with local_servers(workers, args) as base_url:
+                result = asyncio.run(run_load(base_url, args))
+            print_summary(f"workers={workers}", result)
+            scenarios.append({"workers": workers, **result})
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    return {"benchmark": "load_test", "metadata": run_metadata(), "config": config, "scenarios": scenarios}
+
+
+def _int_list(value: str):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="load an already running API instead of starting local servers")
+    parser.add_argument("--workers", type=_int_list, default=[1], help="comma list of uvicorn worker counts to compare")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load per scenario")
+    parser.add_argument("--projects", type=int, default=4, help="projects created for the run")
+    parser.add_argument("--uploaders", type=int, default=2, help="clients uploading files")
+    parser.add_argument("--listers", type=int, default=4, help="clients listing projects")
+    parser.add_argument("--pollers", type=int, default=16, help="clients running and polling research runs")
+    parser.add_argument("--pages", type=int, default=5, help="pages per uploaded synthetic PDF")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="seconds between status polls")
+    parser.add_argument("--probe-interval", type=float, default=0.1, help="seconds between /health probes")
+    parser.add_argument("--timeout", type=float, default=30.0, help="request timeout in seconds")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="injected latency per fake service call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability that a fake call fails")
+    parser.add_argument("--stage-seconds", type=float, default=1.0, help="duration of each fake orchestration stage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = main(args)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
@@ -0,0 +1,118 @@
+"""
+Benchmark the "standard" and "fast" research modes.
+
+For every topic of a plan, runs what one research_orchestrator topic does
+(batched step searches followed by one topic summary) in both modes against the
+services configured for the Durable Functions app, and reports per-topic latency
+and responses API token usage.
+
+Usage (from backend/durable_func so its modules and local.settings.json are found):
+
+    python ../benchmarks/research_modes.py --plan plan.json --repeat 3 --output research_modes.json
+
+`plan.json` is a `plan_executor` output: {"topics": [{"topic": ..., "search_type": ..., "steps": [...]}]}.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+DURABLE_FUNC_DIR = Path(__file__).resolve().parent.parent / "durable_func"
+sys.path.insert(0, str(DURABLE_FUNC_DIR))
+
+MODES = ("standard", "fast")
+
+
+def load_local_settings() -> None:
+    settings_path = DURABLE_FUNC_DIR / "local.settings.json"
+    if settings_path.exists():
+        values = json.loads(settings_path.read_text()).get("Values", {})
+        for key, value in values.items():
+            os.environ.setdefault(key, value)
+
+
+async def run_topic(tool, topic: dict, mode: str) -> dict:
+    from prompt_template import summary_passages_template, summary_template
+
+    usage_before = dict(tool.llm_usage)
+    started = time.perf_counter()
+
+    # Bypass the response cache so repeated passes measure real model calls
+    steps = [
+        {"query": step, "search_type": "semantic", "research_mode": mode, "bypass_cache": True}
+        for step in topic["steps"]
+    ]
+    results = await tool.research_queries(steps)
+    search_seconds = time.perf_counter() - started
+
+    step_results = [{"query": step, "result": result} for step, result in zip(topic["steps"], results)]
+    template = summary_passages_template if mode == "fast" else summary_template
+    prompt = template.format(topic=topic, research_info=json.dumps(step_results, ensure_ascii=False, indent=2))
+    await tool.generate_research(prompt, model=tool.llm_model, bypass_cache=True)
+
+    return {
+        "topic": topic["topic"],
+        "search_seconds": search_seconds,
+        "total_seconds": time.perf_counter() - started,
+        **{key: tool.llm_usage[key] - usage_before[key] for key in tool.llm_usage},
+    }
+
+
+def summarize(samples: list) -> dict:
+    latencies = [sample["total_seconds"] for sample in samples]
+    return {
+        "topics": len(samples),
+        "latency_mean_seconds": statistics.mean(latencies),
+        "latency_p50_seconds": statistics.median(latencies),
+        "latency_max_seconds": max(latencies),
+        "search_mean_seconds": statistics.mean(sample["search_seconds"] for sample in samples),
+        "llm_calls": sum(sample["calls"] for sample in samples),
+        "input_tokens": sum(sample["input_tokens"] for sample in samples),
+        "output_tokens": sum(sample["output_tokens"] for sample in samples),
+    }
+
+
+async def main(args) -> dict:
+    load_local_settings()
+    from utils import get_search_tool
+
+    topics = json.loads(Path(args.plan).read_text())["topics"]
+    tool = get_search_tool()
+    # Caches would let the second mode reuse the first mode's work
+    tool.result_cache.max_size = 0
+    tool.embedding_cache.max_size = 0
+
+    samples = {mode: [] for mode in MODES}
+    for _ in range(args.repeat):
+        for topic in topics:
+            for mode in MODES:
+                samples[mode].append(await run_topic(tool, topic, mode))
+
+    report = {mode: summarize(samples[mode]) for mode in MODES}
+    standard, fast = report["standard"], report["fast"]
+    report["fast_vs_standard"] = {
+        "latency_reduction": 1 - fast["latency_mean_seconds"] / standard["latency_mean_seconds"],
+        "llm_calls_saved": standard["llm_calls"] - fast["llm_calls"],
+        "input_tokens_saved": standard["input_tokens"] - fast["input_tokens"],
+        "output_tokens_saved": standard["output_tokens"] - fast["output_tokens"],
+    }
+    report["samples"] = samples
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plan", required=True, help="plan_executor output JSON file")
+    parser.add_argument("--repeat", type=int, default=1, help="number of passes over the plan")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    summary = {key: value for key, value in report.items() if key != "samples"}
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
@@ -0,0 +1,48 @@
+"""Small helpers shared by the benchmark scripts."""
+import math
+import platform
+import resource
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Sequence
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def percentiles(values: Sequence[float], points: Sequence[int] = (50, 90, 95, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles plus count/mean/max of `values` (empty input gives zeros)."""
+    ordered = sorted(values)
+    summary = {"count": len(ordered)}
+    if not ordered:
+        return {**summary, "mean": 0.0, "max": 0.0, **{f"p{point}": 0.0 for point in points}}
+    summary["mean"] = sum(ordered) / len(ordered)
+    summary["max"] = ordered[-1]
+    for point in points:
+        rank = max(math.ceil(point / 100 * len(ordered)), 1)
+        summary[f"p{point}"] = ordered[rank - 1]
+    return summary
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_metadata() -> Dict[str, str]:
+    """Environment details stored with every result file so runs can be compared."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
@@ -0,0 +1,151 @@
+"""
+Context assembly for per-step research prompts
+
+Search hits are chunks with a 200-character overlap, so neighbouring chunks of
+the same file repeat text. The builder drops duplicated chunks, stitches
+overlapping neighbours from the same file into one passage, orders passages by
+reranker score and fits them into a token budget.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_TOKEN_BUDGET = 6000
+PASSAGE_SEPARATOR = "\n--------------------------\n"
+# Shortest suffix/prefix match treated as chunk overlap rather than coincidence
+MIN_OVERLAP_CHARS = 20
+MAX_OVERLAP_CHARS = 2000
+# Do not bother adding a truncated passage smaller than this
+MIN_PASSAGE_TOKENS = 100
+
+try:
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:  # tiktoken is optional; fall back to a character heuristic
+    _ENCODING = None
+
+
+def count_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if _ENCODING is not None:
+        return _ENCODING.decode(_ENCODING.encode(text)[:max_tokens])
+    return text[: max_tokens * 4]
+
+
+def _overlap_length(left: str, right: str) -> int:
+    """Length of the longest suffix of `left` that is a prefix of `right`."""
+    if len(right) < MIN_OVERLAP_CHARS:
+        return 0
+    probe = right[:MIN_OVERLAP_CHARS]
+    position = left.find(probe, max(len(left) - MAX_OVERLAP_CHARS, 0))
+    while position != -1:
+        if right.startswith(left[position:]):
+            return len(left) - position
+        position = left.find(probe, position + 1)
+    return 0
+
+
+def _score(doc: Dict[str, Any]) -> float:
+    reranker_score = doc.get("@search.reranker_score")
+    if reranker_score is not None:
+        return float(reranker_score)
+    return float(doc.get("@search.score") or 0.0)
+
+
+def _merge_file_passages(passages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop contained chunks and stitch overlapping chunks of one file together."""
+    merged: List[Dict[str, Any]] = []
+    for passage in passages:
+        content = passage["content"]
+        absorbed = False
+        for existing in merged:
+            if content in existing["content"]:
+                absorbed = True
+            elif existing["content"] in content:
+                existing["content"] = content
+                absorbed = True
+            else:
+                overlap = _overlap_length(existing["content"], content)
+                if overlap:
+                    existing["content"] += content[overlap:]
+                    absorbed = True
+                else:
+                    overlap = _overlap_length(content, existing["content"])
+                    if overlap:
+                        existing["content"] = content + existing["content"][overlap:]
+                        absorbed = True
+            if absorbed:
+                existing["score"] = max(existing["score"], passage["score"])
+                existing["pages"].update(passage["pages"])
+                break
+        if not absorbed:
+            merged.append(passage)
+    return merged
+
+
+def build_research_context(
+    documents: List[Dict[str, Any]], token_budget: int = DEFAULT_TOKEN_BUDGET, cite_pages: bool = False
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the `context` section of the research prompt from search hits.
+
+    With `cite_pages`, each passage header also lists the page numbers it covers.
+    Returns the context text and stats (hits, passages used, tokens, truncation).
+    """
+    by_file: Dict[str, List[Dict[str, Any]]] = {}
+    for doc in documents:
+        content = (doc.get("content") or "").strip()
+        if not content:
+            continue
+        file_name = doc.get("file_name") or ""
+        page_number: Optional[int] = doc.get("page_number")
+        by_file.setdefault(file_name, []).append(
+            {
+                "file_name": file_name,
+                "content": content,
+                "score": _score(doc),
+                "pages": {page_number} if page_number else set(),
+                "order": (page_number or 0, str(doc.get("docId") or doc.get("id") or "")),
+            }
+        )
+
+    passages: List[Dict[str, Any]] = []
+    for file_passages in by_file.values():
+        # Stitch in document order so neighbours are adjacent
+        file_passages.sort(key=lambda item: item.pop("order"))
+        passages.extend(_merge_file_passages(file_passages))
+    passages.sort(key=lambda item: item["score"], reverse=True)
+
+    blocks: List[str] = []
+    used_tokens = 0
+    truncated = False
+    separator_tokens = count_tokens(PASSAGE_SEPARATOR)
+    for passage in passages:
+        header = f"File: {passage['file_name']}"
+        if cite_pages and passage["pages"]:
+            header += f" (pages {', '.join(str(page) for page in sorted(passage['pages']))})"
+        block = f"{header}\nContent: {passage['content']}\n"
+        block_tokens = count_tokens(block) + (separator_tokens if blocks else 0)
+        remaining = token_budget - used_tokens
+        if block_tokens > remaining:
+            truncated = True
+            if remaining >= MIN_PASSAGE_TOKENS:
+                blocks.append(_truncate_to_tokens(block, remaining - separator_tokens))
+                used_tokens = token_budget
+            break
+        blocks.append(block)
+        used_tokens += block_tokens
+
+    stats = {
+        "hits": len(documents),
+        "passages": len(passages),
+        "passages_used": len(blocks),
+        "context_tokens": used_tokens,
+        "truncated": truncated,
+    }
+    return PASSAGE_SEPARATOR.join(blocks), stats
@@ -22,21 +22,142 @@ from agent_framework import (
     ChatAgent,
 )
 from agent_framework.azure import AzureOpenAIChatClient
+from openai import AsyncAzureOpenAI
 
 import asyncio
-from utils import ResearchTopics, AISearchTool
-from prompt_template import plan_template, task_query, summary_template, report_template, report_instruction_template
+import threading
+from utils import ResearchTopics, get_search_tool
+from payload_store import get_payload_store, payload_key, report_stream_key
+from plan_normalizer import DEFAULT_SIMILARITY_THRESHOLD, normalize_plan
+from context_builder import count_tokens
+from rate_limiter import OUTPUT_TOKENS_ESTIMATE, get_rate_limiter
+from response_cache import get_response_cache, response_cache_key
+from prompt_template import plan_template, task_query, summary_template, summary_passages_template, report_template, report_instruction_template
 
 import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MODEL_DEPLOYMENT_NAME = os.environ.get("MODEL_DEPLOYMENT_NAME", "gpt-4.1-mini")
+
+# Agent calls go through the shared rate limiter, which does the retrying; SDK retries would bypass its AIMD
 chat_client = AzureOpenAIChatClient(
-    api_key=os.environ.get("AZURE_OPENAI_API_KEY", ""),
-    end_point=os.environ.get("AZURE_OPENAI_ENDPOINT", ""),
-    deployment_name=os.environ.get("MODEL_DEPLOYMENT_NAME", "gpt-4.1-mini")
+    deployment_name=MODEL_DEPLOYMENT_NAME,
+    async_client=AsyncAzureOpenAI(
+        api_key=os.environ.get("AZURE_OPENAI_API_KEY", ""),
+        azure_endpoint=os.environ.get("AZURE_OPENAI_ENDPOINT", ""),
+        api_version=os.environ.get("AZURE_OPENAI_API_VERSION", "2024-10-21"),
+        max_retries=0,
+    ),
 )
 
+# Maximum number of topics researched at the same time when a run does not set `topic_concurrency`
+DEFAULT_TOPIC_CONCURRENCY = int(os.environ.get("TOPIC_CONCURRENCY", "4"))
+# Token-set Jaccard similarity above which two plan steps are treated as the same search
+PLAN_STEP_SIMILARITY_THRESHOLD = float(os.environ.get("PLAN_STEP_SIMILARITY_THRESHOLD", DEFAULT_SIMILARITY_THRESHOLD))
+# Streamed output is appended to its artifact in chunks of at least this many characters
+STREAM_FLUSH_CHARS = int(os.environ.get("STREAM_FLUSH_CHARS", "200"))
+
+# Warm-worker pool: agents are created once per worker process and reused by every
+# activity invocation. Activities are async and share the worker's event loop.
+_AGENTS: dict = {}
+_AGENTS_LOCK = threading.Lock()
+
+
+def get_agent(key, **agent_kwargs) -> ChatAgent:
+    """Return the pooled ChatAgent for `key`, creating it on first use."""
+    agent = _AGENTS.get(key)
+    if agent is None:
+        with _AGENTS_LOCK:
+            agent = _AGENTS.get(key)
+            if agent is None:
+                agent = ChatAgent(chat_client=chat_client, **agent_kwargs)
+                _AGENTS[key] = agent
+    return agent
+
+
+async def run_agent(key, prompt, bypass_cache=False, stream_key=None, **agent_kwargs) -> str:
+    """Run the pooled agent `key` on `prompt`; byte-identical requests are served from the response cache.
+
+    With `bypass_cache` the model is always called (the fresh response still refreshes the cache).
+    With `stream_key` the response is also streamed into that payload store artifact as it is generated.
+    """
+    response_format = agent_kwargs.get("response_format")
+    cache_key = response_cache_key(
+        MODEL_DEPLOYMENT_NAME,
+        agent_kwargs.get("instructions"),
+        prompt,
+        response_format=response_format.model_json_schema() if response_format is not None else None,
+    )
+    response_cache = get_response_cache()
+    if not bypass_cache:
+        cached = await asyncio.to_thread(response_cache.get, cache_key)
+        if cached is not None:
+            logger.info(f"Response cache hit for agent '{key}'")
+            if stream_key:
+                await _write_stream(stream_key, cached)
+            return cached
+
+    agent = get_agent(key, **agent_kwargs)
+    # Every model call shares the worker's Azure OpenAI budget (see rate_limiter)
+    tokens = count_tokens(str(prompt)) + count_tokens(str(agent_kwargs.get("instructions", ""))) + OUTPUT_TOKENS_ESTIMATE
+    if stream_key:
+        text = await _stream_agent(agent, prompt, stream_key, tokens)
+    else:
+        response = await get_rate_limiter().call(lambda: agent.run(prompt), tokens=tokens, usage=_agent_tokens)
+        text = response.text
+    await asyncio.to_thread(response_cache.put, cache_key, text)
+    return text
+
+
+def _agent_tokens(response):
+    """Total tokens reported for an agent run, if the chat client returned usage."""
+    usage = getattr(response, "usage_details", None)
+    return getattr(usage, "total_token_count", None)
+
+
+async def _stream_agent(agent, prompt, stream_key, tokens=0) -> str:
+    """
+    Run `agent` in streaming mode, appending its output to the `stream_key` artifact.
+
+    If the run fails part way, the artifact is marked failed so that readers stop
+    following it instead of waiting for a completion marker that never comes.
+    """
+    payload_store = get_payload_store()
+    await asyncio.to_thread(payload_store.start_stream, stream_key)
+    chunks = []
+    pending = []
+    pending_chars = 0
+    try:
+        async for update in get_rate_limiter().stream(lambda: agent.run_stream(prompt), tokens=tokens):
+            if not update.text:
+                continue
+            chunks.append(update.text)
+            pending.append(update.text)
+            pending_chars += len(update.text)
+            if pending_chars >= STREAM_FLUSH_CHARS:
+                await asyncio.to_thread(payload_store.append_stream, stream_key, "".join(pending))
+                pending = []
+                pending_chars = 0
+        if pending:
+            await asyncio.to_thread(payload_store.append_stream, stream_key, "".join(pending))
+        await asyncio.to_thread(payload_store.finish_stream, stream_key)
+    except BaseException:
+        try:
+            await asyncio.to_thread(payload_store.fail_stream, stream_key)
+        except Exception as e:
+            logger.warning(f"Could not mark report stream {stream_key} as failed: {e}")
+        raise
+    return "".join(chunks)
+
+
+async def _write_stream(stream_key, text) -> None:
+    """Write an already complete response to the `stream_key` artifact."""
+    payload_store = get_payload_store()
+    await asyncio.to_thread(payload_store.start_stream, stream_key)
+    await asyncio.to_thread(payload_store.append_stream, stream_key, text)
+    await asyncio.to_thread(payload_store.finish_stream, stream_key)
+
 my_app = df.DFApp(http_auth_level=func.AuthLevel.ANONYMOUS)
 
 # add http trigger function
@@ -57,8 +178,24 @@ async def HttpStart(req: func.HttpRequest, client) -> func.HttpResponse:
     query = request_body.get("query", "")
     report_length = request_body.get("report_length", "medium")
     orchestrator = request_body.get("orchestrator", "report_seq_orchestrator")
-
-    instance_id = await client.start_new(orchestrator, client_input={"query": query, "report_length": report_length})
+    topic_concurrency = request_body.get("topic_concurrency") or DEFAULT_TOPIC_CONCURRENCY
+    research_mode = request_body.get("research_mode", "standard")
+    bypass_cache = bool(request_body.get("bypass_cache", False))
+    # Project runs search the project's own index instead of AZURE_AI_SEARCH_INDEX_NAME
+    index_name = request_body.get("index_name")
+    # Reduced embedding dimensions of a compact project index (None: the model's native size)
+    embedding_dimensions = request_body.get("embedding_dimensions")
+
+    client_input = {
+        "query": query,
+        "report_length": report_length,
+        "topic_concurrency": topic_concurrency,
+        "research_mode": research_mode,
+        "bypass_cache": bypass_cache,
+        "index_name": index_name,
+        "embedding_dimensions": embedding_dimensions,
+    }
+    instance_id = await client.start_new(orchestrator, client_input=client_input)
 
     #return json.dumps({ "instance_id": instance_id })
     response = client.create_check_status_response(req, instance_id)
@@ -71,10 +208,160 @@ def report_seq_orchestrator(context):
 
     input: str = _input.get("query", "")
     report_length: str = _input.get("report_length", "medium")
+    research_mode: str = _input.get("research_mode", "standard")
+    bypass_cache: bool = _input.get("bypass_cache", False)
+    search_options = _search_options(_input)
+
+    # 1. Task extraction + human approval, 2. Planning
+    search_tasks = yield from _extract_and_plan(context, input, bypass_cache)
+    if search_tasks is None:
+        return {"status": "terminated by user"}
+
+    topic_count = len(search_tasks)
+    topic_concurrency = max(1, int(_input.get("topic_concurrency") or DEFAULT_TOPIC_CONCURRENCY))
+
+    # 2.1 Plan normalization: merge near-duplicate steps so each unique search runs once.
+    # A unique step is searched by the first topic referencing it; later topics reuse its result.
+    normalized_plan = yield context.call_activity("normalize_plan_executor", search_tasks)
+    unique_steps = normalized_plan["unique_steps"]
+    topic_steps = normalized_plan["topic_steps"]
+    owned_steps = []
+    claimed = set()
+    for step_ids in topic_steps:
+        owned = [uid for uid in dict.fromkeys(step_ids) if uid not in claimed]
+        claimed.update(owned)
+        owned_steps.append(owned)
+
+    # 3. Research topics concurrently, keeping at most `topic_concurrency` topics in flight.
+    # Each topic runs its searches and then its summary; a new topic starts as soon as one finishes.
+    # Large intermediate payloads are offloaded by the activities; only references
+    # travel through the orchestration history.
+    run_id = context.instance_id
+    results = [None] * topic_count
+    step_results_all = [None] * topic_count
+    step_results_by_id = {}
+    in_flight = []  # (task, topic index, phase)
+    waiting = []  # topics whose own searches finished but that need steps owned by another topic
+    next_topic = 0
+    completed_topics = 0
+
+    def start_next_topic():
+        nonlocal next_topic
+        i = next_topic
+        next_topic += 1
+        if owned_steps[i]:
+            steps = [
+                {"query": unique_steps[uid], "payload_key": payload_key(run_id, "search", f"{uid:03d}.json")}
+                for uid in owned_steps[i]
+            ]
+            task = _schedule_search_batch(context, steps, search_options)
+            in_flight.append((task, i, "search"))
+        else:
+            waiting.append(i)
+
+    def start_ready_summaries():
+        for i in list(waiting):
+            if not all(uid in step_results_by_id for uid in topic_steps[i]):
+                continue
+            waiting.remove(i)
+            # 3-2 fan the unique search results back out to the topic and summarize them
+            step_results = []
+            seen_ids = set()
+            for step, uid in zip(search_tasks[i]['steps'], topic_steps[i]):
+                if uid not in seen_ids:
+                    seen_ids.add(uid)
+                    step_results.append({"query": step, "result": step_results_by_id[uid]})
+            step_results_all[i] = step_results
+            summary_input = {
+                "topic": search_tasks[i],
+                "step_results": step_results,
+                "payload_key": payload_key(run_id, "summary", f"{i:02d}.json"),
+                "research_mode": research_mode,
+                "bypass_cache": bypass_cache,
+            }
+            in_flight.append((context.call_activity("summary_executor", summary_input), i, "summary"))
+
+    context.set_custom_status({
+        "message": f"'research & summary' in progress (0/{topic_count} topics, {normalized_plan['searches_saved']} duplicate searches skipped)",
+        "progress": 0.5,
+    })
+    while next_topic < topic_count and len(in_flight) + len(waiting) < topic_concurrency:
+        start_next_topic()
+    start_ready_summaries()
+
+    while in_flight:
+        winner = yield context.task_any([task for task, _, _ in in_flight])
+        entry = next(item for item in in_flight if item[0] is winner)
+        in_flight.remove(entry)
+        _, i, phase = entry
+        if isinstance(winner.result, Exception):
+            raise winner.result
+
+        topic = search_tasks[i]
+        if phase == "search":
+            # 3-1 search steps finished for the topic
+            for uid, step_result in zip(owned_steps[i], winner.result):
+                step_results_by_id[uid] = step_result["result"]
+            waiting.append(i)
+        else:
+            results[i] = {"topic": topic['topic'], "search_type": topic['search_type'], "summary": winner.result}
+            completed_topics += 1
+            context.set_custom_status({
+                "message": f"'research & summary' in progress ({completed_topics}/{topic_count} topics)",
+                "progress": 0.5 + completed_topics / topic_count * 0.25,
+            })
+            while next_topic < topic_count and len(in_flight) + len(waiting) < topic_concurrency:
+                start_next_topic()
+        start_ready_summaries()
+
+    context.set_custom_status({"message": "'report generation' in progress", "progress": 0.75})
+    report_input = {
+        "query": input,
+        "research_results": results,
+        "report_length": report_length
+    }   
+    report_result = yield context.call_activity(
+        "report_executor",
+        {
+            **report_input,
+            "payload_key": payload_key(run_id, "report.json"),
+            "stream_key": report_stream_key(run_id),
+            "bypass_cache": bypass_cache,
+        },
+    )
+
+    context.set_custom_status({"message": "'report generation' completed", "progress": 1.0})
+    #return {"report": report_result, "report_input": report_input}
+    # Summaries, search results and the report are returned as payload references
+    # when they were offloaded; the FastAPI status endpoint resolves them.
+    plan_stats = {
+        "total_steps": normalized_plan["total_steps"],
+        "unique_searches": len(unique_steps),
+        "searches_saved": normalized_plan["searches_saved"],
+    }
+    return {"final_report": report_result, "report_input": report_input, "search_results": step_results_all, "search_tasks": search_tasks, "plan_stats": plan_stats}
+
+def _search_options(run_input):
+    """Run-level options every search activity of a run receives."""
+    return {
+        "research_mode": run_input.get("research_mode", "standard"),
+        "bypass_cache": run_input.get("bypass_cache", False),
+        "index_name": run_input.get("index_name"),
+        "embedding_dimensions": run_input.get("embedding_dimensions"),
+    }
+
+def _schedule_search_batch(context, steps, search_options):
+    """Schedule one batched search activity; `steps` are {"query", "payload_key"} dicts."""
+    return context.call_activity("search_batch_executor", {"steps": steps, **search_options})
 
+def _extract_and_plan(context, query, bypass_cache=False):
+    """Run task extraction, wait for human approval and plan the research topics.
+
+    Returns the planned topics, or None when the user cancelled the run.
+    """
     context.set_custom_status({"message": "'task extraction' in progress", "progress": 0.0})
     # 1. Task extraction
-    task_result = yield context.call_activity("task_executor", input)
+    task_result = yield context.call_activity("task_executor", {"query": query, "bypass_cache": bypass_cache})
 
     # 1.1 Human approval
     context.set_custom_status({"message": "'Human Approval' is needed", "human_feedback": task_result, "progress": 0.1})
@@ -83,179 +370,229 @@ def report_seq_orchestrator(context):
     feedback_action = human_feedback.get("action", "continue")
     if not feedback_action == "continue":
         context.set_custom_status({"message": "Orchestration terminated by user", "progress": 0.0})
-        return {"status": "terminated by user"}
+        return None
     print("Human feedback received:", human_feedback['action'])
 
     # 2. Planning
     context.set_custom_status({"message": "'planning' in progress", "progress": 0.25})
-    plan_result = yield context.call_activity("plan_executor", task_result)
-    search_tasks = plan_result.get("topics", [])
-
-    topic_count = len(search_tasks)
-
-    # 3. Research sequentially
-    results = []
-    step_results_all = []
-    for i, topic in enumerate(search_tasks):
+    plan_result = yield context.call_activity("plan_executor", {"tasks": task_result, "bypass_cache": bypass_cache})
+    return plan_result.get("topics", [])
 
-        #print(f"Topic: {topic['topic']}, Search Type: {topic['search_type']}, Steps: {topic['steps']}")
-
-        topic_results = {"topic": topic['topic'], "search_type": topic['search_type'], "summary": ""}
-        tasks = []
-        for step in topic['steps']:
-            #print(f"- {step}")
-            search_input = {"query": step, "search_type": topic['search_type']}
-            tasks.append(context.call_activity("search_executor", search_input))
+# Sub Orchestrator example
+# https://learn.microsoft.com/en-us/azure/azure-functions/durable/durable-functions-sub-orchestrations?tabs=python
+@my_app.orchestration_trigger(context_name="context")
+def report_parallel_orchestrator(context):
+    _input: dict = context.get_input()
 
-        context.set_custom_status({"message": f"'research & summary ({topic['topic']})' in progress", "progress": 0.5 + i / topic_count * 0.25})
-        # 3-1 search steps for the topic
-        step_results = yield context.task_all(tasks)
-        step_results_all.append(step_results)
+    input: str = _input.get("query", "")
+    report_length: str = _input.get("report_length", "medium")
+    bypass_cache: bool = _input.get("bypass_cache", False)
 
-        # 3-2 summarize the search results for the topic
-        summary_result = yield context.call_activity("summary_executor", {"topic": topic, "step_results": step_results})
+    # 1. Task extraction + human approval, 2. Planning
+    search_tasks = yield from _extract_and_plan(context, input, bypass_cache)
+    if search_tasks is None:
+        return {"status": "terminated by user"}
 
-        topic_results["summary"] = summary_result
-        
-        results.append(topic_results)
+    topic_count = len(search_tasks)
+    topic_concurrency = max(1, int(_input.get("topic_concurrency") or DEFAULT_TOPIC_CONCURRENCY))
+
+    # 3. Research sub-orchestrations in a sliding window: keep `topic_concurrency`
+    # research_orchestrator instances in flight and start the next topic as soon as any finishes.
+    run_id = context.instance_id
+    results = [None] * topic_count
+    step_results_all = [None] * topic_count
+    in_flight = []  # (task, topic index)
+    next_topic = 0
+    completed_topics = 0
+
+    def start_next_topic():
+        nonlocal next_topic
+        research_input = {
+            "run_id": run_id,
+            "index": next_topic,
+            "topic": search_tasks[next_topic],
+            **_search_options(_input),
+        }
+        task = context.call_sub_orchestrator(
+            "research_orchestrator", research_input, f"{run_id}:topic-{next_topic:02d}"
+        )
+        in_flight.append((task, next_topic))
+        next_topic += 1
+
+    context.set_custom_status({"message": f"'research & summary' in progress (0/{topic_count} topics)", "progress": 0.5})
+    while next_topic < topic_count and len(in_flight) < topic_concurrency:
+        start_next_topic()
+
+    while in_flight:
+        winner = yield context.task_any([task for task, _ in in_flight])
+        entry = next(item for item in in_flight if item[0] is winner)
+        in_flight.remove(entry)
+        if isinstance(winner.result, Exception):
+            raise winner.result
+
+        i = entry[1]
+        topic_results = dict(winner.result)
+        step_results_all[i] = topic_results.pop("step_results")
+        results[i] = topic_results
+        completed_topics += 1
+        context.set_custom_status({
+            "message": f"'research & summary' in progress ({completed_topics}/{topic_count} topics)",
+            "progress": 0.5 + completed_topics / topic_count * 0.25,
+        })
+        if next_topic < topic_count:
+            start_next_topic()
 
     context.set_custom_status({"message": "'report generation' in progress", "progress": 0.75})
     report_input = {
         "query": input,
         "research_results": results,
         "report_length": report_length
-    }   
-    report_result = yield context.call_activity("report_executor", report_input)
+    }
+    report_result = yield context.call_activity(
+        "report_executor",
+        {
+            **report_input,
+            "payload_key": payload_key(run_id, "report.json"),
+            "stream_key": report_stream_key(run_id),
+            "bypass_cache": bypass_cache,
+        },
+    )
 
     context.set_custom_status({"message": "'report generation' completed", "progress": 1.0})
-    #return {"report": report_result, "report_input": report_input}
     return {"final_report": report_result, "report_input": report_input, "search_results": step_results_all, "search_tasks": search_tasks}
 
-# Sub Orchestrator example
-# https://learn.microsoft.com/en-us/azure/azure-functions/durable/durable-functions-sub-orchestrations?tabs=python
-@my_app.orchestration_trigger(context_name="context")
-def report_parallel_orchestrator(context):
-    input: str = context.get_input()
-
-    # 1. Task extraction
-    task_result = yield context.call_activity("task_executor", input)
-
-    # 2. Planning
-    plan_result = yield context.call_activity("plan_executor", task_result)
-    search_tasks = plan_result.get("topics", [])
-
-    # 3. Research sub-orchestration
-    tasks = []
-    for i, topic in enumerate(search_tasks):
-
-        tasks.append(context.call_sub_orchestrator("research_orchestrator", topic))
-
-        # run only 3 topics in parallel to mitigate bursting
-        if (i+1) % 3 == 0 and i > 0:
-            results = yield context.task_all(tasks)
-            tasks = []
-
-    if tasks:
-        results += yield context.task_all(tasks)
-
-    report_input = {
-        "query": input,
-        "research_results": results
-    }   
-    report_result = yield context.call_activity("report_executor", report_input)
-    return report_result
-
 @my_app.orchestration_trigger(context_name="context")
 def research_orchestrator(context):
-    topic: dict = context.get_input()
+    research_input: dict = context.get_input()
+
+    # Payloads are stored under the parent run so they share its artifact layout.
+    run_id = research_input["run_id"]
+    i = research_input["index"]
+    topic = research_input["topic"]
+    research_mode = research_input.get("research_mode", "standard")
+    bypass_cache = research_input.get("bypass_cache", False)
 
     topic_results = {"topic": topic['topic'], "search_type": topic['search_type'], "summary": ""}
 
     # 3-1 search steps for the topic
-    tasks = []
-    for step in topic['steps']:
-        search_input = {"query": step, "search_type": topic['search_type']}
-        tasks.append(context.call_activity("search_executor", search_input))
-    
-    step_results = yield context.task_all(tasks)
+    steps = [
+        {"query": step, "payload_key": payload_key(run_id, "search", f"{i:02d}-{j:02d}.json")}
+        for j, step in enumerate(topic['steps'])
+    ]
+    step_results = yield _schedule_search_batch(context, steps, _search_options(research_input))
 
     # 3-2 summarize the search results for the topic
-    summary_result = yield context.call_activity("summary_executor", {"topic": topic, "step_results": step_results})
+    summary_input = {
+        "topic": topic,
+        "step_results": step_results,
+        "payload_key": payload_key(run_id, "summary", f"{i:02d}.json"),
+        "research_mode": research_mode,
+        "bypass_cache": bypass_cache,
+    }
+    summary_result = yield context.call_activity("summary_executor", summary_input)
     topic_results["summary"] = summary_result
+    topic_results["step_results"] = step_results
 
     return topic_results
 
 
 @my_app.activity_trigger(input_name='task_input')
-def task_executor(task_input):
+async def task_executor(task_input):
 
-    task_agent = ChatAgent(
+    modified_query = task_query.format(query=task_input["query"])
+    return await run_agent(
+        "TaskExtractor",
+        modified_query,
+        bypass_cache=task_input.get("bypass_cache", False),
         name="TaskExtractor",
         instructions=(
             "You are a helpful assistant that extracts tasks from the user query.",
             "User query contains some instruction and tasks.",
         ),
-        chat_client=chat_client,
     )
 
-    modified_query = task_query.format(query=task_input)
-    response = asyncio.run(task_agent.run(modified_query))
-
-    return response.text
-
 @my_app.activity_trigger(input_name='plan_input')
-def plan_executor(plan_input):
+async def plan_executor(plan_input):
 
-    planner = ChatAgent(
+    result = await run_agent(
+        "Planner",
+        plan_input["tasks"],
+        bypass_cache=plan_input.get("bypass_cache", False),
         name="Planner",
         instructions=plan_template,
         response_format=ResearchTopics,
-        chat_client=chat_client,
     )
 
-    result = asyncio.run(planner.run(plan_input))
-
-    plan_json = json.loads(result.text)
+    plan_json = json.loads(result)
 
     return plan_json
 
-@my_app.activity_trigger(input_name='search_input')
-def search_executor(search_input):
-
-    query = search_input.get("query", "")
-
-    input_data = {
-        "query": query,
-        "search_type": "semantic"
-    }
+@my_app.activity_trigger(input_name='plan_topics')
+def normalize_plan_executor(plan_topics):
+    """Cluster near-duplicate plan steps so each unique search runs once."""
 
-    aisearch_tool = AISearchTool()
-    result = aisearch_tool.research_query(input_data)
+    normalized_plan = normalize_plan(plan_topics, similarity_threshold=PLAN_STEP_SIMILARITY_THRESHOLD)
+    logger.info(
+        f"Plan normalized: {normalized_plan['total_steps']} step(s), "
+        f"{len(normalized_plan['unique_steps'])} unique search(es), {normalized_plan['searches_saved']} saved"
+    )
+    return normalized_plan
+
+@my_app.activity_trigger(input_name='search_batch_input')
+async def search_batch_executor(search_batch_input):
+    """Search all steps of a topic: one embeddings request, concurrent searches."""
+
+    steps = search_batch_input.get("steps", [])
+    research_mode = search_batch_input.get("research_mode", "standard")
+    input_data = [
+        {
+            "query": step.get("query", ""),
+            "search_type": "semantic",
+            "research_mode": research_mode,
+            "bypass_cache": search_batch_input.get("bypass_cache", False),
+            "index_name": search_batch_input.get("index_name"),
+        }
+        for step in steps
+    ]
+
+    aisearch_tool = get_search_tool()
+    results = await aisearch_tool.research_queries(
+        input_data, embedding_dimensions=search_batch_input.get("embedding_dimensions")
+    )
 
-    return {"query": query, "result": result}
+    payload_store = get_payload_store()
+    results = await asyncio.gather(
+        *[asyncio.to_thread(payload_store.offload, result, step.get("payload_key")) for step, result in zip(steps, results)]
+    )
+    return [{"query": step.get("query", ""), "result": result} for step, result in zip(steps, results)]
 
 @my_app.activity_trigger(input_name='summary_input')
-def summary_executor(summary_input):
+async def summary_executor(summary_input):
 
+    payload_store = get_payload_store()
     topic = summary_input['topic']
-    research_info = json.dumps(summary_input['step_results'], ensure_ascii=False, indent=2)
+    step_results = await asyncio.to_thread(payload_store.resolve, summary_input['step_results'])
+    research_info = json.dumps(step_results, ensure_ascii=False, indent=2)
     
-    summarizer = ChatAgent(name="Summarizer",
+    # In fast mode the step results are raw passages, so the summary does the synthesis
+    template = summary_passages_template if summary_input.get("research_mode") == "fast" else summary_template
+    summary = await run_agent("Summarizer",
+        template.format(topic=topic, research_info=research_info),
+        bypass_cache=summary_input.get("bypass_cache", False),
+        name="Summarizer",
         instructions=(
             "You are a helpful assistant that summarizes research findings into clear and concise summaries."
             "Add references by listing the relevant file_names of summary result from the context."
         ),
-        chat_client=chat_client,
     )
-
-    response = asyncio.run(summarizer.run(summary_template.format(topic=topic, research_info=research_info)))
-    return response.text
+    return await asyncio.to_thread(payload_store.offload, summary, summary_input.get("payload_key"))
 
 @my_app.activity_trigger(input_name='report_input')
-def report_executor(report_input):
+async def report_executor(report_input):
 
+    payload_store = get_payload_store()
     query = report_input['query']
-    research_results = report_input['research_results']
+    research_results = await asyncio.to_thread(payload_store.resolve, report_input['research_results'])
     _report_length = report_input.get('report_length', "medium")
     # long: 12000, medium: 6000, short: 1500
     if _report_length == "long":
@@ -265,14 +602,15 @@ def report_executor(report_input):
     else:
         report_length = 1500
 
-    report_writer = ChatAgent(name="ReportWriter",
-        instructions=report_instruction_template.format(report_length=report_length),
-        chat_client=chat_client,
-    )
-
     research_findings = "\n".join([f"# {summary['topic']}\n{summary['summary']}\n\n" for summary in research_results])
 
     report_query = report_template.format(research_findings=research_findings, query=query)
-    result = asyncio.run(report_writer.run(report_query))
+    result = await run_agent(f"ReportWriter-{report_length}",
+        report_query,
+        bypass_cache=report_input.get("bypass_cache", False),
+        stream_key=report_input.get("stream_key"),
+        name="ReportWriter",
+        instructions=report_instruction_template.format(report_length=report_length),
+    )
 
-    return result.text
\ No newline at end of file
+    return await asyncio.to_thread(payload_store.offload, result, report_input.get("payload_key"))
\ No newline at end of file
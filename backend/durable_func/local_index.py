@@ -0,0 +1,372 @@
+"""
+Read side of the local search index format
+
+The FastAPI app writes these indexes (backend/app/local_search.py subclasses
+`LocalIndexReader` with the write path) and the Durable Functions app reads them,
+so the layout, the OData filter subset and the ranking live only here:
+
+    <index>/manifest.json                 current version and generation, vector field,
+                                          dimensions, row/document counts, documents length
+    <index>/vectors-<generation>.f32      raw float32 rows, L2-normalised so cosine is a dot product
+    <index>/documents-<generation>.jsonl  the remaining fields of every row, one line per row
+    <index>/deleted-<version>.npy         rows that were deleted or replaced since the generation began
+    <index>/ivf-<version>.npz             optional coarse partitions (centroids, row assignments)
+    <index>/keywords.sqlite               FTS5 table of chunk text for BM25 keyword retrieval
+
+Rows are appended to the files of the current generation; only the first `rows`
+vectors and `documents_bytes` bytes of documents named by the manifest are part
+of the index, so readers re-load a new version incrementally.
+
+This module only depends on the standard library and NumPy because it ships with
+the Functions app, which is deployed from backend/durable_func on its own.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+KEYWORD_DB_FILE = "keywords.sqlite"
+DEFAULT_IVF_PROBES = 8
+# Rows scored per matrix product, bounding memory for large indexes
+SCORE_BLOCK_ROWS = 65536
+# Constant of reciprocal rank fusion, and how deep each ranking is taken before fusing
+RRF_K = 60
+HYBRID_CANDIDATES = 50
+TOKEN_PATTERN = re.compile(r"\w+")
+
+_FILTER_CLAUSE = re.compile(
+    r"^\s*(?P<field>[\w/]+)\s+(?P<op>eq|ne|gt|ge|lt|le)\s+(?P<value>'(?:[^']|'')*'|-?\d+(?:\.\d+)?|true|false|null)\s*$",
+    re.IGNORECASE,
+)
+_SEARCH_IN_CLAUSE = re.compile(
+    r"^\s*search\.in\(\s*(?P<field>[\w/]+)\s*,\s*'(?P<values>(?:[^']|'')*)'\s*(?:,\s*'(?P<sep>[^']*)'\s*)?\)\s*$",
+    re.IGNORECASE,
+)
+# A quoted literal (skipped over) or the `and` between two clauses
+_CLAUSE_SEPARATOR = re.compile(r"'(?:[^']|'')*'|\s+and\s+", re.IGNORECASE)
+_COMPARATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": lambda left, right: left == right,
+    "ne": lambda left, right: left != right,
+    "gt": lambda left, right: left is not None and left > right,
+    "ge": lambda left, right: left is not None and left >= right,
+    "lt": lambda left, right: left is not None and left < right,
+    "le": lambda left, right: left is not None and left <= right,
+}
+
+
+def _parse_literal(raw: str) -> Any:
+    if raw.startswith("'"):
+        return raw[1:-1].replace("''", "'")
+    lowered = raw.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered == "null":
+        return None
+    return float(raw) if "." in raw else int(raw)
+
+
+def _split_clauses(expression: str) -> List[str]:
+    """Split on `and` outside quoted literals, so `file_name eq 'R and D.pdf'` stays one clause."""
+    clauses, start = [], 0
+    for match in _CLAUSE_SEPARATOR.finditer(expression):
+        if not match.group().startswith("'"):
+            clauses.append(expression[start : match.start()])
+            start = match.end()
+    clauses.append(expression[start:])
+    return clauses
+
+
+def compile_filter(expression: Optional[str]) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Compile the OData subset the services use (comparisons and `search.in`
+    joined by `and`) into a predicate over documents. Raises ValueError for
+    anything else.
+    """
+    if not expression:
+        return lambda document: True
+
+    predicates = []
+    for clause in _split_clauses(expression.strip()):
+        match = _FILTER_CLAUSE.match(clause)
+        if match:
+            field, compare, value = match["field"], _COMPARATORS[match["op"].lower()], _parse_literal(match["value"])
+            predicates.append(lambda document, f=field, c=compare, v=value: c(document.get(f), v))
+            continue
+        match = _SEARCH_IN_CLAUSE.match(clause)
+        if match:
+            separator = match["sep"] or ","
+            values = {value.strip() for value in match["values"].replace("''", "'").split(separator)}
+            predicates.append(lambda document, f=match["field"], vs=values: str(document.get(f)) in vs)
+            continue
+        raise ValueError(f"Unsupported filter clause '{clause}'")
+    return lambda document: all(predicate(document) for predicate in predicates)
+
+
+def match_expression(query: str) -> Optional[str]:
+    """FTS5 MATCH expression OR-ing the quoted query terms (None when there are none)."""
+    terms = dict.fromkeys(TOKEN_PATTERN.findall(query.lower()))
+    return " OR ".join(f'"{term}"' for term in terms) or None
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Any]], k: int = RRF_K) -> List[Tuple[Any, float]]:
+    """Fuse rankings of keys into (key, score) pairs ordered by sum of 1 / (k + rank)."""
+    scores: Dict[Any, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise every row (zero rows are left as zeros) as float32."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class LocalIndexReader:
+    """One on-disk index, re-mapped whenever its manifest version changes; safe to share between threads."""
+
+    def __init__(self, directory: Path, ivf_probes: int = DEFAULT_IVF_PROBES):
+        self.directory = Path(directory)
+        self.name = self.directory.name
+        self.ivf_probes = ivf_probes
+        self._lock = threading.RLock()
+        self._manifest: Optional[Dict[str, Any]] = None
+        self._documents: List[Dict[str, Any]] = []
+        self._vectors: Optional[np.ndarray] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments: Optional[np.ndarray] = None
+        self._deleted: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._live: np.ndarray = np.zeros(0, dtype=bool)
+        self._rows: Dict[str, int] = {}
+        self._connections = threading.local()
+
+    def exists(self) -> bool:
+        return (self.directory / MANIFEST_FILE).exists()
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads((self.directory / MANIFEST_FILE).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self) -> Optional[Dict[str, Any]]:
+        """Load the current version if a writer replaced it; None (and nothing loaded) if the index does not exist."""
+        for _ in range(3):
+            manifest = self._read_manifest()
+            if manifest is None:
+                self._manifest, self._documents, self._vectors = None, [], None
+                self._centroids = self._assignments = None
+                self._deleted, self._live = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+                self._rows = {}
+                return None
+            if self._manifest is not None and manifest["version"] == self._manifest["version"]:
+                return manifest
+            try:
+                self._load(manifest)
+                return manifest
+            except FileNotFoundError:
+                # A writer swapped versions between reading the manifest and the data files
+                continue
+        raise RuntimeError(f"Local index '{self.name}' keeps changing while it is loaded")
+
+    def _load(self, manifest: Dict[str, Any]) -> None:
+        version, generation = manifest["version"], manifest["generation"]
+        rows_count, dimensions = manifest["rows"], manifest["dimensions"]
+        previous = self._manifest
+        # Within a generation rows are only appended: parse the new documents, not the whole file
+        incremental = (
+            previous is not None
+            and previous["generation"] == generation
+            and previous["documents_bytes"] <= manifest["documents_bytes"]
+        )
+        offset = previous["documents_bytes"] if incremental else 0
+        with open(self.directory / f"documents-{generation}.jsonl", "rb") as stream:
+            stream.seek(offset)
+            data = stream.read(manifest["documents_bytes"] - offset)
+        appended = [json.loads(line) for line in data.splitlines()]
+        documents = (self._documents + appended) if incremental else appended
+        if len(documents) != rows_count:
+            raise RuntimeError(f"Local index '{self.name}' has {len(documents)} documents for {rows_count} vectors")
+
+        vectors = (
+            np.memmap(self.directory / f"vectors-{generation}.f32", dtype=np.float32, mode="r", shape=(rows_count, dimensions))
+            if rows_count
+            else np.zeros((0, dimensions), dtype=np.float32)
+        )
+        deleted = (
+            np.load(self.directory / f"deleted-{version}.npy")
+            if manifest["deleted"]
+            else np.zeros(0, dtype=np.int64)
+        )
+        centroids = assignments = None
+        if manifest.get("ivf"):
+            with np.load(self.directory / f"ivf-{version}.npz") as ivf:
+                centroids, assignments = ivf["centroids"], ivf["assignments"]
+
+        live = np.ones(rows_count, dtype=bool)
+        live[deleted] = False
+        if incremental:
+            rows = dict(self._rows)
+            for row in np.setdiff1d(deleted, self._deleted, assume_unique=True).tolist():
+                if rows.get(documents[row]["id"]) == row:
+                    del rows[documents[row]["id"]]
+            first = len(self._documents)
+            rows.update((document["id"], first + row) for row, document in enumerate(appended) if live[first + row])
+        else:
+            rows = {document["id"]: row for row, document in enumerate(documents) if live[row]}
+
+        self._manifest, self._documents, self._vectors = manifest, documents, vectors
+        self._centroids, self._assignments = centroids, assignments
+        self._deleted, self._live, self._rows = deleted, live, rows
+        logger.debug(f"[LocalSearch] Loaded index '{self.name}' version {version} ({manifest['count']} documents)")
+
+    def _require(self) -> Dict[str, Any]:
+        manifest = self._refresh()
+        if manifest is None:
+            raise FileNotFoundError(f"Local index '{self.name}' does not exist")
+        return manifest
+
+    def content_version(self) -> Tuple[int, int]:
+        """(manifest version, document count); read from the manifest alone, without loading the index."""
+        manifest = self._read_manifest()
+        if manifest is None:
+            raise FileNotFoundError(f"Local index '{self.name}' does not exist")
+        return (manifest["version"], manifest["count"])
+
+    def _keyword_db(self) -> Optional[sqlite3.Connection]:
+        """Per-thread read-only connection to the keyword table (None if the index has none)."""
+        path = self.directory / KEYWORD_DB_FILE
+        try:
+            inode = path.stat().st_ino
+        except FileNotFoundError:
+            return None
+        cached = getattr(self._connections, "cached", None)
+        if cached is not None and cached[0] == inode:
+            return cached[1]
+        if cached is not None:
+            cached[1].close()
+        connection = sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True, timeout=30, check_same_thread=False)
+        self._connections.cached = (inode, connection)
+        return connection
+
+    @staticmethod
+    def _hit(document: Dict[str, Any], score: float, select: Optional[Sequence[str]]) -> Dict[str, Any]:
+        hit = {field: document.get(field) for field in select} if select else dict(document)
+        hit["@search.score"] = float(score)
+        hit["@search.reranker_score"] = None
+        return hit
+
+    def search(
+        self,
+        query_vector: Sequence[float],
+        top_k: int,
+        filter_expression: Optional[str] = None,
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Cosine top-k; `@search.score` is the cosine similarity."""
+        with self._lock:
+            self._require()
+            documents, vectors, live = self._documents, self._vectors, self._live
+            centroids, assignments = self._centroids, self._assignments
+
+        query = normalize_rows(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+        if not documents or top_k <= 0:
+            return []
+        if len(query) != vectors.shape[1]:
+            raise ValueError(f"Expected {vectors.shape[1]}-dimensional query vectors for local index '{self.name}'")
+
+        # Deleted and replaced rows stay in the files until the next generation: never return them
+        mask = None if live.all() else live
+        if filter_expression:
+            predicate = compile_filter(filter_expression)
+            matches = np.fromiter((predicate(document) for document in documents), dtype=bool, count=len(documents))
+            mask = matches if mask is None else (matches & mask)
+
+        if centroids is not None:
+            probes = np.argsort(-(centroids @ query))[: self.ivf_probes]
+            rows = np.flatnonzero(np.isin(assignments, probes))
+            if mask is not None:
+                rows = rows[mask[rows]]
+            scores = np.asarray(vectors[rows]) @ query
+            best = _top_k(scores, top_k)
+            ranking = list(zip(rows[best], scores[best]))
+        else:
+            scores = np.empty(len(documents), dtype=np.float32)
+            for start in range(0, len(documents), SCORE_BLOCK_ROWS):
+                block = np.asarray(vectors[start : start + SCORE_BLOCK_ROWS])
+                scores[start : start + len(block)] = block @ query
+            if mask is not None:
+                scores[~mask] = -np.inf
+            ranking = [(row, scores[row]) for row in _top_k(scores, top_k) if np.isfinite(scores[row])]
+
+        return [self._hit(documents[row], score, select) for row, score in ranking]
+
+    def text_search(
+        self,
+        query: str,
+        top_k: int,
+        filter_expression: Optional[str] = None,
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """BM25 ranking from the FTS5 table; `@search.score` is the negated FTS5 bm25() value."""
+        with self._lock:
+            self._require()
+            documents, rows = self._documents, self._rows
+        expression = match_expression(query)
+        if expression is None or top_k <= 0:
+            return []
+        connection = self._keyword_db()
+        if connection is None:
+            return []
+
+        predicate = compile_filter(filter_expression) if filter_expression else None
+        # Filtered queries read deeper so that top_k hits usually survive the filter
+        limit = top_k if predicate is None else max(top_k * 10, 200)
+        cursor = connection.execute(
+            "SELECT id, bm25(chunks) FROM chunks WHERE chunks MATCH ? ORDER BY bm25(chunks) LIMIT ?",
+            (expression, limit),
+        )
+        hits = []
+        for key, rank in cursor:
+            row = rows.get(key)
+            if row is None or (predicate is not None and not predicate(documents[row])):
+                continue
+            hits.append(self._hit(documents[row], -rank, select))
+            if len(hits) == top_k:
+                break
+        return hits
+
+    def hybrid_search(
+        self,
+        query: str,
+        query_vector: Sequence[float],
+        top_k: int,
+        filter_expression: Optional[str] = None,
+        select: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """BM25 and vector rankings fused with RRF; `@search.score` is the fused score."""
+        depth = max(top_k, HYBRID_CANDIDATES)
+        keyword_hits = self.text_search(query, depth, filter_expression, ["id"])
+        vector_hits = self.search(query_vector, depth, filter_expression, ["id"])
+        fused = reciprocal_rank_fusion([[hit["id"] for hit in keyword_hits], [hit["id"] for hit in vector_hits]])
+        with self._lock:
+            documents, rows = self._documents, self._rows
+        return [self._hit(documents[rows[key]], score, select) for key, score in fused[:top_k] if key in rows]
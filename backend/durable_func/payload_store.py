@@ -0,0 +1,269 @@
+"""
+Payload offload store
+
+Durable Functions persists every activity input and output in the orchestration
+history and re-deserializes that history on every replay. Large intermediate
+payloads (search results, topic summaries, the final report) are therefore
+written to blob storage (or a local directory that stands in for Azurite) and
+only a small reference is passed through the orchestrator.
+
+The report is additionally streamed into a text artifact while it is generated
+(`start_stream`/`append_stream`/`finish_stream`) so the API can show it early.
+"""
+
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_REF_KEY = "$payload_ref"
+DEFAULT_CONTAINER = "research-payloads"
+DEFAULT_OFFLOAD_THRESHOLD = 1024
+# Marker written next to a streamed artifact once it is complete
+STREAM_DONE_SUFFIX = ".done"
+# Marker written instead when the writer failed; readers stop rather than wait for `.done`
+STREAM_FAILED_SUFFIX = ".failed"
+STREAM_MARKER_SUFFIXES = (STREAM_DONE_SUFFIX, STREAM_FAILED_SUFFIX)
+
+# Well-known Azurite account used when AzureWebJobsStorage is "UseDevelopmentStorage=true".
+AZURITE_CONNECTION_STRING = (
+    "DefaultEndpointsProtocol=http;AccountName=devstoreaccount1;"
+    "AccountKey=Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw==;"
+    "BlobEndpoint=http://127.0.0.1:10000/devstoreaccount1;"
+)
+
+
+class PayloadStoreNotConfigured(RuntimeError):
+    """Raised when neither a payload directory nor a blob connection string is configured."""
+
+
+def payload_key(run_id: str, *parts: Any) -> str:
+    """Build a deterministic storage key for a run artifact."""
+    return "/".join(["runs", run_id, *[str(part) for part in parts]])
+
+
+def report_stream_key(run_id: str) -> str:
+    """Key of the report the report writer streams while generating (read by the API as it grows)."""
+    return payload_key(run_id, "report.md")
+
+
+def is_payload_ref(value: Any) -> bool:
+    return isinstance(value, dict) and PAYLOAD_REF_KEY in value
+
+
+class PayloadStore(ABC):
+    """Base class for payload backends storing JSON documents under string keys."""
+
+    def __init__(self, offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD):
+        self.offload_threshold = offload_threshold
+
+    @abstractmethod
+    def write_bytes(self, key: str, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def read_bytes(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def read_from(self, key: str, offset: int) -> bytes:
+        """Read an artifact from byte `offset` on; raises FileNotFoundError if it does not exist yet."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    def is_stream_complete(self, key: str) -> bool:
+        return self.exists(key + STREAM_DONE_SUFFIX)
+
+    def is_stream_failed(self, key: str) -> bool:
+        return self.exists(key + STREAM_FAILED_SUFFIX)
+
+    @abstractmethod
+    def start_stream(self, key: str) -> None:
+        """Create (or reset) an incrementally written text artifact."""
+
+    @abstractmethod
+    def append_stream(self, key: str, text: str) -> None:
+        ...
+
+    def finish_stream(self, key: str) -> None:
+        """Mark a streamed artifact as complete."""
+        self.write_bytes(key + STREAM_DONE_SUFFIX, b"")
+
+    def fail_stream(self, key: str) -> None:
+        """Mark a streamed artifact as abandoned: the writer failed and it will not be completed."""
+        self.write_bytes(key + STREAM_FAILED_SUFFIX, b"")
+
+    def get(self, ref: dict) -> Any:
+        return json.loads(self.read_bytes(ref[PAYLOAD_REF_KEY]).decode("utf-8"))
+
+    def offload(self, value: Any, key: Optional[str]) -> Any:
+        """Return a reference for large values and the value itself for small ones."""
+        if key is None:
+            return value
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        if len(data) < self.offload_threshold:
+            return value
+        self.write_bytes(key, data)
+        return {PAYLOAD_REF_KEY: key, "size": len(data)}
+
+    def resolve(self, value: Any) -> Any:
+        """Recursively replace payload references with the stored values."""
+        if is_payload_ref(value):
+            return self.get(value)
+        if isinstance(value, dict):
+            return {k: self.resolve(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(item) for item in value]
+        return value
+
+
+class LocalPayloadStore(PayloadStore):
+    """Filesystem stand-in for blob storage, used for local development."""
+
+    def __init__(self, root: str, offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD):
+        super().__init__(offload_threshold)
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Invalid payload key: {key}")
+        return path
+
+    def write_bytes(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file first so readers never observe a partial payload.
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def read_bytes(self, key: str) -> bytes:
+        return self._path(key).read_bytes()
+
+    def read_from(self, key: str, offset: int) -> bytes:
+        with self._path(key).open("rb") as stream:
+            stream.seek(offset)
+            return stream.read()
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def start_stream(self, key: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for suffix in STREAM_MARKER_SUFFIXES:
+            self._path(key + suffix).unlink(missing_ok=True)
+        path.write_bytes(b"")
+
+    def append_stream(self, key: str, text: str) -> None:
+        with self._path(key).open("ab") as stream:
+            stream.write(text.encode("utf-8"))
+
+
+class BlobPayloadStore(PayloadStore):
+    """Azure Blob Storage (or Azurite) payload backend."""
+
+    def __init__(
+        self,
+        connection_string: str,
+        container: str = DEFAULT_CONTAINER,
+        offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+    ):
+        from azure.core.exceptions import ResourceExistsError
+        from azure.storage.blob import BlobServiceClient
+
+        super().__init__(offload_threshold)
+        if connection_string.strip().lower() == "usedevelopmentstorage=true":
+            connection_string = AZURITE_CONNECTION_STRING
+
+        service_client = BlobServiceClient.from_connection_string(connection_string)
+        self.container_client = service_client.get_container_client(container)
+        try:
+            self.container_client.create_container()
+        except ResourceExistsError:
+            pass
+
+    def write_bytes(self, key: str, data: bytes) -> None:
+        self.container_client.upload_blob(name=key, data=data, overwrite=True)
+
+    def read_bytes(self, key: str) -> bytes:
+        return self.container_client.download_blob(key).readall()
+
+    def read_from(self, key: str, offset: int) -> bytes:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        blob_client = self.container_client.get_blob_client(key)
+        try:
+            size = blob_client.get_blob_properties().size
+            if size <= offset:
+                return b""
+            return blob_client.download_blob(offset=offset).readall()
+        except ResourceNotFoundError as exc:
+            raise FileNotFoundError(key) from exc
+
+    def exists(self, key: str) -> bool:
+        return self.container_client.get_blob_client(key).exists()
+
+    def start_stream(self, key: str) -> None:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        for suffix in STREAM_MARKER_SUFFIXES:
+            try:
+                self.container_client.delete_blob(key + suffix)
+            except ResourceNotFoundError:
+                pass
+        # Append blobs let readers download the part written so far
+        self.container_client.get_blob_client(key).create_append_blob()
+
+    def append_stream(self, key: str, text: str) -> None:
+        self.container_client.get_blob_client(key).append_block(text.encode("utf-8"))
+
+
+def create_payload_store(
+    local_dir: Optional[str],
+    connection_string: Optional[str],
+    container: str = DEFAULT_CONTAINER,
+    offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+) -> PayloadStore:
+    """
+    The local directory store if `local_dir` is set, else the blob store of `connection_string`.
+
+    The Functions app and the API build their stores with this, passing
+    PAYLOAD_STORE_CONNECTION_STRING or else AzureWebJobsStorage, so both resolve to the same store.
+    """
+    if local_dir:
+        return LocalPayloadStore(str(local_dir), offload_threshold=offload_threshold)
+    if connection_string:
+        return BlobPayloadStore(connection_string, container=container, offload_threshold=offload_threshold)
+    raise PayloadStoreNotConfigured(
+        "PAYLOAD_STORE_DIR, PAYLOAD_STORE_CONNECTION_STRING or AzureWebJobsStorage must be configured."
+    )
+
+
+_PAYLOAD_STORE: Optional[PayloadStore] = None
+_PAYLOAD_STORE_LOCK = threading.Lock()
+
+
+def get_payload_store() -> PayloadStore:
+    """Return the process-wide payload store configured from the environment."""
+    global _PAYLOAD_STORE
+    if _PAYLOAD_STORE is None:
+        with _PAYLOAD_STORE_LOCK:
+            if _PAYLOAD_STORE is None:
+                _PAYLOAD_STORE = create_payload_store(
+                    os.getenv("PAYLOAD_STORE_DIR"),
+                    os.getenv("PAYLOAD_STORE_CONNECTION_STRING") or os.getenv("AzureWebJobsStorage"),
+                    container=os.getenv("PAYLOAD_STORE_CONTAINER", DEFAULT_CONTAINER),
+                    offload_threshold=int(os.getenv("PAYLOAD_OFFLOAD_THRESHOLD", DEFAULT_OFFLOAD_THRESHOLD)),
+                )
+                logger.info(f"Payload store initialized: {type(_PAYLOAD_STORE).__name__}")
+    return _PAYLOAD_STORE
@@ -0,0 +1,105 @@
+"""
+Plan normalization
+
+The planner frequently emits the same retrieval step under several topics, or
+trivially reworded copies of it ("Find 2023 Scope 1 and 2 emissions for
+Company-A" / "Find 2023 Scope 1, 2 emissions for Company-A"). Steps are
+canonicalized and greedily clustered so each unique search runs once and its
+result is fanned back out to every topic that needs it.
+
+Similarity alone would merge steps that differ only in a year or a company
+("revenue 2023" / "revenue 2022"), so steps are only clustered when their
+numbers, dates and proper nouns are exactly the same.
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, List
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.85
+
+_QUOTES = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"'})
+_TOKEN_PATTERN = re.compile(r"[\w\-]+")
+_STOPWORDS = {
+    "an", "and", "as", "at", "by", "find", "for", "from", "in", "of", "on",
+    "or", "the", "to", "with",
+}
+
+
+def canonicalize_step(step: str) -> str:
+    """Lowercase, normalize unicode/quotes/whitespace and strip punctuation."""
+    text = unicodedata.normalize("NFKC", step).translate(_QUOTES).lower()
+    return " ".join(_TOKEN_PATTERN.findall(text))
+
+
+def _step_tokens(canonical: str) -> frozenset:
+    return frozenset(token for token in canonical.split() if token not in _STOPWORDS)
+
+
+def _key_tokens(step: str) -> frozenset:
+    """
+    Tokens that pin a step to a specific period or entity: anything with a digit
+    and capitalized words after the first one (which is capitalized anyway).
+    """
+    tokens = _TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", step).translate(_QUOTES))
+    return frozenset(
+        token.lower()
+        for position, token in enumerate(tokens)
+        if any(char.isdigit() for char in token) or (position > 0 and token[0].isupper())
+    )
+
+
+def _jaccard(left: frozenset, right: frozenset) -> float:
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+def normalize_plan(topics: List[Dict[str, Any]], similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD) -> Dict[str, Any]:
+    """
+    Cluster near-duplicate steps across all topics.
+
+    Returns:
+        unique_steps: representative query of each cluster (first occurrence wins)
+        topic_steps: for each topic, the cluster id of each of its steps (in step order)
+        total_steps / searches_saved: counts for reporting
+    """
+    unique_steps: List[str] = []
+    cluster_canonicals: List[str] = []
+    cluster_tokens: List[frozenset] = []
+    cluster_keys: List[frozenset] = []
+    topic_steps: List[List[int]] = []
+    total_steps = 0
+
+    for topic in topics:
+        step_ids = []
+        for step in topic.get("steps", []):
+            total_steps += 1
+            canonical = canonicalize_step(step)
+            tokens = _step_tokens(canonical)
+            keys = _key_tokens(step)
+
+            cluster_id = None
+            for candidate_id, candidate_tokens in enumerate(cluster_tokens):
+                if cluster_canonicals[candidate_id] == canonical or (
+                    cluster_keys[candidate_id] == keys
+                    and _jaccard(tokens, candidate_tokens) >= similarity_threshold
+                ):
+                    cluster_id = candidate_id
+                    break
+
+            if cluster_id is None:
+                cluster_id = len(unique_steps)
+                unique_steps.append(step)
+                cluster_canonicals.append(canonical)
+                cluster_tokens.append(tokens)
+                cluster_keys.append(keys)
+            step_ids.append(cluster_id)
+        topic_steps.append(step_ids)
+
+    return {
+        "unique_steps": unique_steps,
+        "topic_steps": topic_steps,
+        "total_steps": total_steps,
+        "searches_saved": total_steps - len(unique_steps),
+    }
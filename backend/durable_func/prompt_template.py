@@ -128,6 +128,21 @@ Researches:
 {research_info}
 """
 
+summary_passages_template = """You are writing a research summary for the following topic from retrieved document passages.
+
+Instructions:
+- Answer each research step using only the passages listed under it.
+- Summarize key data from the passages and produce a clear and concise summary.
+- Do not include any information that is not present in the passages.
+- Add references by listing the file names (and pages when given) the information comes from.
+- Do not add any comments, such "Here is a clear and concise summary", "In summary", etc.
+
+Topic: {topic}
+
+Research steps and passages:
+{research_info}
+"""
+
 report_template = """Based on the analysis, write a report that directly answers the user's request.
 
 <research_findings>
@@ -0,0 +1,232 @@
+"""
+Adaptive client-side rate limiting for Azure OpenAI calls: the shared state.
+
+Every call against a deployment goes through one limiter per process:
+
+- token buckets for requests and tokens per minute (0 disables a bucket),
+  charged with an estimate up front and corrected with the reported usage
+  afterwards;
+- an AIMD concurrency window: +1 per window of successful calls, halved on a
+  429/503 (only by calls sent after the previous cut, so a burst of throttled
+  calls that were already in flight counts once);
+- `Retry-After` from the service pauses every caller, other throttled calls are
+  retried with full-jitter exponential backoff up to `max_retries` times.
+
+`RateLimiterCore` holds that state under one condition variable. The waiting and
+calling differ per caller: `rate_limiter.py` (Durable Functions activities) waits
+with `asyncio.sleep` and wraps coroutines and streams, backend/app/rate_limiter.py
+(API ingestion and search threads) blocks on the condition. This module only uses
+the standard library because the API imports it too.
+"""
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUS_CODES = (429, 503)
+# Longest single wait for a slot before a waiter re-checks (async waiters are not notified)
+MAX_WAIT_SLICE_SECONDS = 0.25
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units evenly over a minute; a limit of 0 disables the bucket.
+
+    Azure OpenAI enforces its per-minute quotas over shorter windows, so bursts are
+    capped at `burst_seconds` worth of quota rather than a full minute.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = 10.0):
+        self.rate = float(per_minute) / 60.0
+        self.capacity = self.rate * burst_seconds
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 when they are)."""
+        if self.capacity <= 0:
+            return 0.0
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        # Requests larger than the bucket wait for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        """Consume `amount` units; negative amounts refund, and the level may go below zero."""
+        if self.capacity > 0:
+            self.level = min(self.capacity, self.level - amount)
+
+
+def _exception_chain(exc: BaseException):
+    seen = set()
+    current: Optional[BaseException] = exc
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        yield current
+        current = current.__cause__ or current.__context__
+
+
+def throttle_status(exc: BaseException) -> Optional[int]:
+    """HTTP status of a throttling error (429/503) anywhere in the exception chain, else None."""
+    for error in _exception_chain(exc):
+        status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+        if status in THROTTLE_STATUS_CODES:
+            return status
+    return None
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Delay requested by the service (`retry-after-ms`, `x-ms-retry-after-ms` or `Retry-After`), if any."""
+    for error in _exception_chain(exc):
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            continue
+        for name in ("retry-after-ms", "x-ms-retry-after-ms"):
+            value = headers.get(name)
+            if value:
+                try:
+                    return max(float(value) / 1000.0, 0.0)
+                except ValueError:
+                    pass
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return max(float(value), 0.0)
+            except ValueError:
+                pass
+            try:
+                return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+class RateLimiterCore:
+    """Request/token budget and AIMD concurrency window; subclasses add the waiting `call`."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Start in the middle of the window and let additive increase find the sustainable level
+        self.concurrency = float(max(self.min_concurrency, self.max_concurrency // 2))
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        # Reentrant, so blocking waiters can hold it around _try_acquire and wait on it
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self.calls = 0
+        self.throttled = 0
+        self.waited_seconds = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "concurrency": round(self.concurrency, 2),
+                "in_flight": self._in_flight,
+                "waited_seconds": round(self.waited_seconds, 3),
+            }
+
+    def _try_acquire(self, tokens: int) -> Optional[float]:
+        """
+        Reserve a slot, one request and `tokens`. Returns 0 on success, the seconds to
+        wait for quota or the end of a pause, or None while every slot is taken.
+        """
+        with self._condition:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._in_flight >= int(self.concurrency):
+                return None
+            delay = max(self._requests.delay(1, now), self._tokens.delay(tokens, now))
+            if delay > 0:
+                return delay
+            self._requests.take(1)
+            self._tokens.take(tokens)
+            self._in_flight += 1
+            self.calls += 1
+            return 0.0
+
+    def _record_wait(self, started: float) -> float:
+        """Account the time since `started` as waiting; returns now, the time the call was let through."""
+        sent_at = time.monotonic()
+        with self._condition:
+            self.waited_seconds += sent_at - started
+        return sent_at
+
+    def _abandon(self) -> None:
+        """Free the slot of a call that neither succeeded nor failed (cancelled or interrupted)."""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _release(self, reserved_tokens: int, used_tokens: Optional[int]) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            if used_tokens is not None:
+                self._tokens.take(used_tokens - reserved_tokens)
+            # Additive increase: about one more slot per window of successful calls
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / self.concurrency)
+            self._condition.notify_all()
+
+    def _retry_after_failure(self, exc: BaseException, attempt: int, sent_at: float) -> bool:
+        """Release the slot of a failed call; True when it was throttled and may be retried."""
+        status = throttle_status(exc)
+        retry_after = retry_after_seconds(exc) if status is not None else None
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+            if status is None:
+                return False
+            self.throttled += 1
+            now = time.monotonic()
+            if sent_at >= self._last_decrease:
+                self.concurrency = max(float(self.min_concurrency), self.concurrency / 2)
+                self._last_decrease = now
+            if retry_after is not None:
+                # The service told us when quota is back: hold every caller until then
+                self._paused_until = max(self._paused_until, now + min(retry_after, self.max_delay))
+        if attempt >= self.max_retries:
+            return False
+        logger.warning(
+            f"[RateLimiter] Azure OpenAI throttled ({status}); retry {attempt + 1}/{self.max_retries}, "
+            f"concurrency {self.concurrency:.1f}"
+        )
+        return True
+
+    def _backoff_seconds(self, exc: BaseException, attempt: int) -> float:
+        """Full-jitter backoff before retrying; 0 with Retry-After, which _try_acquire already waits for."""
+        if retry_after_seconds(exc) is not None:
+            return 0.0
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    @staticmethod
+    def _used_tokens(usage: Optional[Callable[[Any], Optional[int]]], result: Any) -> Optional[int]:
+        if usage is None:
+            return None
+        try:
+            return usage(result)
+        except Exception:
+            return None
@@ -0,0 +1,133 @@
+"""
+Adaptive client-side rate limiting for Azure OpenAI calls (Durable Functions side).
+
+Embeddings, the research responses call and the agents all draw from the same
+deployment quota, so every call in a worker process goes through one shared
+`AdaptiveRateLimiter` (`OPENAI_RPM_LIMIT`, `OPENAI_TPM_LIMIT`,
+`OPENAI_MAX_CONCURRENCY`, `OPENAI_MAX_RETRIES`). The budget and AIMD logic is
+`rate_limit_core.py`, shared with the API; this module only adds the asyncio
+waiting and the `call`/`stream` wrappers. The limiter keeps plain state under a
+thread lock and waits with `asyncio.sleep`, so it can be shared by activities
+on any event loop.
+"""
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from rate_limit_core import MAX_WAIT_SLICE_SECONDS, RateLimiterCore
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Completion tokens charged up front for model calls; corrected with the reported usage
+OUTPUT_TOKENS_ESTIMATE = int(os.getenv("OPENAI_OUTPUT_TOKENS_ESTIMATE", "1000"))
+
+
+class AdaptiveRateLimiter(RateLimiterCore):
+    """Shared request/token budget and adaptive concurrency for Azure OpenAI calls (asyncio)."""
+
+    async def call(
+        self,
+        make_call: Callable[[], Awaitable[T]],
+        tokens: int = 0,
+        usage: Optional[Callable[[T], Optional[int]]] = None,
+    ) -> T:
+        """
+        Run `make_call()` within the budget, retrying throttled attempts.
+
+        `tokens` is the estimated prompt + completion size charged up front; `usage`
+        extracts the actual total from the result so the token bucket is corrected.
+        """
+        attempt = 0
+        while True:
+            sent_at = await self._acquire(tokens)
+            released = False
+            try:
+                result = await make_call()
+            except Exception as exc:
+                released = True
+                if not self._retry_after_failure(exc, attempt, sent_at):
+                    raise
+                failure = exc
+            else:
+                released = True
+                self._release(tokens, self._used_tokens(usage, result))
+                return result
+            finally:
+                if not released:
+                    # Cancelled (a BaseException): free the slot or it is lost for good
+                    self._abandon()
+            await self._backoff(failure, attempt)
+            attempt += 1
+
+    async def stream(
+        self,
+        open_stream: Callable[[], AsyncIterator[T]],
+        tokens: int = 0,
+    ) -> AsyncIterator[T]:
+        """
+        Iterate `open_stream()` while holding one slot; throttled streams are retried
+        only while nothing has been yielded yet.
+        """
+        attempt = 0
+        while True:
+            sent_at = await self._acquire(tokens)
+            started = False
+            released = False
+            try:
+                async for item in open_stream():
+                    started = True
+                    yield item
+            except Exception as exc:
+                released = True
+                retryable = self._retry_after_failure(exc, attempt, sent_at)
+                if started or not retryable:
+                    raise
+                await self._backoff(exc, attempt)
+                attempt += 1
+                continue
+            finally:
+                if not released:
+                    self._release(tokens, None)
+            return
+
+    async def _acquire(self, tokens: int) -> float:
+        """Wait for a slot and quota; returns the time the call was let through."""
+        started = time.monotonic()
+        while True:
+            delay = self._try_acquire(tokens)
+            if delay == 0:
+                break
+            # Slots freed by other callers are not signalled to coroutines: re-check after a slice
+            wait = MAX_WAIT_SLICE_SECONDS if delay is None else min(delay, MAX_WAIT_SLICE_SECONDS)
+            await asyncio.sleep(wait * random.uniform(1.0, 1.2))
+        return self._record_wait(started)
+
+    async def _backoff(self, exc: BaseException, attempt: int) -> None:
+        delay = self._backoff_seconds(exc, attempt)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_RATE_LIMITER: Optional[AdaptiveRateLimiter] = None
+_RATE_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Return the worker's shared limiter for the Azure OpenAI deployments."""
+    global _RATE_LIMITER
+    if _RATE_LIMITER is None:
+        with _RATE_LIMITER_LOCK:
+            if _RATE_LIMITER is None:
+                _RATE_LIMITER = AdaptiveRateLimiter(
+                    requests_per_minute=float(os.getenv("OPENAI_RPM_LIMIT", "0")),
+                    tokens_per_minute=float(os.getenv("OPENAI_TPM_LIMIT", "0")),
+                    max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "16")),
+                    max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "6")),
+                )
+    return _RATE_LIMITER
@@ -0,0 +1,287 @@
+"""
+Search backends for AISearchTool
+
+`AzureSearchBackend` queries Azure AI Search. `LocalSearchBackend` reads the
+memory-mapped indexes the FastAPI app writes under LOCAL_SEARCH_DIR when both run
+with SEARCH_BACKEND=local; the format and its vector, BM25 and hybrid ranking live
+in `local_index`, which the app's writer shares.
+
+With SEARCH_BACKEND=azure and LOCAL_SEARCH_FALLBACK=true, the API keeps a local
+copy of every index and AISearchTool answers from it while Azure AI Search is
+throttled or unreachable.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from azure.core.exceptions import HttpResponseError, ServiceRequestError, ServiceResponseError
+from azure.search.documents.models import (
+    VectorizedQuery,
+    QueryType,
+    QueryCaptionType,
+    QueryAnswerType,
+)
+
+from local_index import DEFAULT_IVF_PROBES, LocalIndexReader
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CONFIG_NAME = "semantic-config"
+# An index schema missing newer features is read again after this long (the API upgrades indexes in place)
+SCHEMA_RECHECK_SECONDS = 300
+# Azure AI Search responses that make AISearchTool use the local fallback index
+FALLBACK_STATUS_CODES = {429, 503}
+
+
+def is_throttled(error: Exception) -> bool:
+    """Whether a search error should be answered from the local fallback index."""
+    if isinstance(error, (ServiceRequestError, ServiceResponseError)):
+        return True
+    return isinstance(error, HttpResponseError) and error.status_code in FALLBACK_STATUS_CODES
+
+
+def is_missing_index(error: Exception) -> bool:
+    """Whether a search error means the index no longer exists (its project was deleted)."""
+    if isinstance(error, FileNotFoundError):
+        return True
+    return isinstance(error, HttpResponseError) and error.status_code == 404
+
+
+class SearchBackend(ABC):
+    """Retrieval behind AISearchTool; results are lists of plain search-hit dicts."""
+
+    @abstractmethod
+    async def search(
+        self,
+        query: str,
+        query_vector: List[float],
+        search_type: str,
+        filter_expression: Optional[str],
+        top_k: int,
+        select: Optional[List[str]],
+    ) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def content_version(self) -> Any:
+        """
+        A value that changes whenever documents are added, replaced or removed; the
+        semantic result cache of the index is dropped when it does.
+        """
+
+    async def close(self) -> None:
+        """Release the connections of a backend that is no longer pooled."""
+
+
+class AzureSearchBackend(SearchBackend):
+    """
+    Azure AI Search through the async SDK client.
+
+    With an `index_client`, the index schema is read once: selected fields the index
+    does not have are dropped and semantic searches fall back to hybrid when there is
+    no semantic configuration, so indexes created before those were added keep working.
+    If the schema cannot be read, `late_fields` (fields added after the first release)
+    are dropped and semantic ranking is not used.
+    """
+
+    def __init__(
+        self,
+        search_client,
+        vector_fields: Sequence[str] = ("content_vector", "summary_vector"),
+        index_client=None,
+        index_name: Optional[str] = None,
+        late_fields: Sequence[str] = (),
+        version_field: Optional[str] = None,
+    ):
+        self.search_client = search_client
+        self.version_field = version_field
+        self.index_name = index_name
+        self.vector_fields = tuple(vector_fields)
+        self.index_client = index_client
+        self.late_fields = frozenset(late_fields)
+        # (field names or None when unknown, has semantic configuration), read on first search
+        self._schema: Optional[Tuple[Optional[frozenset], bool]] = None
+        self._schema_read_at = 0.0
+
+    async def _index_schema(self) -> Tuple[Optional[frozenset], bool]:
+        if self._schema is not None:
+            fields, has_semantic = self._schema
+            complete = has_semantic and fields is not None and self.late_fields <= fields
+            if not complete and time.monotonic() - self._schema_read_at >= SCHEMA_RECHECK_SECONDS:
+                self._schema = None
+        if self._schema is None:
+            self._schema_read_at = time.monotonic()
+            try:
+                index = await self.index_client.get_index(self.index_name)
+                configurations = index.semantic_search.configurations if index.semantic_search else None
+                self._schema = (
+                    frozenset(field.name for field in index.fields or []),
+                    any(config.name == SEMANTIC_CONFIG_NAME for config in configurations or []),
+                )
+            except Exception as e:
+                logger.warning(f"[AzureSearchBackend] Could not read the schema of index '{self.index_name}': {e}")
+                self._schema = (None, False)
+        return self._schema
+
+    async def search(
+        self,
+        query: str,
+        query_vector: List[float],
+        search_type: str,
+        filter_expression: Optional[str],
+        top_k: int,
+        select: Optional[List[str]],
+    ) -> List[Dict[str, Any]]:
+        semantic_config = SEMANTIC_CONFIG_NAME
+        if self.index_client is not None:
+            fields, has_semantic = await self._index_schema()
+            if select:
+                select = [
+                    field
+                    for field in select
+                    if (field in fields if fields is not None else field not in self.late_fields)
+                ]
+            if not has_semantic:
+                semantic_config = None
+                if search_type == "semantic":
+                    search_type = "hybrid"
+        select_fields = ",".join(select) if select else None
+        vector_queries = [
+            VectorizedQuery(vector=query_vector, k_nearest_neighbors=top_k, fields=field)
+            for field in self.vector_fields
+        ]
+
+        if search_type == "hybrid":
+            # Hybrid search: text + vector
+            results = await self.search_client.search(
+                search_text=query,
+                vector_queries=vector_queries,
+                filter=filter_expression,
+                select=select_fields,
+                top=top_k,
+                query_type=QueryType.FULL,
+                semantic_configuration_name=semantic_config,
+            )
+
+        elif search_type == "semantic":
+            # Semantic search with captions
+            results = await self.search_client.search(
+                search_text=query,
+                vector_queries=vector_queries,
+                filter=filter_expression,
+                select=select_fields,
+                top=top_k,
+                query_type=QueryType.SEMANTIC,
+                semantic_configuration_name=semantic_config,
+                query_caption=QueryCaptionType.EXTRACTIVE,
+                query_answer=QueryAnswerType.EXTRACTIVE,
+            )
+
+        elif search_type == "vector":
+            # Pure vector search
+            results = await self.search_client.search(
+                search_text=None,
+                vector_queries=vector_queries,
+                filter=filter_expression,
+                select=select_fields,
+                top=top_k,
+            )
+
+        elif search_type == "text":
+            # Traditional text search
+            results = await self.search_client.search(
+                search_text=query,
+                filter=filter_expression,
+                select=select_fields,
+                top=top_k,
+            )
+
+        else:
+            raise ValueError(f"Unknown search type: {search_type}")
+
+        return [doc async for doc in results]
+
+    async def content_version(self) -> Any:
+        """
+        (document count, latest `version_field` value): every upload stamps newer documents
+        and every pure delete lowers the count, so replacing a file with one of the same
+        size still changes the version.
+        """
+        if not self.version_field:
+            return (await self.search_client.get_document_count(), None)
+        count, latest = await asyncio.gather(self.search_client.get_document_count(), self._latest_version_value())
+        return (count, latest)
+
+    async def close(self) -> None:
+        # The index client is shared by every project backend and stays open
+        await self.search_client.close()
+
+    async def _latest_version_value(self) -> Optional[str]:
+        field = self.version_field
+        try:
+            results = await self.search_client.search(
+                search_text="*",
+                select=field,
+                order_by=[f"{field} desc"],
+                top=1,
+            )
+            async for document in results:
+                value = document.get(field)
+                return None if value is None else str(value)
+        except HttpResponseError as e:
+            if e.status_code != 400:
+                raise
+            # The field is missing or not sortable: every later query would fail the same way
+            logger.warning(
+                f"[AzureSearchBackend] Cannot order index '{self.index_name}' "
+                f"by '{field}' ({e.message}); its content version is the document count only. "
+                f"Use a sortable field (AZURE_AI_SEARCH_VERSION_FIELD) to detect replaced documents."
+            )
+            self.version_field = None
+        return None
+
+
+class LocalSearchBackend(SearchBackend):
+    """Local index written by the FastAPI app (SEARCH_BACKEND=local or LOCAL_SEARCH_FALLBACK=true)."""
+
+    def __init__(self, root: str, index_name: str, ivf_probes: int = DEFAULT_IVF_PROBES):
+        self.reader = LocalIndexReader(Path(root).resolve() / index_name, ivf_probes=ivf_probes)
+
+    async def search(
+        self,
+        query: str,
+        query_vector: List[float],
+        search_type: str,
+        filter_expression: Optional[str],
+        top_k: int,
+        select: Optional[List[str]],
+    ) -> List[Dict[str, Any]]:
+        if search_type in ("hybrid", "semantic"):
+            # No semantic ranker locally: semantic searches use the same BM25 + vector fusion
+            return await asyncio.to_thread(
+                self.reader.hybrid_search, query, query_vector, top_k, filter_expression, select
+            )
+        if search_type == "vector":
+            return await asyncio.to_thread(self.reader.search, query_vector, top_k, filter_expression, select)
+        if search_type == "text":
+            return await asyncio.to_thread(self.reader.text_search, query, top_k, filter_expression, select)
+        raise ValueError(f"Unknown search type: {search_type}")
+
+    async def content_version(self) -> Any:
+        # The API writes every change as a new manifest version
+        return await asyncio.to_thread(self.reader.content_version)
+
+
+def local_search_settings() -> Dict[str, Any]:
+    """Local index settings: whether it is the primary backend or the fallback, its root and probe count."""
+    return {
+        "primary": os.getenv("SEARCH_BACKEND", "azure").lower() == "local",
+        "fallback": os.getenv("LOCAL_SEARCH_FALLBACK", "false").lower() == "true",
+        "root": os.getenv("LOCAL_SEARCH_DIR", "../search_indexes"),
+        "ivf_probes": int(os.getenv("LOCAL_SEARCH_IVF_PROBES", DEFAULT_IVF_PROBES)),
+    }
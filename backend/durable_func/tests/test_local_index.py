@@ -0,0 +1,26 @@
+import pytest
+
+from local_index import compile_filter
+
+
+def test_and_inside_a_quoted_value_is_not_a_separator():
+    predicate = compile_filter("file_name eq 'R and D.pdf'")
+    assert predicate({"file_name": "R and D.pdf"})
+    assert not predicate({"file_name": "R"})
+
+
+def test_clauses_are_joined_with_and():
+    predicate = compile_filter("source_file_id eq 'f1' and file_name eq 'Q1 AND Q2''s plan.pdf' and page_number ge 2")
+    assert predicate({"source_file_id": "f1", "file_name": "Q1 AND Q2's plan.pdf", "page_number": 3})
+    assert not predicate({"source_file_id": "f1", "file_name": "Q1 AND Q2's plan.pdf", "page_number": 1})
+
+
+def test_search_in_values_may_contain_and():
+    predicate = compile_filter("search.in(file_name, 'R and D.pdf|Sales.pdf', '|') and project_id eq 'p'")
+    assert predicate({"file_name": "R and D.pdf", "project_id": "p"})
+    assert not predicate({"file_name": "R", "project_id": "p"})
+
+
+def test_unsupported_clauses_are_rejected():
+    with pytest.raises(ValueError):
+        compile_filter("file_name eq 'a' or file_name eq 'b'")
@@ -0,0 +1,39 @@
+from plan_normalizer import normalize_plan
+
+
+def _normalize(*steps):
+    return normalize_plan([{"topic": f"t{i}", "steps": [step]} for i, step in enumerate(steps)])
+
+
+def test_reworded_duplicates_are_merged():
+    result = _normalize(
+        "Find 2023 Scope 1 and 2 emissions for Company-A",
+        "Find 2023 Scope 1, 2 emissions for Company-A",
+    )
+    assert result["unique_steps"] == ["Find 2023 Scope 1 and 2 emissions for Company-A"]
+    assert result["topic_steps"] == [[0], [0]]
+    assert result["searches_saved"] == 1
+
+
+def test_steps_for_different_years_are_kept_apart():
+    result = _normalize(
+        "Find the total annual consolidated group revenue reported in 2023",
+        "Find the total annual consolidated group revenue reported in 2022",
+    )
+    assert len(result["unique_steps"]) == 2
+    assert result["searches_saved"] == 0
+
+
+def test_steps_for_different_entities_are_kept_apart():
+    result = _normalize(
+        "Find the total annual consolidated group revenue reported by Company-A",
+        "Find the total annual consolidated group revenue reported by Company-A vs Company-B",
+        "Find the total annual consolidated group revenue reported by Company-B",
+    )
+    assert len(result["unique_steps"]) == 3
+    assert result["topic_steps"] == [[0], [1], [2]]
+
+
+def test_exact_canonical_matches_are_merged():
+    result = _normalize("Find revenue for Company-A in 2023.", "find revenue for company-a in 2023")
+    assert len(result["unique_steps"]) == 1
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from rate_limiter import AdaptiveRateLimiter
+
+
+class _Throttled(Exception):
+    status_code = 429
+
+
+def _limiter(**kwargs):
+    return AdaptiveRateLimiter(max_concurrency=2, base_delay=0.0, **kwargs)
+
+
+def test_cancelled_call_frees_its_slot():
+    limiter = _limiter(min_concurrency=1)
+
+    async def scenario():
+        blocked = asyncio.Event()
+        calls = [asyncio.create_task(limiter.call(blocked.wait)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        assert limiter.stats()["in_flight"] == 1
+        for call in calls:
+            call.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+        assert limiter.stats()["in_flight"] == 0
+
+        async def answer():
+            return "ok"
+
+        return await asyncio.wait_for(limiter.call(answer), timeout=1)
+
+    assert asyncio.run(scenario()) == "ok"
+
+
+def test_throttled_call_is_retried():
+    limiter = _limiter()
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _Throttled()
+        return "ok"
+
+    assert asyncio.run(limiter.call(flaky)) == "ok"
+    assert len(attempts) == 3
+    assert limiter.stats()["throttled"] == 2
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_throttling_halves_concurrency():
+    limiter = AdaptiveRateLimiter(max_concurrency=8, min_concurrency=1, max_retries=0)
+    limiter.concurrency = 8.0
+
+    async def throttled():
+        raise _Throttled()
+
+    with pytest.raises(_Throttled):
+        asyncio.run(limiter.call(throttled))
+    assert limiter.concurrency == 4.0
+
+
+def test_errors_other_than_throttling_are_not_retried():
+    limiter = _limiter()
+    attempts = []
+
+    async def broken():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        asyncio.run(limiter.call(broken))
+    assert len(attempts) == 1
+
+
+def test_stream_is_retried_before_its_first_chunk():
+    limiter = _limiter()
+    opened = []
+
+    async def open_stream():
+        opened.append(1)
+        if len(opened) == 1:
+            raise _Throttled()
+        for chunk in ("a", "b"):
+            yield chunk
+
+    async def consume():
+        return [chunk async for chunk in limiter.stream(open_stream)]
+
+    assert asyncio.run(consume()) == ["a", "b"]
+    assert len(opened) == 2
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_stream_is_not_retried_after_a_chunk_was_yielded():
+    limiter = _limiter()
+    opened = []
+    received = []
+
+    async def open_stream():
+        opened.append(1)
+        yield "a"
+        raise _Throttled()
+
+    async def consume():
+        async for chunk in limiter.stream(open_stream):
+            received.append(chunk)
+
+    with pytest.raises(_Throttled):
+        asyncio.run(consume())
+    assert received == ["a"]
+    assert len(opened) == 1
+    assert limiter.stats()["in_flight"] == 0
@@ -0,0 +1,48 @@
+import pytest
+
+import response_cache
+from response_cache import ResponseCache, response_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60, max_entries=10)
+    cache.put("key", "answer")
+    clock[0] += 59
+    assert cache.get("key") == "answer"
+    clock[0] += 2
+    assert cache.get("key") is None
+    assert cache.stats() == {"size": 0, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=3600, max_entries=2)
+    cache.put("a", "A")
+    clock[0] += 1
+    cache.put("b", "B")
+    clock[0] += 1
+    assert cache.get("a") == "A"
+    clock[0] += 1
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_entries=0)
+    cache.put("key", "answer")
+    assert cache.get("key") is None
+    assert not (tmp_path / "cache.sqlite").exists()
+
+
+def test_keys_depend_on_every_part_of_the_request():
+    key = response_cache_key("gpt", "instructions", "prompt", schema="Plan")
+    assert key == response_cache_key("gpt", "instructions", "prompt", schema="Plan")
+    assert key != response_cache_key("gpt", "instructions", "prompt", schema="Report")
+    assert key != response_cache_key("gpt", "other instructions", "prompt", schema="Plan")
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+from azure.core.exceptions import HttpResponseError
+
+from search_backend import AzureSearchBackend
+
+
+class _SearchClient:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.searches = 0
+
+    async def get_document_count(self):
+        return 7
+
+    async def search(self, **kwargs):
+        self.searches += 1
+        error = HttpResponseError(message="Field 'upload_date' is not sortable")
+        error.status_code = self.status_code
+        raise error
+
+
+def test_unsortable_version_field_falls_back_to_the_document_count(caplog):
+    client = _SearchClient(400)
+    backend = AzureSearchBackend(client, index_name="global", version_field="upload_date")
+
+    async def read_versions():
+        return [await backend.content_version() for _ in range(3)]
+
+    assert asyncio.run(read_versions()) == [(7, None)] * 3
+    assert client.searches == 1
+    assert sum("upload_date" in record.getMessage() for record in caplog.records) == 1
+
+
+def test_other_version_query_errors_are_raised():
+    backend = AzureSearchBackend(_SearchClient(503), index_name="global", version_field="upload_date")
+    with pytest.raises(HttpResponseError):
+        asyncio.run(backend.content_version())
+    assert backend.version_field == "upload_date"
@@ -21,23 +21,181 @@ AI Search Tool
 
 import os
 import json
+import asyncio
 import base64
 import logging
-from typing import List, Dict, Any, Optional, Annotated
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Annotated, Tuple
 
+import numpy as np
 from azure.core.credentials import AzureKeyCredential
-from azure.search.documents import SearchClient
-from azure.search.documents.models import (
-    VectorizedQuery,
-    QueryType,
-    QueryCaptionType,
-    QueryAnswerType,
-)
-from openai import AzureOpenAI
+from azure.search.documents.aio import SearchClient
+from azure.search.documents.indexes.aio import SearchIndexClient
+from openai import AsyncAzureOpenAI
 from prompt_template import research_instrunction_template
+from context_builder import DEFAULT_TOKEN_BUDGET, build_research_context, count_tokens
+from rate_limiter import OUTPUT_TOKENS_ESTIMATE, get_rate_limiter
+from response_cache import get_response_cache, response_cache_key
+from search_backend import (
+    AzureSearchBackend,
+    LocalSearchBackend,
+    SearchBackend,
+    is_missing_index,
+    is_throttled,
+    local_search_settings,
+)
 
 logger = logging.getLogger(__name__)
 
+# Schema of the per-project indexes created by the FastAPI ingestion (app/create_index.py)
+PROJECT_SELECT_FIELDS = "id,file_name,source_file_id,page_number"
+PROJECT_VECTOR_FIELDS = ("content_vector",)
+# Added to project indexes after the first release; older indexes are upgraded by the API
+PROJECT_LATE_FIELDS = ("file_name",)
+# Sortable upload timestamp whose latest value is part of an index's content version
+PROJECT_VERSION_FIELD = "created_at"
+
+
+class EmbeddingError(RuntimeError):
+    """Raised when query embeddings cannot be generated."""
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU cache with TTL for query embeddings.
+
+    Keys are normalized (case and whitespace) so repeated planner steps across
+    topics and runs share an entry. Hit/miss counters are kept for metrics.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return f"{model}:{' '.join(text.split()).lower()}"
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, vector: List[float]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SemanticResultCache:
+    """
+    Per-index cache of research answers keyed by query embedding.
+
+    A new step reuses a stored answer when its query vector has cosine similarity
+    >= `threshold` with a recently answered step against the same index and in the
+    same scope (search type, filters, top_k). Entries carry the version of their
+    index and are dropped once that index's content changes or `ttl_seconds` elapses.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_size: int = 512, ttl_seconds: float = 86400):
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(
+        self, scope: str, vector: List[float], index_version: Any, index: str = ""
+    ) -> Optional[Dict[str, Any]]:
+        if self.max_size <= 0 or not vector or index_version is None:
+            return None
+        query = np.asarray(vector, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        now = time.monotonic()
+        with self._lock:
+            self._entries = [
+                entry
+                for entry in self._entries
+                if (entry["index"] != index or entry["index_version"] == index_version)
+                and now - entry["created_at"] <= self.ttl_seconds
+            ]
+            candidates = [entry for entry in self._entries if entry["index"] == index and entry["scope"] == scope]
+            if candidates:
+                similarities = np.stack([entry["vector"] for entry in candidates]) @ query
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    self.hits += 1
+                    entry = candidates[best]
+                    # Move to the end so frequently reused answers are evicted last.
+                    self._entries.remove(entry)
+                    self._entries.append(entry)
+                    return {"query": entry["query"], "result": entry["result"], "similarity": float(similarities[best])}
+            self.misses += 1
+            return None
+
+    def store(
+        self, scope: str, query: str, vector: List[float], result: str, index_version: Any, index: str = ""
+    ) -> None:
+        if self.max_size <= 0 or not vector or index_version is None:
+            return
+        normalized = np.asarray(vector, dtype=np.float32)
+        normalized /= np.linalg.norm(normalized) or 1.0
+        with self._lock:
+            self._entries.append(
+                {
+                    "index": index,
+                    "scope": scope,
+                    "query": query,
+                    "vector": normalized,
+                    "result": result,
+                    "index_version": index_version,
+                    "created_at": time.monotonic(),
+                }
+            )
+            del self._entries[: max(len(self._entries) - self.max_size, 0)]
+
+    def invalidate(self, index: Optional[str] = None) -> None:
+        """Drop the entries of `index`, or every entry when no index is given."""
+        with self._lock:
+            if index is None:
+                self._entries.clear()
+            else:
+                self._entries = [entry for entry in self._entries if entry["index"] != index]
+
+
 class AISearchTool():
     """
     Tool for searching documents in Azure AI Search with multiple search methods.
@@ -47,6 +205,9 @@ class AISearchTool():
     - Semantic search
     - Vector search
     - Traditional text search
+
+    One tool serves every index: `index_name` is the default (AZURE_AI_SEARCH_INDEX_NAME)
+    and a step's `index_name` selects a project index. Search clients are pooled per index.
     """
 
     def __init__(
@@ -92,10 +253,32 @@ class AISearchTool():
         )
 
         self.llm_model = os.getenv("MODEL_DEPLOYMENT_NAME", "gpt-4.1-mini")
-        self.client = AzureOpenAI(
+        # Cumulative responses API usage of this (pooled) tool, for logging and benchmarks
+        self.llm_usage = {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+        self.embedding_cache = EmbeddingCache(
+            max_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "1024")),
+            ttl_seconds=float(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "3600")),
+        )
+        self.result_cache = SemanticResultCache(
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+            max_size=int(os.getenv("SEMANTIC_CACHE_SIZE", "512")),
+            ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "86400")),
+        )
+        self.context_token_budget = int(os.getenv("RESEARCH_CONTEXT_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+        self.fast_context_token_budget = int(os.getenv("FAST_MODE_CONTEXT_TOKEN_BUDGET", "2000"))
+        self.index_version_check_seconds = float(os.getenv("INDEX_VERSION_CHECK_SECONDS", "30"))
+        # index name -> (content version, monotonic time it was read)
+        self._index_versions: Dict[str, Tuple[Any, float]] = {}
+        # index name -> (search backend, local fallback backend or None)
+        self._search_backends: Dict[str, Tuple[SearchBackend, Optional[SearchBackend]]] = {}
+        self._search_backends_lock = threading.Lock()
+        self._index_client: Optional[SearchIndexClient] = None
+        # Retries are left to the shared rate limiter, which paces them against the quota
+        self.client = AsyncAzureOpenAI(
             api_key=self.openai_key,
             base_url=f"{self.openai_endpoint}openai/v1/",
             api_version="preview",
+            max_retries=0,
         )
 
 
@@ -104,43 +287,127 @@ class AISearchTool():
 
         logger.info(f"AISearchExecutor initialized with index: {self.index_name}")
 
-    def generate_research(self, prompt, model):
+    async def generate_research(self, prompt, model, bypass_cache: bool = False):
 
         kwargs = {
             "model": model,
             "input": prompt,
         }
 
-        response = self.client.responses.create(**kwargs)
-        
-        return response.output[0].content[-1].text
+        # Byte-identical prompts (retries, re-runs) are answered from the response cache
+        response_cache = get_response_cache()
+        cache_key = response_cache_key(model, None, prompt)
+        if not bypass_cache:
+            cached = await asyncio.to_thread(response_cache.get, cache_key)
+            if cached is not None:
+                return cached
+
+        response = await get_rate_limiter().call(
+            lambda: self.client.responses.create(**kwargs),
+            tokens=count_tokens(prompt) + OUTPUT_TOKENS_ESTIMATE,
+            usage=lambda result: result.usage.total_tokens,
+        )
 
-    def _init_clients(self):
-        """Initialize Azure clients."""
-        # Search client
-        from azure.identity import DefaultAzureCredential
+        usage = getattr(response, "usage", None)
+        self.llm_usage["calls"] += 1
+        if usage is not None:
+            self.llm_usage["input_tokens"] += usage.input_tokens or 0
+            self.llm_usage["output_tokens"] += usage.output_tokens or 0
 
-        if self.search_key:
-            search_credential = AzureKeyCredential(self.search_key)
-        else:
-            search_credential = DefaultAzureCredential()
+        text = response.output[0].content[-1].text
+        await asyncio.to_thread(response_cache.put, cache_key, text)
+        return text
 
-        self.search_client = SearchClient(
-            endpoint=self.search_endpoint,
-            index_name=self.index_name,
-            credential=search_credential,
-        )
+    def _init_clients(self):
+        """Initialize async Azure clients."""
+        # Search backends are created per index on first use (see _get_search_backends)
+        self.local_search = local_search_settings()
 
         # OpenAI client
-        self.openai_client = AzureOpenAI(
+        self.openai_client = AsyncAzureOpenAI(
             api_version=self.openai_api_version,
             azure_endpoint=self.openai_endpoint,
             api_key=self.openai_key,
+            max_retries=0,
         )
 
-    def research_query(
+    def _get_search_backends(self, index_name: str) -> Tuple[SearchBackend, Optional[SearchBackend]]:
+        """
+        Return the pooled search backend for `index_name` and its local fallback (or None).
+
+        The local memory-mapped index or Azure AI Search, per SEARCH_BACKEND; project indexes
+        created by the API only carry `content_vector`.
+        """
+        backends = self._search_backends.get(index_name)
+        if backends is not None:
+            return backends
+        with self._search_backends_lock:
+            backends = self._search_backends.get(index_name)
+            if backends is not None:
+                return backends
+            local_search = self.local_search
+            fallback = None
+            if local_search["primary"]:
+                backend = LocalSearchBackend(local_search["root"], index_name, local_search["ivf_probes"])
+            else:
+                if self.search_key:
+                    search_credential = AzureKeyCredential(self.search_key)
+                else:
+                    search_credential = get_default_credential()
+
+                search_client = SearchClient(
+                    endpoint=self.search_endpoint,
+                    index_name=index_name,
+                    credential=search_credential,
+                )
+                if index_name == self.index_name:
+                    version_field = os.getenv("AZURE_AI_SEARCH_VERSION_FIELD", "upload_date") or None
+                    backend = AzureSearchBackend(search_client, index_name=index_name, version_field=version_field)
+                else:
+                    # Project indexes may predate the file_name field or the semantic configuration
+                    if self._index_client is None:
+                        self._index_client = SearchIndexClient(
+                            endpoint=self.search_endpoint, credential=search_credential
+                        )
+                    backend = AzureSearchBackend(
+                        search_client,
+                        vector_fields=PROJECT_VECTOR_FIELDS,
+                        index_client=self._index_client,
+                        index_name=index_name,
+                        late_fields=PROJECT_LATE_FIELDS,
+                        version_field=PROJECT_VERSION_FIELD,
+                    )
+                if local_search["fallback"]:
+                    fallback = LocalSearchBackend(local_search["root"], index_name, local_search["ivf_probes"])
+            backends = (backend, fallback)
+            self._search_backends[index_name] = backends
+            logger.info(f"[AISearchExecutor] Search client created for index: {index_name}")
+        return backends
+
+    async def research_queries(
+        self,
+        search_data_list: List[Dict[str, Any]],
+        embedding_dimensions: Optional[int] = None,
+    ) -> List[str]:
+        """Research several queries with one embeddings request and concurrent searches."""
+        queries = [search_data.get("query", "") for search_data in search_data_list]
+        try:
+            query_vectors = await self._generate_embeddings(queries, embedding_dimensions)
+        except EmbeddingError as e:
+            logger.error(f"[AISearchExecutor] {e}")
+            return [f"[AISearchExecutor] AI Search failed: {e}" for _ in queries]
+
+        return await asyncio.gather(
+            *[
+                self.research_query(search_data, query_vector=query_vector)
+                for search_data, query_vector in zip(search_data_list, query_vectors)
+            ]
+        )
+
+    async def research_query(
         self,
         search_data: Dict[str, Any],
+        query_vector: Optional[List[float]] = None,
     ) -> None:
         """Search documents in Azure AI Search for each sub-topic."""
         try:
@@ -159,31 +426,60 @@ class AISearchTool():
             industry = search_data.get("industry")
             company = search_data.get("company")
             report_year = search_data.get("report_year")
+            # "fast" returns ranked passages and leaves synthesis to the topic summary
+            research_mode = search_data.get("research_mode", "standard")
+            # Runs that bypass caching always search and call the model again
+            bypass_cache = search_data.get("bypass_cache", False)
+            # Project runs search the project's own index
+            index_name = search_data.get("index_name") or self.index_name
 
             try:
-                # Generate query vector
-                query_vector = self._generate_embedding(query)
+                # Generate query vector (unless it was embedded in a batch)
+                if query_vector is None:
+                    query_vector = await self._generate_embedding(query, search_data.get("embedding_dimensions"))
 
                 # Build filter expression
                 filter_expression = self._build_filters(
                     filters, document_type, industry, company, report_year
                 )
 
+                # Reuse the answer of a near-identical step against the same index content
+                cache_scope = f"{research_mode}|{search_type}|{filter_expression}|{top_k}|{include_content}"
+                index_version = await self._get_index_version(index_name)
+                cached = (
+                    None
+                    if bypass_cache
+                    else self.result_cache.lookup(cache_scope, query_vector, index_version, index=index_name)
+                )
+                if cached is not None:
+                    # Never answer from before an upload or delete that the periodic check has not seen yet
+                    current_version = await self._get_index_version(index_name, fresh=True)
+                    if current_version != index_version:
+                        index_version, cached = current_version, None
+                if cached is not None:
+                    logger.info(
+                        f"[AISearchExecutor] Reusing research for '{query}' from '{cached['query']}' "
+                        f"(similarity {cached['similarity']:.3f})"
+                    )
+                    return cached["result"]
+
                 # Execute search
-                search_results = self._execute_search(
+                search_results = await self._execute_search(
                     query=query,
                     query_vector=query_vector,
                     search_type=search_type,
                     filter_expression=filter_expression,
                     top_k=top_k,
                     include_content=include_content,
+                    index_name=index_name,
                 )
 
                 # Process results
-                research_doc = self._process_search_results(
-                    query, search_results, include_content
+                research_doc = await self._process_search_results(
+                    query, search_results, include_content, research_mode, bypass_cache
                 )
 
+                self.result_cache.store(cache_scope, query, query_vector, research_doc, index_version, index=index_name)
                 return research_doc
 
             except Exception as search_error:
@@ -199,16 +495,97 @@ class AISearchTool():
             return f"[AISearchExecutor] {error_msg}"
 
 
-    def _generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for text using Azure OpenAI."""
+    async def _get_index_version(self, index_name: str, fresh: bool = False) -> Any:
+        """
+        Return the content version of the index (see SearchBackend.content_version).
+
+        Read at most every `index_version_check_seconds` unless `fresh`, which cache hits
+        use so an answer is never served after the index changed. When the version
+        changes, the index's cached research answers are dropped.
+        """
+        now = time.monotonic()
+        previous, checked_at = self._index_versions.get(index_name, (None, 0.0))
+        if not fresh and previous is not None and now - checked_at < self.index_version_check_seconds:
+            return previous
         try:
-            response = self.openai_client.embeddings.create(
-                input=text, model=self.embedding_deployment
-            )
-            return response.data[0].embedding
+            search_backend, _ = self._get_search_backends(index_name)
+            version = await search_backend.content_version()
         except Exception as e:
-            logger.error(f"Embedding generation failed: {e}")
-            return []
+            if index_name != self.index_name and is_missing_index(e):
+                await self.forget_index(index_name)
+            logger.warning(f"[AISearchExecutor] Failed to read index version: {e}")
+            # Unknown version: the semantic result cache is bypassed for this step.
+            return None
+        if previous is not None and version != previous:
+            logger.info(f"[AISearchExecutor] Index '{index_name}' changed; clearing its semantic result cache")
+            self.result_cache.invalidate(index_name)
+        self._index_versions[index_name] = (version, now)
+        return version
+
+    async def forget_index(self, index_name: str) -> None:
+        """Drop the pooled clients, content version and cached answers of a deleted project index."""
+        with self._search_backends_lock:
+            backends = self._search_backends.pop(index_name, None)
+        self._index_versions.pop(index_name, None)
+        self.result_cache.invalidate(index_name)
+        for backend in backends or ():
+            if backend is not None:
+                await backend.close()
+        logger.info(f"[AISearchExecutor] Index '{index_name}' no longer exists; released its clients and cache")
+
+    async def _generate_embedding(self, text: str, dimensions: Optional[int] = None) -> List[float]:
+        """Generate embedding for text using Azure OpenAI."""
+        return (await self._generate_embeddings([text], dimensions))[0]
+
+    async def _generate_embeddings(self, texts: List[str], dimensions: Optional[int] = None) -> List[List[float]]:
+        """
+        Generate embeddings for several texts, serving repeats from the LRU cache.
+
+        Cache misses are embedded together in a single Azure OpenAI request. `dimensions`
+        requests shortened vectors for compact project indexes (None: the model's native size).
+        Raises EmbeddingError instead of returning empty vectors; failures are never cached.
+        """
+        model_key = f"{self.embedding_deployment}@{dimensions}" if dimensions else self.embedding_deployment
+        extra = {"dimensions": dimensions} if dimensions else {}
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        for position, text in enumerate(texts):
+            key = EmbeddingCache.make_key(model_key, text)
+            if key in missing:
+                missing[key].append(position)
+                continue
+            cached = self.embedding_cache.get(key)
+            if cached is not None:
+                vectors[position] = cached
+            else:
+                missing[key] = [position]
+
+        if missing:
+            pending = list(missing.items())
+            inputs = [texts[positions[0]] for _, positions in pending]
+            try:
+                response = await get_rate_limiter().call(
+                    lambda: self.openai_client.embeddings.create(
+                        input=inputs,
+                        model=self.embedding_deployment,
+                        **extra,
+                    ),
+                    tokens=sum(count_tokens(text) for text in inputs),
+                    usage=lambda result: result.usage.total_tokens,
+                )
+            except Exception as e:
+                raise EmbeddingError(f"Embedding generation failed: {e}") from e
+
+            ordered = sorted(response.data, key=lambda item: item.index)
+            if len(ordered) != len(pending) or any(not item.embedding for item in ordered):
+                raise EmbeddingError("Embedding generation returned incomplete results")
+            for (key, positions), item in zip(pending, ordered):
+                self.embedding_cache.put(key, item.embedding)
+                for position in positions:
+                    vectors[position] = item.embedding
+
+        logger.info(f"[AISearchExecutor] Embedding cache: {self.embedding_cache.stats()}")
+        return vectors
 
     def _build_filters(
         self,
@@ -234,7 +611,7 @@ class AISearchTool():
 
         return " and ".join(filter_parts) if filter_parts else None
 
-    def _execute_search(
+    async def _execute_search(
         self,
         query: str,
         query_vector: List[float],
@@ -242,89 +619,103 @@ class AISearchTool():
         filter_expression: Optional[str],
         top_k: int,
         include_content: bool,
+        index_name: Optional[str] = None,
     ):
-        """Execute search based on search type."""
-        select_fields = self._get_select_fields(include_content)
-
-        vector_queries = [
-            VectorizedQuery(
-                vector=query_vector, k_nearest_neighbors=top_k, fields="content_vector"
-            ),
-            VectorizedQuery(
-                vector=query_vector, k_nearest_neighbors=top_k, fields="summary_vector"
-            ),
-        ]
-
-        if search_type == "hybrid":
-            # Hybrid search: text + vector
-            return self.search_client.search(
-                search_text=query,
-                vector_queries=vector_queries,
-                filter=filter_expression,
-                select=select_fields,
-                top=top_k,
-                query_type=QueryType.FULL,
-                semantic_configuration_name="semantic-config",
-            )
-
-        elif search_type == "semantic":
-            # Semantic search with captions
-            return self.search_client.search(
-                search_text=query,
-                vector_queries=vector_queries,
-                filter=filter_expression,
-                select=select_fields,
-                top=top_k,
-                query_type=QueryType.SEMANTIC,
-                semantic_configuration_name="semantic-config",
-                query_caption=QueryCaptionType.EXTRACTIVE,
-                query_answer=QueryAnswerType.EXTRACTIVE,
-            )
-
-        elif search_type == "vector":
-            # Pure vector search
-            return self.search_client.search(
-                search_text=None,
-                vector_queries=vector_queries,
-                filter=filter_expression,
-                select=select_fields,
-                top=top_k,
-            )
-
-        elif search_type == "text":
-            # Traditional text search
-            return self.search_client.search(
-                search_text=query,
-                filter=filter_expression,
-                select=select_fields,
-                top=top_k,
-            )
-
-        else:
-            raise ValueError(f"Unknown search type: {search_type}")
+        """Execute search based on search type, falling back to the local index when Azure AI Search is throttled."""
+        index_name = index_name or self.index_name
+        search_backend, fallback_search_backend = self._get_search_backends(index_name)
+        search_kwargs = {
+            "query": query,
+            "query_vector": query_vector,
+            "search_type": search_type,
+            "filter_expression": filter_expression,
+            "top_k": top_k,
+            "select": self._get_select_fields(include_content, index_name).split(","),
+        }
+        try:
+            return await search_backend.search(**search_kwargs)
+        except Exception as e:
+            if fallback_search_backend is None or not is_throttled(e) or not fallback_search_backend.reader.exists():
+                raise
+            logger.warning(f"[AISearchExecutor] Azure AI Search unavailable ({e}); using the local index for '{query}'")
+            return await fallback_search_backend.search(**search_kwargs)
 
-    def _get_select_fields(self, include_content: bool) -> str:
+    def _get_select_fields(self, include_content: bool, index_name: Optional[str] = None) -> str:
         """Get select fields for search query."""
-        base_fields = "docId,title,file_name,summary,document_type,industry,company,report_year,page_number,upload_date,keywords"
+        if index_name and index_name != self.index_name:
+            # Project indexes created by the API have a smaller schema
+            base_fields = PROJECT_SELECT_FIELDS
+        else:
+            base_fields = "docId,title,file_name,summary,document_type,industry,company,report_year,page_number,upload_date,keywords"
 
         if include_content:
             return f"{base_fields},content"
         else:
             return base_fields
 
-    def _process_search_results(
-        self, topic_name: str, search_results, include_content: bool
+    async def _process_search_results(
+        self,
+        topic_name: str,
+        search_results,
+        include_content: bool,
+        research_mode: str = "standard",
+        bypass_cache: bool = False,
     ) -> List[Dict[str, Any]]:
         """Process search results into a standardized format."""
 
-        research_result = self.generate_research(
-            research_instrunction_template.format(
-                context="\n--------------------------\n".join([f"File: {doc['file_name']}\nContent: {doc['content']}\n" for doc in search_results]),
-                user_query=topic_name
-            ), model=self.llm_model)
+        documents = list(search_results)
+        if research_mode == "fast":
+            # No per-step LLM call: return ranked passages with file/page citations
+            passages, context_stats = build_research_context(
+                documents, token_budget=self.fast_context_token_budget, cite_pages=True
+            )
+            logger.info(
+                f"[AISearchExecutor] Fast mode passages for '{topic_name}': {context_stats['context_tokens']} tokens "
+                f"({context_stats['passages_used']}/{context_stats['passages']} passages from {context_stats['hits']} hits)"
+            )
+            return passages or "No relevant passages found."
+
+        context, context_stats = build_research_context(documents, token_budget=self.context_token_budget)
+        prompt = research_instrunction_template.format(context=context, user_query=topic_name)
+        logger.info(
+            f"[AISearchExecutor] Research prompt for '{topic_name}': {count_tokens(prompt)} tokens "
+            f"({context_stats['passages_used']}/{context_stats['passages']} passages from {context_stats['hits']} hits, "
+            f"truncated={context_stats['truncated']})"
+        )
+        research_result = await self.generate_research(prompt, model=self.llm_model, bypass_cache=bypass_cache)
 
         return research_result
 
+# Warm-worker pools: the credential and the search tool (with its OpenAI client and
+# per-index Search clients) are created once per worker process and shared by all
+# activity invocations.
+_CREDENTIAL = None
+_CREDENTIAL_LOCK = threading.Lock()
+_SEARCH_TOOL: Optional[AISearchTool] = None
+_SEARCH_TOOL_LOCK = threading.Lock()
+
+
+def get_default_credential():
+    """Return the shared DefaultAzureCredential so tokens are fetched once and cached."""
+    global _CREDENTIAL
+    if _CREDENTIAL is None:
+        with _CREDENTIAL_LOCK:
+            if _CREDENTIAL is None:
+                from azure.identity.aio import DefaultAzureCredential
+
+                _CREDENTIAL = DefaultAzureCredential()
+    return _CREDENTIAL
+
+
+def get_search_tool() -> AISearchTool:
+    """Return the pooled AISearchTool; steps select their index with `index_name`."""
+    global _SEARCH_TOOL
+    if _SEARCH_TOOL is None:
+        with _SEARCH_TOOL_LOCK:
+            if _SEARCH_TOOL is None:
+                _SEARCH_TOOL = AISearchTool()
+    return _SEARCH_TOOL
+
 async def main():
     import json
     from dotenv import load_dotenv
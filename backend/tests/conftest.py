@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The API imports its modules from backend/ (`app.*`, and `durable_func.*` for shared code)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
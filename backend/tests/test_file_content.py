@@ -0,0 +1,95 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.services.file_content import file_content_response, parse_range
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-99", [(0, 99)]),
+        ("bytes=1000-", [(1000, 1023)]),
+        ("bytes=-100", [(924, 1023)]),
+        ("bytes=-5000", [(0, 1023)]),
+        ("bytes=1000-5000", [(1000, 1023)]),
+        ("bytes=0-0, 10-19", [(0, 0), (10, 19)]),
+        ("bytes=2000-", []),
+        ("bytes=-0", []),
+        ("items=0-99", None),
+        ("bytes=", None),
+        ("bytes=9-5", None),
+        ("bytes=a-b", None),
+        ("bytes=5", None),
+    ],
+)
+def test_parse_range(header, expected):
+    assert parse_range(header, len(CONTENT)) == expected
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / "report.pdf"
+    path.write_bytes(CONTENT)
+
+    async def endpoint(request):
+        return file_content_response(request.headers, path, "file-1", "R&D report.pdf")
+
+    return TestClient(Starlette(routes=[Route("/file", endpoint, methods=["GET", "HEAD"])]))
+
+
+def test_whole_file(client):
+    response = client.get("/file")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["content-disposition"] == "inline; filename*=utf-8''R%26D%20report.pdf"
+
+
+def test_single_range(client):
+    response = client.get("/file", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+    assert response.headers["content-length"] == "10"
+
+
+def test_unsatisfiable_range(client):
+    response = client.get("/file", headers={"Range": "bytes=5000-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_multiple_ranges_get_the_whole_file(client):
+    response = client.get("/file", headers={"Range": "bytes=0-0, 10-19"})
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_conditional_requests(client):
+    first = client.get("/file")
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+    assert client.get("/file", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/file", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+    assert client.get("/file", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/file", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_if_range_only_honours_a_current_validator(client):
+    etag = client.get("/file").headers["etag"]
+    fresh = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": etag})
+    assert fresh.status_code == 206
+    stale = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.content == CONTENT
+
+
+def test_head_sends_headers_only(client):
+    response = client.head("/file", headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.headers["content-length"] == "10"
+    assert response.content == b""
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from app.rate_limiter import AdaptiveRateLimiter
+
+
+class _Throttled(Exception):
+    status_code = 429
+
+
+def test_concurrency_is_capped_by_the_window():
+    limiter = AdaptiveRateLimiter(max_concurrency=2, min_concurrency=2)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    threads = [threading.Thread(target=limiter.call, args=(work,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+    assert limiter.stats()["in_flight"] == 0
+    assert limiter.stats()["calls"] == 8
+
+
+def test_throttled_call_is_retried():
+    limiter = AdaptiveRateLimiter(max_concurrency=2, base_delay=0.0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise _Throttled()
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+    assert len(attempts) == 2
+    assert limiter.stats()["throttled"] == 1
+
+
+def test_gives_up_after_max_retries():
+    limiter = AdaptiveRateLimiter(max_concurrency=2, max_retries=2, base_delay=0.0)
+    attempts = []
+
+    def throttled():
+        attempts.append(1)
+        raise _Throttled()
+
+    with pytest.raises(_Throttled):
+        limiter.call(throttled)
+    assert len(attempts) == 3
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_interrupted_call_frees_its_slot():
+    limiter = AdaptiveRateLimiter(max_concurrency=2, min_concurrency=1)
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        limiter.call(interrupted)
+    assert limiter.stats()["in_flight"] == 0
@@ -16,6 +16,8 @@ import { createEmptyPollingState, deriveProgressPercent } from "./lib/agentUtils
 
 const FALLBACK_NAME = "Untitled Project";
 const POLL_INTERVAL_MS = 3000;
+// Orchestrator progress at which the report writer starts streaming
+const REPORT_STAGE_PROGRESS = 0.75;
 function orderProjects(list, preferredId) {
   const copy = Array.isArray(list) ? [...list] : [];
   if (!preferredId) {
@@ -510,14 +512,43 @@ export default function App() {
     };
   }, [pollingState.runId, markRunAsCompleted, markRunAsFailed, markRunAsRunning]);
 
+  const isWritingReport =
+    pollingState.status === "Running" && (pollingState.progress ?? 0) >= REPORT_STAGE_PROGRESS;
+
+  useEffect(() => {
+    const { runId } = pollingState;
+    if (!runId || !isWritingReport) {
+      return;
+    }
+    const controller = new AbortController();
+    let partialReport = "";
+    api
+      .streamAgentRunReport(
+        runId,
+        (text) => {
+          partialReport += text;
+          setSelectedOutput(partialReport);
+        },
+        controller.signal,
+      )
+      .catch((err) => {
+        if (!controller.signal.aborted) {
+          console.warn("Report stream unavailable", err);
+        }
+      });
+
+    return () => controller.abort();
+  }, [pollingState.runId, isWritingReport]);
+
   const handleAgentSubmit = useCallback(
-    async (query, reportLength) => {
+    async (query, reportLength, researchMode) => {
       setAgentError(null);
       setSelectedOutput("");
       try {
         const startResponse = await api.startAgentRun({
           query,
           report_length: reportLength,
+          research_mode: researchMode,
           project_id: activeProjectId,
         });
         startPolling(startResponse, query, reportLength);
@@ -23,6 +23,7 @@ export default function AgentRunPanel({
 }) {
   const [query, setQuery] = useState("");
   const [reportLength, setReportLength] = useState("medium");
+  const [researchMode, setResearchMode] = useState("standard");
   const fileInputRef = useRef(null);
 
   const handleSubmit = async (event) => {
@@ -31,7 +32,7 @@ export default function AgentRunPanel({
     if (!trimmed) {
       return;
     }
-    await onSubmit(trimmed, reportLength);
+    await onSubmit(trimmed, reportLength, researchMode);
     setQuery("");
   };
 
@@ -125,6 +126,22 @@ export default function AgentRunPanel({
         </select>
       </div>
 
+      <div className="agent-panel__section">
+        <label htmlFor="research-mode" className="agent-panel__label">
+          Research Mode
+        </label>
+        <select
+          id="research-mode"
+          className="agent-panel__select"
+          value={researchMode}
+          onChange={(event) => setResearchMode(event.target.value)}
+          disabled={isBusy}
+        >
+          <option value="standard">Standard</option>
+          <option value="fast">Fast (summary-only synthesis)</option>
+        </select>
+      </div>
+
       <div className="agent-panel__section">
         <label htmlFor="query-text" className="agent-panel__label">
           Research Request
@@ -82,6 +82,22 @@ export const api = {
     const detail = typeof body === "string" ? body : body?.detail;
     throw new Error(detail || `Status request failed with ${response.status}`);
   },
+  streamAgentRunReport: async (runId, onText, signal) => {
+    const response = await fetch(`${API_BASE_URL}/agent-runs/${runId}/report/stream`, { signal });
+    if (!response.ok || !response.body) {
+      const message = await safeParseError(response);
+      throw new Error(message || `Report stream failed with ${response.status}`);
+    }
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) {
+        break;
+      }
+      onText(decoder.decode(value, { stream: true }));
+    }
+  },
   sendAgentFeedback: (runId, action) =>
     request(`/agent-runs/${runId}/human-feedback`, {
       method: "POST",